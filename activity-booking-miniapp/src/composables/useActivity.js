@@ -13,8 +13,8 @@ export function useActivity() {
   const activityDetail = computed(() => activityStore.detail)
   const loading = computed(() => activityStore.loading)
   
-  // 分页状态
-  const page = ref(1)
+  // 分页状态（游标分页）
+  const cursor = ref(null)
   const pageSize = ref(10)
   const hasMore = ref(true)
   
@@ -23,14 +23,15 @@ export function useActivity() {
    */
   const fetchActivityList = async (params = {}) => {
     try {
+      const refresh = !cursor.value
       const res = await activityStore.fetchList({
-        page: page.value,
         pageSize: pageSize.value,  // 改为驼峰命名
+        ...(cursor.value ? { cursor: cursor.value } : {}),
         ...params
       })
       
       if (res && res.items) {
-        if (page.value === 1) {
+        if (refresh) {
           // 刷新
           activityStore.list = res.items
         } else {
@@ -38,7 +39,8 @@ export function useActivity() {
           activityStore.list = [...activityStore.list, ...res.items]
         }
         
-        hasMore.value = res.items.length === pageSize.value
+        cursor.value = res.nextCursor || null
+        hasMore.value = !!res.nextCursor
       }
       
       return res
@@ -67,7 +69,7 @@ export function useActivity() {
    * 刷新列表
    */
   const refreshList = async (params = {}) => {
-    page.value = 1
+    cursor.value = null
     hasMore.value = true
     return await fetchActivityList(params)
   }
@@ -78,7 +80,6 @@ export function useActivity() {
   const loadMore = async (params = {}) => {
     if (!hasMore.value || loading.value) return
     
-    page.value++
     return await fetchActivityList(params)
   }
   
@@ -98,7 +99,7 @@ export function useActivity() {
     activityList,
     activityDetail,
     loading,
-    page,
+    cursor,
     pageSize,
     hasMore,
     fetchActivityList,
@@ -1,36 +1,68 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.core.config import settings
 from app.schemas.activity import (
     Activity as ActivitySchema,
+    ActivityCover,
     ActivityCreate,
     ActivityUpdate,
-    ActivityList
+    ActivityList,
+    ActivityNearbyList,
+    ActivitySearchResult,
+    ActivitySummaryList
 )
 from app.schemas.response import ApiResponse, ResponseCode
 from app.services.activity_service import ActivityService
-from app.utils.response import create_success_response, create_error_response
+from app.utils.images import InvalidImageError
+from app.utils.pagination import TotalMode, InvalidCursorError
+from app.utils.response import (
+    create_success_response,
+    create_cached_response,
+    create_error_response,
+    create_raw_success_response,
+    create_serialized_response
+)
 
 router = APIRouter()
 
 
-@router.get("", response_model=ApiResponse[ActivityList])
+def _cached(request: Request, data: bytes, message: str):
+    """
+    读穿透缓存的活动接口响应带 ETag，客户端携带 If-None-Match 且缓存内容未变化时返回 304，
+    缓存命中时整个过程不访问数据库
+    """
+    return create_cached_response(request, data, message, max_age=settings.ACTIVITY_HTTP_CACHE_MAX_AGE)
+
+
+@router.get("", response_model=ApiResponse[ActivitySummaryList])
 async def get_activities(
-    page: int = Query(1, ge=1, alias="page"),
+    request: Request,
+    page: Optional[int] = Query(None, ge=1, alias="page"),
     page_size: int = Query(10, ge=1, le=100, alias="pageSize"),
     keyword: Optional[str] = Query(None, alias="keyword"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取活动列表"""
+    """
+    获取活动列表
+
+    不传 page 时使用游标分页：首页不传 cursor，之后传上一页返回的 nextCursor；
+    total 可选 exact（精确，已缓存）、estimate（估算）、none（不返回总数）
+    """
     try:
         activity_service = ActivityService(db)
-        activities = activity_service.get_activities(page, page_size, keyword)
-        return create_success_response(
-            data=activities,
-            message="获取活动列表成功"
+        activities = await activity_service.get_activities_json(page, page_size, keyword, cursor, total_mode)
+        return _cached(request, activities, "获取活动列表成功")
+    except InvalidCursorError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error=f"Invalid cursor: {cursor}"
         )
     except Exception as e:
         return create_error_response(
@@ -40,22 +72,94 @@ async def get_activities(
         )
 
 
+@router.get("/search", response_model=ApiResponse[ActivitySearchResult])
+async def search_activities(
+    request: Request,
+    keyword: str = Query(..., min_length=1, max_length=100),
+    page: int = Query(1, ge=1, alias="page"),
+    page_size: int = Query(10, ge=1, le=50, alias="pageSize"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
+    db: AsyncSession = Depends(get_db)
+):
+    """搜索活动（标题、主办方、地点、描述全文检索，按相关度排序，返回高亮片段）"""
+    try:
+        activity_service = ActivityService(db)
+        result = await activity_service.search_activities_json(keyword, page, page_size, total_mode)
+        return _cached(request, result, "搜索活动成功")
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="搜索活动失败",
+            error=str(e)
+        )
+
+
+# 固定路径需在 /{activity_id} 之前注册，否则会被当作活动 ID 匹配
+@router.get("/hot", response_model=ApiResponse[ActivityList])
+async def get_hot_activities(request: Request, db: AsyncSession = Depends(get_db)):
+    """获取热门活动"""
+    try:
+        activity_service = ActivityService(db)
+        activities = await activity_service.get_hot_activities_json(10)
+        return _cached(request, activities, "获取热门活动成功")
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取热门活动失败",
+            error=str(e)
+        )
+
+
+@router.get("/nearby", response_model=ApiResponse[ActivityNearbyList])
+async def get_nearby_activities(
+    latitude: float = Query(..., ge=-90, le=90, alias="lat"),
+    longitude: float = Query(..., ge=-180, le=180, alias="lng"),
+    radius: float = Query(5000, gt=0, le=50000, alias="radius"),
+    page_size: int = Query(10, ge=1, le=50, alias="pageSize"),
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    获取附近的活动（半径 radius 米内进行中和未开始的活动，按距离由近到远）
+
+    首页不传 cursor，之后传上一页返回的 nextCursor（需使用同一位置）
+    """
+    try:
+        activity_service = ActivityService(db)
+        activities = await activity_service.get_nearby_activities_json(
+            latitude, longitude, radius, page_size, cursor
+        )
+        return create_raw_success_response(
+            data=activities,
+            message="获取附近的活动成功"
+        )
+    except InvalidCursorError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error=f"Invalid cursor: {cursor}"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取附近的活动失败",
+            error=str(e)
+        )
+
+
 @router.get("/{activity_id}", response_model=ApiResponse[ActivitySchema])
-async def get_activity(activity_id: int, db: Session = Depends(get_db)):
+async def get_activity(request: Request, activity_id: int, db: AsyncSession = Depends(get_db)):
     """获取活动详情"""
     try:
         activity_service = ActivityService(db)
-        activity = activity_service.get_activity_by_id(activity_id)
+        activity = await activity_service.get_activity_json(activity_id)
         if not activity:
             return create_error_response(
                 code=ResponseCode.NOT_FOUND,
                 message="活动不存在",
                 error=f"Activity with id {activity_id} not found"
             )
-        return create_success_response(
-            data=activity,
-            message="获取活动详情成功"
-        )
+        return _cached(request, activity, "获取活动详情成功")
     except Exception as e:
         return create_error_response(
             code=ResponseCode.INTERNAL_ERROR,
@@ -67,14 +171,15 @@ async def get_activity(activity_id: int, db: Session = Depends(get_db)):
 @router.post("", response_model=ApiResponse[ActivitySchema])
 async def create_activity(
     activity_create: ActivityCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """创建活动"""
     try:
         activity_service = ActivityService(db)
-        activity = activity_service.create_activity(activity_create)
-        return create_success_response(
+        activity = await activity_service.create_activity(activity_create)
+        return create_serialized_response(
             data=activity,
+            schema=ActivitySchema,
             message="创建活动成功",
             code=ResponseCode.CREATED
         )
@@ -90,20 +195,21 @@ async def create_activity(
 async def update_activity(
     activity_id: int,
     activity_update: ActivityUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """更新活动"""
     try:
         activity_service = ActivityService(db)
-        activity = activity_service.update_activity(activity_id, activity_update)
+        activity = await activity_service.update_activity(activity_id, activity_update)
         if not activity:
             return create_error_response(
                 code=ResponseCode.NOT_FOUND,
                 message="活动不存在",
                 error=f"Activity with id {activity_id} not found"
             )
-        return create_success_response(
+        return create_serialized_response(
             data=activity,
+            schema=ActivitySchema,
             message="更新活动成功"
         )
     except Exception as e:
@@ -114,71 +220,71 @@ async def update_activity(
         )
 
 
-@router.delete("/{activity_id}", response_model=ApiResponse[None])
-async def delete_activity(activity_id: int, db: Session = Depends(get_db)):
-    """删除活动（软删除）"""
+@router.post("/{activity_id}/cover", response_model=ApiResponse[ActivityCover])
+async def upload_activity_cover(
+    activity_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    上传活动封面（JPEG/PNG/WebP/AVIF）
+
+    后台生成各尺寸的 WebP/AVIF（去除元数据），完成后更新活动的 coverImage 和 coverSrcset；
+    status 为 processing 时稍后重新获取活动详情即可
+    """
     try:
+        data = await file.read(settings.COVER_MAX_UPLOAD_SIZE + 1)
+        if len(data) > settings.COVER_MAX_UPLOAD_SIZE:
+            return create_error_response(
+                code=ResponseCode.BAD_REQUEST,
+                message="图片过大",
+                error=f"Cover image exceeds {settings.COVER_MAX_UPLOAD_SIZE} bytes"
+            )
         activity_service = ActivityService(db)
-        success = activity_service.delete_activity(activity_id)
-        if not success:
+        cover = await activity_service.set_cover(activity_id, data)
+        if not cover:
             return create_error_response(
                 code=ResponseCode.NOT_FOUND,
                 message="活动不存在",
                 error=f"Activity with id {activity_id} not found"
             )
         return create_success_response(
-            data=None,
-            message="删除活动成功"
+            data=cover,
+            message="更新封面成功" if cover.status == "ready" else "封面处理中"
         )
-    except Exception as e:
+    except InvalidImageError as e:
         return create_error_response(
-            code=ResponseCode.INTERNAL_ERROR,
-            message="删除活动失败",
-            error=str(e)
-        )
-
-
-@router.get("/search", response_model=ApiResponse[ActivityList])
-async def search_activities(
-    keyword: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
-):
-    """搜索活动"""
-    try:
-        activity_service = ActivityService(db)
-        activities = activity_service.search_activities(keyword)
-        return create_success_response(
-            data=activities,
-            message="搜索活动成功"
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error="Invalid cover image"
         )
     except Exception as e:
         return create_error_response(
             code=ResponseCode.INTERNAL_ERROR,
-            message="搜索活动失败",
+            message="上传封面失败",
             error=str(e)
         )
 
 
-@router.get("/hot", response_model=ApiResponse[ActivityList])
-async def get_hot_activities(db: Session = Depends(get_db)):
-    """获取热门活动"""
+@router.delete("/{activity_id}", response_model=ApiResponse[None])
+async def delete_activity(activity_id: int, db: AsyncSession = Depends(get_db)):
+    """删除活动（软删除）"""
     try:
         activity_service = ActivityService(db)
-        activities = activity_service.get_hot_activities(10)
-        activity_list = ActivityList(
-            items=activities,
-            total=len(activities),
-            page=1,
-            page_size=len(activities)
-        )
+        success = await activity_service.delete_activity(activity_id)
+        if not success:
+            return create_error_response(
+                code=ResponseCode.NOT_FOUND,
+                message="活动不存在",
+                error=f"Activity with id {activity_id} not found"
+            )
         return create_success_response(
-            data=activity_list,
-            message="获取热门活动成功"
+            data=None,
+            message="删除活动成功"
         )
     except Exception as e:
         return create_error_response(
             code=ResponseCode.INTERNAL_ERROR,
-            message="获取热门活动失败",
+            message="删除活动失败",
             error=str(e)
         )
-
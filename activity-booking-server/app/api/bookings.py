@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.api.deps import get_db, get_current_user
-from app.models.user import User
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_current_principal, get_current_staff
 from app.schemas.booking import (
     Booking as BookingSchema,
     BookingCreate,
-    BookingList
+    BookingList,
+    BookingBatchCreate,
+    BookingBatchResult,
+    BookingBatchCheckin,
+    BookingBatchCheckinResult,
+    CheckinToken
 )
 from app.schemas.response import ApiResponse, ResponseCode
+from app.schemas.user import User as UserSchema
 from app.services.booking_service import BookingService
-from app.utils.response import create_success_response, create_error_response
+from app.services.checkin_service import CheckinService
+from app.utils.pagination import TotalMode, InvalidCursorError
+from app.utils.response import (
+    create_success_response,
+    create_error_response,
+    create_raw_success_response,
+    create_serialized_response
+)
 
 router = APIRouter()
 
@@ -18,23 +32,24 @@ router = APIRouter()
 @router.post("", response_model=ApiResponse[BookingSchema])
 async def create_booking(
     booking_create: BookingCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """创建预约"""
     try:
         booking_service = BookingService(db)
-        booking = booking_service.create_booking(booking_create, current_user.id)
-        
+        booking = await booking_service.create_booking(booking_create, current_user.id)
+
         if not booking:
             return create_error_response(
                 code=ResponseCode.BAD_REQUEST,
                 message="活动不存在或已满员",
                 error="Activity not found or fully booked"
             )
-        
-        return create_success_response(
+
+        return create_serialized_response(
             data=booking,
+            schema=BookingSchema,
             message="创建预约成功",
             code=ResponseCode.CREATED
         )
@@ -46,19 +61,73 @@ async def create_booking(
         )
 
 
+@router.post("/batch", response_model=ApiResponse[BookingBatchResult])
+async def create_bookings(
+    batch: BookingBatchCreate,
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """批量预约（团体报名），返回每一项的结果"""
+    try:
+        booking_service = BookingService(db)
+        result = await booking_service.create_bookings(batch.items, current_user.id)
+        return create_success_response(
+            data=result,
+            message=f"成功预约 {result.succeeded} 项，失败 {result.failed} 项",
+            code=ResponseCode.CREATED if result.succeeded else ResponseCode.SUCCESS
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="批量预约失败",
+            error=str(e)
+        )
+
+
+@router.put("/batch/checkin", response_model=ApiResponse[BookingBatchCheckinResult])
+async def checkin_bookings(
+    batch: BookingBatchCheckin,
+    current_user: UserSchema = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """批量签到（需要工作人员权限），返回每一项的结果"""
+    try:
+        booking_service = BookingService(db)
+        result = await booking_service.checkin_bookings(batch.booking_ids, batch.activity_id)
+        return create_success_response(
+            data=result,
+            message=f"成功签到 {result.succeeded} 项，失败 {result.failed} 项"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="批量签到失败",
+            error=str(e)
+        )
+
+
 @router.get("/my", response_model=ApiResponse[BookingList])
 async def get_my_bookings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    page_size: int = Query(20, ge=1, le=100, alias="pageSize"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    """获取我的预约列表"""
+    """获取我的预约列表（按创建时间倒序，游标分页）"""
     try:
         booking_service = BookingService(db)
-        bookings = booking_service.get_user_bookings(current_user.id)
-        return create_success_response(
+        bookings = await booking_service.get_user_bookings_json(current_user.id, cursor, page_size, total_mode)
+        return create_raw_success_response(
             data=bookings,
             message="获取预约列表成功"
         )
+    except InvalidCursorError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error=f"Invalid cursor: {cursor}"
+        )
     except Exception as e:
         return create_error_response(
             code=ResponseCode.INTERNAL_ERROR,
@@ -70,23 +139,24 @@ async def get_my_bookings(
 @router.get("/{booking_id}", response_model=ApiResponse[BookingSchema])
 async def get_booking(
     booking_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """获取预约详情"""
     try:
         booking_service = BookingService(db)
-        booking = booking_service.get_user_booking(booking_id, current_user.id)
-        
+        booking = await booking_service.get_user_booking(booking_id, current_user.id)
+
         if not booking:
             return create_error_response(
                 code=ResponseCode.NOT_FOUND,
                 message="预约不存在",
                 error=f"Booking with id {booking_id} not found"
             )
-        
-        return create_success_response(
+
+        return create_serialized_response(
             data=booking,
+            schema=BookingSchema,
             message="获取预约详情成功"
         )
     except Exception as e:
@@ -97,24 +167,54 @@ async def get_booking(
         )
 
 
+@router.get("/{booking_id}/checkin-token", response_model=ApiResponse[CheckinToken])
+async def get_checkin_token(
+    booking_id: int,
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取签到二维码令牌（仅限本人已确认且未签到的预约）"""
+    try:
+        checkin_service = CheckinService(db)
+        token = await checkin_service.issue_token(booking_id, current_user.id)
+
+        if not token:
+            return create_error_response(
+                code=ResponseCode.BAD_REQUEST,
+                message="预约不存在或无法签到",
+                error="Booking not found or cannot be checked in"
+            )
+
+        return create_success_response(
+            data=token,
+            message="获取签到二维码成功"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取签到二维码失败",
+            error=str(e)
+        )
+
+
 @router.put("/{booking_id}/cancel", response_model=ApiResponse[None])
 async def cancel_booking(
     booking_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """取消预约"""
     try:
         booking_service = BookingService(db)
-        success = booking_service.cancel_booking(booking_id, current_user.id)
-        
+        success = await booking_service.cancel_booking(booking_id, current_user.id)
+
         if not success:
             return create_error_response(
                 code=ResponseCode.BAD_REQUEST,
                 message="预约不存在或无法取消",
                 error="Booking not found or cannot be cancelled"
             )
-        
+
         return create_success_response(
             data=None,
             message="取消预约成功"
@@ -130,21 +230,21 @@ async def cancel_booking(
 @router.put("/{booking_id}/checkin", response_model=ApiResponse[None])
 async def checkin_booking(
     booking_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """签到"""
     try:
         booking_service = BookingService(db)
-        success = booking_service.checkin_booking(booking_id, current_user.id)
-        
+        success = await booking_service.checkin_booking(booking_id, current_user.id)
+
         if not success:
             return create_error_response(
                 code=ResponseCode.BAD_REQUEST,
                 message="预约不存在或无法签到",
                 error="Booking not found or cannot be checked in"
             )
-        
+
         return create_success_response(
             data=None,
             message="签到成功"
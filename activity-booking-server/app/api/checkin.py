@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_current_staff
+from app.schemas.booking import BookingCheckinItem, CheckinScan, CheckinSync, CheckinSyncResult
+from app.schemas.response import ApiResponse, ResponseCode
+from app.schemas.user import User as UserSchema
+from app.services.checkin_service import CheckinService
+from app.utils.checkin_token import InvalidCheckinTokenError
+from app.utils.response import create_success_response, create_error_response
+
+router = APIRouter()
+
+
+@router.post("/scan", response_model=ApiResponse[BookingCheckinItem])
+async def scan_checkin(
+    scan: CheckinScan,
+    current_user: UserSchema = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """扫码签到（需要工作人员权限）"""
+    try:
+        checkin_service = CheckinService(db)
+        result = await checkin_service.scan(scan.token, scan.activity_id)
+        return create_success_response(
+            data=result,
+            message="签到成功" if result.success else result.message
+        )
+    except InvalidCheckinTokenError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error="Invalid check-in token"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="签到失败",
+            error=str(e)
+        )
+
+
+@router.post("/sync", response_model=ApiResponse[CheckinSyncResult])
+async def sync_checkins(
+    sync: CheckinSync,
+    current_user: UserSchema = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """同步离线扫码结果（需要工作人员权限），返回每个二维码的结果"""
+    try:
+        checkin_service = CheckinService(db)
+        result = await checkin_service.sync(sync.tokens, sync.activity_id)
+        return create_success_response(
+            data=result,
+            message=f"成功签到 {result.succeeded} 项，失败 {result.failed} 项"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="同步签到失败",
+            error=str(e)
+        )
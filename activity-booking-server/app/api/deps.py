@@ -1,52 +1,96 @@
-from typing import Generator
+from typing import AsyncGenerator
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import SessionLocal
+from app.core.db import AsyncSessionLocal
 from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.services.principal_cache import principal_cache
 from app.utils.security import verify_token
 
 security = HTTPBearer()
 
 
-def get_db() -> Generator:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前用户"""
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    """从令牌中解析当前用户 ID"""
     token = credentials.credentials
     payload = verify_token(token)
-    
+
     if not payload:
         raise HTTPException(
             status_code=401,
             detail="无效的认证凭证"
         )
-    
+
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(
             status_code=401,
             detail="无效的认证凭证"
         )
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+    return user_id
+
+
+async def get_current_principal(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+) -> UserSchema:
+    """
+    获取当前用户快照（优先读取缓存）
+
+    只需要用户 ID 或基本信息的路由使用此依赖，缓存命中时不查询数据库
+    """
+    principal = await principal_cache.get(db, user_id)
+    if not principal:
+        raise HTTPException(
+            status_code=404,
+            detail="用户不存在"
+        )
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=403,
+            detail="用户已被禁用"
+        )
+
+    return principal
+
+
+async def get_current_staff(
+    principal: UserSchema = Depends(get_current_principal)
+) -> UserSchema:
+    """获取当前工作人员（现场签到等需要工作人员权限的路由使用）"""
+    if not principal.is_staff:
+        raise HTTPException(
+            status_code=403,
+            detail="需要工作人员权限"
+        )
+
+    return principal
+
+
+async def get_current_user(
+    principal: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """获取当前用户 ORM 对象（需要修改用户或访问关联数据时使用）"""
+    user = await db.scalar(select(User).where(User.id == principal.id))
     if not user:
         raise HTTPException(
             status_code=404,
             detail="用户不存在"
         )
-    
-    return user
 
+    return user
@@ -0,0 +1,127 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.schemas.activity import ActivityList, ActivityNearbyList, ActivitySearchResult, ActivitySummaryList
+from app.schemas.response import ApiResponse, ResponseCode
+from app.services.activity_service import ActivityService
+from app.utils.pagination import TotalMode, InvalidCursorError
+from app.utils.response import create_cached_response, create_error_response
+
+router = APIRouter()
+
+
+def _cached(request: Request, data: bytes, message: str):
+    """发现页响应统一带 ETag 和 Cache-Control，内容未变化时返回 304"""
+    return create_cached_response(
+        request,
+        data,
+        message,
+        max_age=settings.DISCOVERY_CACHE_MAX_AGE,
+        stale_while_revalidate=settings.DISCOVERY_STALE_WHILE_REVALIDATE
+    )
+
+
+@router.get("/hot", response_model=ApiResponse[ActivityList])
+async def get_hot_activities(
+    request: Request,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """热门活动（Redis 热度排行 + 详情缓存，缓存命中时不访问数据库）"""
+    try:
+        activity_service = ActivityService(db)
+        activities = await activity_service.get_hot_activities_json(limit)
+        return _cached(request, activities, "获取热门活动成功")
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取热门活动失败",
+            error=str(e)
+        )
+
+
+@router.get("/search", response_model=ApiResponse[ActivitySearchResult])
+async def search_activities(
+    request: Request,
+    keyword: str = Query(..., min_length=1, max_length=100),
+    page: int = Query(1, ge=1, alias="page"),
+    page_size: int = Query(10, ge=1, le=50, alias="pageSize"),
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
+    db: AsyncSession = Depends(get_db)
+):
+    """搜索活动（全文检索 GIN 索引，按相关度排序）"""
+    try:
+        activity_service = ActivityService(db)
+        result = await activity_service.search_activities_json(keyword, page, page_size, total_mode)
+        return _cached(request, result, "搜索活动成功")
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="搜索活动失败",
+            error=str(e)
+        )
+
+
+@router.get("/upcoming", response_model=ApiResponse[ActivitySummaryList])
+async def get_upcoming_activities(
+    request: Request,
+    page_size: int = Query(10, ge=1, le=50, alias="pageSize"),
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    即将开始的活动（按开始时间升序，走 (start_time, id) 部分索引）
+
+    首页不传 cursor，之后传上一页返回的 nextCursor
+    """
+    try:
+        activity_service = ActivityService(db)
+        activities = await activity_service.get_upcoming_activities_json(page_size, cursor)
+        return _cached(request, activities, "获取即将开始的活动成功")
+    except InvalidCursorError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error=f"Invalid cursor: {cursor}"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取即将开始的活动失败",
+            error=str(e)
+        )
+
+
+@router.get("/nearby", response_model=ApiResponse[ActivityNearbyList])
+async def get_nearby_activities(
+    request: Request,
+    latitude: float = Query(..., ge=-90, le=90, alias="lat"),
+    longitude: float = Query(..., ge=-180, le=180, alias="lng"),
+    radius: float = Query(5000, gt=0, le=50000, alias="radius"),
+    page_size: int = Query(10, ge=1, le=50, alias="pageSize"),
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    db: AsyncSession = Depends(get_db)
+):
+    """附近的活动（geohash 前缀索引取候选，按距离由近到远）"""
+    try:
+        activity_service = ActivityService(db)
+        activities = await activity_service.get_nearby_activities_json(
+            latitude, longitude, radius, page_size, cursor
+        )
+        return _cached(request, activities, "获取附近的活动成功")
+    except InvalidCursorError as e:
+        return create_error_response(
+            code=ResponseCode.BAD_REQUEST,
+            message=str(e),
+            error=f"Invalid cursor: {cursor}"
+        )
+    except Exception as e:
+        return create_error_response(
+            code=ResponseCode.INTERNAL_ERROR,
+            message="获取附近的活动失败",
+            error=str(e)
+        )
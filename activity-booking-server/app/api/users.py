@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
-from app.models.user import User
+from app.api.deps import get_db, get_current_principal
 from app.schemas.response import ApiResponse, ResponseCode
 from app.schemas.user import User as UserSchema, UserUpdate
 from app.services.user_service import UserService
@@ -12,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=ApiResponse[UserSchema])
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserSchema = Depends(get_current_principal)):
     """获取当前用户信息"""
     try:
         return create_success_response(
@@ -30,13 +29,13 @@ async def get_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=ApiResponse[UserSchema])
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """更新当前用户信息"""
     try:
         user_service = UserService(db)
-        updated_user = user_service.update_user(current_user.id, user_update)
+        updated_user = await user_service.update_user(current_user.id, user_update)
         if not updated_user:
             return create_error_response(
                 code=ResponseCode.NOT_FOUND,
@@ -1,6 +1,8 @@
-from typing import Optional
+from collections import Counter
+from typing import Dict, Optional
 
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import settings
 
@@ -12,11 +14,62 @@ redis_pool = redis.ConnectionPool.from_url(
 )
 
 
+# 异步Redis连接池（供 API 路由等异步代码使用，避免阻塞事件循环）
+async_redis_pool = aioredis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS
+)
+
+
+# 异步二进制Redis连接池（存取预序列化的 JSON 字节，不做解码）
+async_redis_binary_pool = aioredis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS
+)
+
+
 def get_redis() -> redis.Redis:
     """获取Redis客户端"""
     return redis.Redis(connection_pool=redis_pool)
 
 
+def get_async_redis(decode_responses: bool = True) -> aioredis.Redis:
+    """获取异步Redis客户端"""
+    pool = async_redis_pool if decode_responses else async_redis_binary_pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+class CacheStats:
+    """缓存命中统计（进程内计数）"""
+
+    def __init__(self):
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def record(self, namespace: str, hit: bool) -> None:
+        """记录一次缓存访问"""
+        if hit:
+            self.hits[namespace] += 1
+        else:
+            self.misses[namespace] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """按命名空间返回命中数、未命中数和命中率"""
+        result = {}
+        for namespace in sorted(self.hits.keys() | self.misses.keys()):
+            hits, misses = self.hits[namespace], self.misses[namespace]
+            result[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0
+            }
+        return result
+
+
+cache_stats = CacheStats()
+
+
 class RedisCache:
     """Redis缓存工具类"""
     
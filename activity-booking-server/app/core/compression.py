@@ -0,0 +1,172 @@
+import gzip
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只提供 gzip：uv sync --extra brotli
+    brotli = None
+
+# 值得压缩的内容类型（图片等已压缩的格式不再压缩）
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    按 Accept-Encoding 协商压缩算法
+
+    取客户端 q 值最高的算法，q 值相同时按服务端偏好（encodings 的顺序），
+    客户端不接受任何可用算法时返回 None
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件（纯 ASGI）
+
+    按 Accept-Encoding 协商 brotli 或 gzip，只压缩 JSON、文本等可压缩类型且不小于
+    minimum_size 的响应；流式响应（如数据导出）按块增量压缩。
+    可压缩的响应都追加 Vary: Accept-Encoding；压缩后的表示与原始表示字节不同，强 ETag 改为弱 ETag
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(self.app, scope, receive)
+
+
+class _CompressionResponder:
+    """单个请求的压缩状态：暂存响应头，收到第一段响应体后决定是否压缩"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.receive_message)
+
+    def compress(self, body: bytes) -> bytes:
+        """一次性压缩完整响应体"""
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.middleware.brotli_quality)
+        return gzip.compress(body, compresslevel=self.middleware.gzip_level, mtime=0)
+
+    def start_stream(self) -> None:
+        if self.encoding == "br":
+            self.compressor = brotli.Compressor(quality=self.middleware.brotli_quality)
+        else:
+            self.compressor = zlib.compressobj(self.middleware.gzip_level, zlib.DEFLATED, 31)
+
+    def stream(self, chunk: bytes, final: bool) -> bytes:
+        """增量压缩流式响应的一段，final 时输出剩余数据"""
+        if self.encoding == "br":
+            data = self.compressor.process(chunk) if chunk else b""
+            return data + self.compressor.finish() if final else data
+        data = self.compressor.compress(chunk)
+        return data + self.compressor.flush() if final else data
+
+    def encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        return headers
+
+    async def receive_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # 响应头推迟到收到第一段响应体后发送，届时才知道是否压缩
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = Headers(raw=self.start["headers"])
+            compressible = (
+                self.start["status"] not in (204, 206, 304)
+                and "content-encoding" not in headers
+                and _compressible(headers.get("content-type", ""))
+            )
+            if compressible:
+                # 是否压缩取决于 Accept-Encoding，未达到压缩阈值的响应同样需要声明
+                MutableHeaders(raw=self.start["headers"]).add_vary_header("Accept-Encoding")
+            if not compressible or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+
+            headers = self.encoded_headers()
+            if not more_body:
+                body = self.compress(body)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            # 流式响应：长度未知，去掉 Content-Length 后逐块压缩
+            del headers["Content-Length"]
+            self.start_stream()
+            await self.send(self.start)
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.stream(body, not more_body),
+            "more_body": more_body,
+        })
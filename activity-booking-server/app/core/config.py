@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import List
 
 from pydantic_settings import BaseSettings
 
@@ -14,14 +15,89 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str
-    
+    # 异步数据库连接（留空则由 DATABASE_URL 推导为 postgresql+asyncpg://）
+    ASYNC_DATABASE_URL: str = ""
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+
     # Redis配置
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # 活动缓存配置（列表、详情、热门活动的读穿透缓存）
+    ACTIVITY_CACHE_ENABLED: bool = True
+    ACTIVITY_CACHE_TTL: int = 60
+    # 过期后仍可返回旧值的时间（秒），期间由单个请求在后台刷新
+    ACTIVITY_CACHE_STALE_TTL: int = 30
+    # 进程内 LRU 缓存的最长保留时间（秒），跨进程失效依赖 Redis pub/sub
+    ACTIVITY_CACHE_LOCAL_TTL: int = 5
+
+    # 认证用户缓存配置（按用户 ID 缓存用户快照，认证时跳过数据库查询）
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL: int = 300
+    # 进程内缓存保留时间（秒），用户更新或禁用时通过 Redis pub/sub 同步失效
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 30
+
+    # 活动搜索配置
+    # 分词器：bigram（二元切分，无需词典）或 jieba（需安装 jieba）；切换后需重建检索向量
+    SEARCH_TOKENIZER: str = "bigram"
+    # 全文检索无结果时按标题做 pg_trgm 模糊匹配（需要 pg_trgm 扩展）
+    SEARCH_FUZZY_ENABLED: bool = True
+
+    # 座位库存配置
+    # db：在 activities 行上条件更新占座；redis：热门活动在 Redis 中用 Lua 脚本占座，计数异步回写数据库
+    SEAT_INVENTORY_MODE: str = "db"
+    # Redis 模式下回写 booked_count 的间隔（秒）
+    SEAT_INVENTORY_SYNC_INTERVAL: float = 1.0
+
+    # 热门活动排行（Redis 有序集合，预约/取消时增量更新，按时间衰减）
+    HOT_RANKING_ENABLED: bool = True
+    # 预约热度的半衰期（秒）
+    HOT_RANKING_HALF_LIFE: float = 172800
+    # 新发布活动的初始热度（相当于发布时的预约人数，同样随时间衰减）
+    HOT_RANKING_NEW_BOOST: float = 5.0
+    # 从数据库全量重建排行的间隔（秒）
+    HOT_RANKING_REBUILD_INTERVAL: int = 600
+
+    # 发现页接口（/api/discovery）的 HTTP 缓存：客户端可直接复用响应的时间（秒）
+    DISCOVERY_CACHE_MAX_AGE: int = 30
+    # 过期后仍可先使用旧响应、同时在后台重新验证的时间（秒）
+    DISCOVERY_STALE_WHILE_REVALIDATE: int = 60
+    # 活动接口（列表、详情、搜索、热门）的 HTTP 缓存时间（秒），0 表示每次携带 If-None-Match 重新验证
+    ACTIVITY_HTTP_CACHE_MAX_AGE: int = 0
+
+    # 响应压缩（按 Accept-Encoding 协商 brotli 或 gzip，brotli 需安装 brotli）
+    COMPRESSION_ENABLED: bool = True
+    # 小于该字节数的响应不压缩
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # 文件名带内容指纹的静态文件（如 cover.3f2a9c1d.webp）的缓存时间（秒），其余静态文件每次重新验证
+    STATIC_IMMUTABLE_MAX_AGE: int = 31536000
+
+    # 活动封面图处理（上传后在进程池中生成多尺寸 WebP/AVIF，去除元数据，按内容摘要命名）
+    # 生成的宽度（像素），最小的作为列表缩略图，最大的作为详情页头图；不会放大原图
+    COVER_IMAGE_WIDTHS: List[int] = [320, 640, 1080]
+    COVER_WEBP_QUALITY: int = 80
+    # 同时生成 AVIF（需 Pillow 支持 AVIF 编码，不支持时只生成 WebP）
+    COVER_AVIF_ENABLED: bool = True
+    COVER_AVIF_QUALITY: int = 60
+    # 上传原图的大小（字节）和像素数上限
+    COVER_MAX_UPLOAD_SIZE: int = 10485760
+    COVER_MAX_PIXELS: int = 40000000
+    # 处理图片的进程数
+    COVER_PROCESS_WORKERS: int = 2
+
+    # Prometheus 指标（/metrics）：请求延迟、数据库和 Redis 连接池、缓存命中、微信接口延迟
+    METRICS_ENABLED: bool = True
     
     # JWT配置
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # 签到二维码在活动结束后仍可使用的时间（秒）；签名密钥由 SECRET_KEY 派生
+    CHECKIN_TOKEN_GRACE: int = 21600
     
     # 微信小程序配置
     WECHAT_APPID: str = ""
@@ -30,12 +106,38 @@ class Settings(BaseSettings):
     # 微信网页应用配置
     WECHAT_WEB_APPID: str = ""
     WECHAT_WEB_SECRET: str = ""
+
+    # 微信接口客户端配置（应用内复用连接池）
+    WECHAT_API_BASE: str = "https://api.weixin.qq.com"
+    # 安装 h2 后启用 HTTP/2
+    WECHAT_HTTP2: bool = True
+    WECHAT_MAX_CONNECTIONS: int = 100
+    WECHAT_KEEPALIVE_EXPIRY: float = 30.0
+    # 同时进行的微信接口请求上限
+    WECHAT_MAX_CONCURRENCY: int = 50
+    WECHAT_TIMEOUT: float = 5.0
+    WECHAT_CONNECT_TIMEOUT: float = 2.0
+    WECHAT_MAX_RETRIES: int = 2
+    # 重试退避基数（秒），第 n 次重试等待约 backoff * 2^n
+    WECHAT_RETRY_BACKOFF: float = 0.2
+    # 登录 code 换取结果的缓存时间（秒），小程序重试同一个 code 时直接复用，0 表示不缓存
+    WECHAT_CODE_CACHE_TTL: int = 120
     
     class Config:
         # 项目根目录的 .env 文件路径（app/core/config.py → 项目根目录上两级）
         env_file = str(Path(__file__).resolve().parents[2] / ".env")
         case_sensitive = True
 
+    @property
+    def async_database_url(self) -> str:
+        """异步数据库连接字符串"""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        scheme, sep, rest = self.DATABASE_URL.partition("://")
+        if scheme.split("+")[0] in ("postgresql", "postgres"):
+            return f"postgresql+asyncpg{sep}{rest}"
+        return self.DATABASE_URL
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -1,10 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# 创建数据库引擎
+# 创建数据库引擎（同步，供脚本和迁移使用）
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -15,5 +16,22 @@ engine = create_engine(
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 创建异步数据库引擎（asyncpg，供 API 路由使用）
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
+)
+
+# 创建异步会话工厂
+# expire_on_commit=False：提交后对象属性仍可直接访问，避免在异步上下文中触发隐式加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 创建基类
 Base = declarative_base()
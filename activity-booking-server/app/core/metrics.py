@@ -0,0 +1,163 @@
+import os
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import async_redis_binary_pool, async_redis_pool, cache_stats
+from app.core.config import settings
+from app.core.db import async_engine
+
+# 接口大多在毫秒级完成（缓存命中、304），低区间分得更细
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 其他方法归为 other，避免任意方法名产生新的时间序列
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP 请求处理耗时（秒）",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS = Counter("http_requests", "HTTP 请求数", ["method", "route", "status"])
+WECHAT_REQUEST_DURATION = Histogram(
+    "wechat_request_duration_seconds", "微信接口单次调用耗时（秒，不含重试间隔）",
+    ["path", "outcome"], buckets=LATENCY_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """
+    请求指标中间件（纯 ASGI）
+
+    按路由模板（如 /api/activities/{activity_id}）记录延迟直方图和按状态码的请求数，
+    未匹配路由的请求统一记为 unmatched，避免任意路径产生新的时间序列；
+    每个 (方法, 路由, 状态码) 的指标对象只查找一次，之后每个请求只有两次计数。
+    正在处理的请求数只是进程内的整数，抓取时由 RuntimeCollector 读取
+    """
+
+    in_progress = 0
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._endpoint_routes: Dict[object, str] = {}
+        self._children: Dict[Tuple[str, str, int], tuple] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 应用未发送响应就抛出异常时，外层返回 500
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        MetricsMiddleware.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            MetricsMiddleware.in_progress -= 1
+            method = scope["method"] if scope["method"] in _METHODS else "other"
+            duration, requests = self._metrics(method, self._route(scope), status)
+            duration.observe(elapsed)
+            requests.inc()
+
+    def _metrics(self, method: str, route: str, status: int) -> tuple:
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = (
+                HTTP_REQUEST_DURATION.labels(method, route),
+                HTTP_REQUESTS.labels(method, route, str(status))
+            )
+            self._children[key] = children
+        return children
+
+    def _route(self, scope: Scope) -> str:
+        """路由执行后 scope 中带有匹配结果：FastAPI 路由直接取模板，其余（静态文件挂载、文档页）按端点查找"""
+        route = scope.get("route")
+        if route is not None:
+            return route.path_format
+        endpoint = scope.get("endpoint")
+        if endpoint is None or "router" not in scope:
+            return "unmatched"
+        label = self._endpoint_routes.get(endpoint)
+        if label is None:
+            label = next(
+                (
+                    candidate.path_format for candidate in scope["router"].routes
+                    if getattr(candidate, "endpoint", None) is endpoint or getattr(candidate, "app", None) is endpoint
+                ),
+                "unmatched"
+            )
+            self._endpoint_routes[endpoint] = label
+        return label
+
+
+class RuntimeCollector(Collector):
+    """
+    正在处理的请求数、连接池和缓存统计
+
+    抓取时读取当前值，请求路径上没有额外开销；多进程部署时为响应抓取的那个进程的值
+    """
+
+    def collect(self):
+        yield GaugeMetricFamily("http_requests_in_progress", "正在处理的 HTTP 请求数", value=MetricsMiddleware.in_progress)
+
+        pool = async_engine.pool
+        yield GaugeMetricFamily("db_pool_size", "数据库连接池常驻连接数", value=pool.size())
+        yield GaugeMetricFamily("db_pool_max_overflow", "数据库连接池允许的溢出连接数", value=settings.DB_MAX_OVERFLOW)
+        yield GaugeMetricFamily("db_pool_checked_out", "已借出的数据库连接数", value=pool.checkedout())
+        yield GaugeMetricFamily("db_pool_checked_in", "空闲的数据库连接数", value=pool.checkedin())
+        # 连接未建满时 overflow() 为负数
+        yield GaugeMetricFamily("db_pool_overflow", "当前使用的溢出连接数", value=max(pool.overflow(), 0))
+
+        max_connections = GaugeMetricFamily("redis_pool_max_connections", "Redis 连接池连接数上限", labels=["pool"])
+        in_use = GaugeMetricFamily("redis_pool_in_use_connections", "已借出的 Redis 连接数", labels=["pool"])
+        idle = GaugeMetricFamily("redis_pool_idle_connections", "空闲的 Redis 连接数", labels=["pool"])
+        for name, redis_pool in (("text", async_redis_pool), ("binary", async_redis_binary_pool)):
+            max_connections.add_metric([name], redis_pool.max_connections)
+            # redis-py 未提供公开的连接数接口
+            in_use.add_metric([name], len(redis_pool._in_use_connections))
+            idle.add_metric([name], len(redis_pool._available_connections))
+        yield max_connections
+        yield in_use
+        yield idle
+
+        requests = CounterMetricFamily("cache_requests", "缓存访问次数（进程内计数）", labels=["namespace", "result"])
+        for namespace, hits in list(cache_stats.hits.items()):
+            requests.add_metric([namespace, "hit"], hits)
+        for namespace, misses in list(cache_stats.misses.items()):
+            requests.add_metric([namespace, "miss"], misses)
+        yield requests
+
+
+runtime_collector = RuntimeCollector()
+REGISTRY.register(runtime_collector)
+
+
+def _registry() -> CollectorRegistry:
+    """设置了 PROMETHEUS_MULTIPROC_DIR 时汇总各进程写入的请求指标，否则使用当前进程的默认注册表"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(runtime_collector)
+    return registry
+
+
+metrics_registry = _registry()
+
+
+def render_metrics() -> bytes:
+    """生成 Prometheus 文本格式的指标"""
+    return generate_latest(metrics_registry)
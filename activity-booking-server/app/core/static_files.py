@@ -0,0 +1,38 @@
+import os
+import re
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from starlette.responses import Response
+
+# 文件名中带内容指纹的文件，如 cover.3f2a9c1d.webp、app.3f2a9c1d0b.js
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,64}\.[A-Za-z0-9]+$")
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    带缓存策略的静态文件服务
+
+    文件名带内容指纹的文件内容永不变化，设置长期 immutable 缓存，客户端不再重新验证；
+    其余文件可能被原地替换，设置 no-cache，每次携带 If-None-Match 重新验证，
+    未变化时由 StaticFiles 返回 304
+    """
+
+    def __init__(self, *args, immutable_max_age: int = 31536000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_cache_control = f"public, max-age={immutable_max_age}, immutable"
+
+    def file_response(
+        self,
+        full_path: os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        # 按文件名而不是状态码判断：重新验证得到的 304 与 200 使用相同的缓存策略
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if FINGERPRINTED.search(os.fspath(full_path)):
+            response.headers["Cache-Control"] = self.immutable_cache_control
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
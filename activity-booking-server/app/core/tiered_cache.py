@@ -0,0 +1,285 @@
+import asyncio
+import functools
+import logging
+import struct
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.cache import get_async_redis, cache_stats
+
+logger = logging.getLogger(__name__)
+
+# 跨进程失效通知频道，消息格式：命名空间 + "\0" + 键（键为空表示整个命名空间）
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Redis 值头部：8 字节大端 double，表示新鲜截止时间（Unix 秒）
+_HEADER = struct.Struct(">d")
+
+Loader = Callable[[], Awaitable[Optional[bytes]]]
+
+
+class LRUCache:
+    """进程内有界 LRU 缓存，条目带新鲜期和过期时间"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[bytes, float, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """返回 (值, 新鲜截止时间)，不存在或已过期返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, fresh_until, expires_at = entry
+        if time.time() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value, fresh_until
+
+    def set(self, key: str, value: bytes, fresh_until: float, expires_at: float) -> None:
+        self._data[key] = (value, fresh_until, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    """
+    两级缓存：进程内 LRU + Redis
+
+    - 过了新鲜期但仍在 stale_ttl 内的条目可以继续返回（stale-while-revalidate），
+      同一时刻只有一个请求（跨进程通过 Redis 锁选出）负责重新计算
+    - 完全未命中时，同一进程内同一个键只会有一个请求执行加载，其余请求等待其结果
+    - 失效时通过 Redis pub/sub 通知所有进程清理本地 LRU
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int,
+        stale_ttl: int = 0,
+        local_ttl: Optional[int] = None,
+        maxsize: int = 1024,
+        lock_timeout: int = 10,
+        enabled: bool = True
+    ):
+        self.namespace = namespace
+        self.enabled = enabled
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local_ttl = ttl + stale_ttl if local_ttl is None else local_ttl
+        self.lock_timeout = lock_timeout
+        self.local = LRUCache(maxsize)
+        self.client = get_async_redis(decode_responses=False)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        invalidation_bus.register(self)
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"cache:{self.namespace}:__keys__"
+
+    async def get_or_load(self, key: str, loader: Loader) -> Optional[bytes]:
+        """读取缓存，未命中或已过新鲜期时调用 loader 重新计算"""
+        if not self.enabled:
+            return await loader()
+
+        now = time.time()
+
+        cached = self.local.get(key)
+        if cached is None:
+            cached = await self._get_remote(key, now)
+        if cached is not None:
+            value, fresh_until = cached
+            cache_stats.record(self.namespace, True)
+            if now < fresh_until or key in self._inflight:
+                return value
+            # 已过新鲜期：抢到刷新权的请求重新计算，其余请求直接返回旧值
+            if await self._acquire_refresh_lock(key):
+                try:
+                    return await self._single_flight(key, loader)
+                finally:
+                    await self._release_refresh_lock(key)
+            return value
+
+        cache_stats.record(self.namespace, False)
+        return await self._single_flight(key, loader)
+
+    async def _single_flight(self, key: str, loader: Loader) -> Optional[bytes]:
+        """同一进程内合并对同一个键的并发加载"""
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            if value is not None:
+                await self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # 避免无人等待时出现 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _get_remote(self, key: str, now: float) -> Optional[Tuple[bytes, float]]:
+        try:
+            raw = await self.client.get(self._redis_key(key))
+        except RedisError:
+            logger.warning("读取缓存失败: %s:%s", self.namespace, key, exc_info=True)
+            return None
+        if raw is None or len(raw) < _HEADER.size:
+            return None
+        (fresh_until,) = _HEADER.unpack_from(raw)
+        value = raw[_HEADER.size:]
+        self.local.set(key, value, fresh_until, min(now + self.local_ttl, fresh_until + self.stale_ttl))
+        return value, fresh_until
+
+    async def set(self, key: str, value: bytes) -> None:
+        """写入两级缓存"""
+        now = time.time()
+        fresh_until = now + self.ttl
+        self.local.set(key, value, fresh_until, now + min(self.local_ttl, self.ttl + self.stale_ttl))
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(self._redis_key(key), _HEADER.pack(fresh_until) + value, ex=self.ttl + self.stale_ttl)
+            pipe.sadd(self._index_key, key)
+            pipe.expire(self._index_key, self.ttl + self.stale_ttl)
+            await pipe.execute()
+        except RedisError:
+            logger.warning("写入缓存失败: %s:%s", self.namespace, key, exc_info=True)
+
+    async def invalidate(self, *keys: str) -> None:
+        """失效指定键；不传键时失效整个命名空间。所有进程的本地 LRU 会同步清理"""
+        try:
+            if keys:
+                for key in keys:
+                    self.local.delete(key)
+                pipe = self.client.pipeline(transaction=False)
+                pipe.delete(*(self._redis_key(key) for key in keys))
+                pipe.srem(self._index_key, *keys)
+                for key in keys:
+                    pipe.publish(INVALIDATION_CHANNEL, f"{self.namespace}\0{key}")
+                await pipe.execute()
+            else:
+                self.local.clear()
+                members = await self.client.smembers(self._index_key)
+                pipe = self.client.pipeline(transaction=False)
+                redis_keys = [self._redis_key(member.decode()) for member in members]
+                for i in range(0, len(redis_keys), 500):
+                    pipe.delete(*redis_keys[i:i + 500])
+                pipe.delete(self._index_key)
+                pipe.publish(INVALIDATION_CHANNEL, f"{self.namespace}\0")
+                await pipe.execute()
+        except RedisError:
+            logger.warning("失效缓存失败: %s:%s", self.namespace, keys, exc_info=True)
+
+    def invalidate_local(self, key: str) -> None:
+        """处理失效通知：仅清理本进程 LRU"""
+        if key:
+            self.local.delete(key)
+        else:
+            self.local.clear()
+
+    async def _acquire_refresh_lock(self, key: str) -> bool:
+        try:
+            return bool(await self.client.set(
+                f"cache:{self.namespace}:lock:{key}", b"1", nx=True, ex=self.lock_timeout
+            ))
+        except RedisError:
+            # Redis 不可用时退化为进程内单飞
+            return True
+
+    async def _release_refresh_lock(self, key: str) -> None:
+        try:
+            await self.client.delete(f"cache:{self.namespace}:lock:{key}")
+        except RedisError:
+            pass
+
+
+class InvalidationBus:
+    """订阅失效频道，把其他进程发出的失效通知分发给本进程的 TieredCache"""
+
+    def __init__(self):
+        self._caches: Dict[str, TieredCache] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, cache: TieredCache) -> None:
+        self._caches[cache.namespace] = cache
+
+    def dispatch(self, message: bytes) -> None:
+        namespace, _, key = message.decode().partition("\0")
+        cache = self._caches.get(namespace)
+        if cache is not None:
+            cache.invalidate_local(key)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_async_redis(decode_responses=False).pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("缓存失效订阅中断，稍后重连", exc_info=True)
+                # 断线期间可能错过失效通知，清空本地缓存
+                for cache in self._caches.values():
+                    cache.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+invalidation_bus = InvalidationBus()
+
+
+def cached(cache: TieredCache, key: Callable[..., str]):
+    """
+    缓存装饰器，用于返回 bytes 的异步方法
+
+    用法：
+        @cached(hot_cache, key=lambda self, limit=10: str(limit))
+        async def get_hot_activities_json(self, limit: int = 10) -> bytes: ...
+    """
+    def decorator(func: Callable[..., Awaitable[Optional[bytes]]]):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_load(key(*args, **kwargs), lambda: func(*args, **kwargs))
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,57 @@
+import logging
+from typing import Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """
+    工作单元：一个业务操作对应一个事务
+
+    仓储方法只执行 SQL / flush，不提交；服务层用 `async with self.uow:` 包住整个写操作，
+    正常退出时提交一次，抛出异常时回滚。缓存失效等副作用通过 after_commit 注册，
+    只在事务提交成功后执行；回调失败只记录日志，不影响已提交的操作和其余回调
+
+    用法：
+        async with self.uow:
+            booking = await self.booking_repo.create(data)
+            self.uow.after_commit(lambda: activity_cache.invalidate(activity_id))
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._after_commit: List[Callable[[], Awaitable]] = []
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    def after_commit(self, callback: Callable[[], Awaitable]) -> None:
+        """注册提交成功后执行的回调"""
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        """提交事务并执行回调"""
+        try:
+            await self.db.commit()
+        except Exception:
+            self._after_commit.clear()
+            raise
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                logger.exception("提交后回调执行失败: %r", callback)
+
+    async def rollback(self) -> None:
+        """回滚事务，丢弃已注册的回调"""
+        self._after_commit.clear()
+        await self.db.rollback()
@@ -1,12 +1,50 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import ORJSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from app.api import auth, users, activities, bookings
+from app.api import auth, users, activities, bookings, checkin, discovery
 from app.core.config import settings
+from app.core.cache import async_redis_pool, async_redis_binary_pool, cache_stats
+from app.core.compression import CompressionMiddleware
+from app.core.db import async_engine
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.static_files import CachedStaticFiles
+from app.core.tiered_cache import invalidation_bus
+from app.services.cover_images import cover_images
+from app.services.hot_ranking import hot_ranking, run_hot_ranking_rebuild
+from app.services.seat_inventory import seat_inventory, run_booked_count_sync
+from app.utils.wechat import wechat_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动后台任务，关闭时释放数据库、Redis、微信接口连接池和图片处理进程池"""
+    stop = asyncio.Event()
+    await wechat_client.start()
+    invalidation_bus.start()
+    cover_images.start()
+    tasks = []
+    if seat_inventory.enabled:
+        tasks.append(asyncio.create_task(run_booked_count_sync(stop)))
+    if hot_ranking.enabled:
+        tasks.append(asyncio.create_task(run_hot_ranking_rebuild(stop)))
+
+    yield
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await cover_images.close()
+    await invalidation_bus.stop()
+    await wechat_client.close()
+    await async_redis_pool.disconnect()
+    await async_redis_binary_pool.disconnect()
+    await async_engine.dispose()
+
 
 # 创建应用实例
 app = FastAPI(
@@ -16,6 +54,7 @@ app = FastAPI(
     redoc_url="/redoc",
     # 使用 ORJSONResponse 提高性能，并确保正确序列化
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # 配置CORS
@@ -27,16 +66,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩（位于 CORS 外层、请求指标内层）
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# 请求指标（最后添加，位于最外层：记录的延迟包含压缩耗时，状态码为最终状态；不记录响应大小）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
-# 静态文件服务
+# 静态文件服务（带内容指纹的文件长期缓存，其余文件按 ETag 重新验证）
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+app.mount(
+    "/static",
+    CachedStaticFiles(directory=static_dir, immutable_max_age=settings.STATIC_IMMUTABLE_MAX_AGE),
+    name="static"
+)
 
 # 注册路由
 app.include_router(auth.router, prefix=f"{settings.API_PREFIX}/auth", tags=["认证"])
 app.include_router(users.router, prefix=f"{settings.API_PREFIX}/users", tags=["用户"])
 app.include_router(activities.router, prefix=f"{settings.API_PREFIX}/activities", tags=["活动"])
 app.include_router(bookings.router, prefix=f"{settings.API_PREFIX}/bookings", tags=["预约"])
+app.include_router(checkin.router, prefix=f"{settings.API_PREFIX}/checkin", tags=["签到"])
+app.include_router(discovery.router, prefix=f"{settings.API_PREFIX}/discovery", tags=["发现"])
 
 
 @app.get("/")
@@ -54,6 +111,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_health():
+    """缓存命中统计（当前进程）"""
+    return cache_stats.snapshot()
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus 指标"""
+        return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
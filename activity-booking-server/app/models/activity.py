@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import Integer, String, Text, DateTime, Float, Boolean
+from sqlalchemy import Integer, String, Text, DateTime, Float, Boolean, Index, text, event, inspect
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
+from app.utils.geo import encode as encode_geohash
+from app.utils.search import build_document
 
 if TYPE_CHECKING:
     from app.models.booking import Booking
@@ -13,12 +16,31 @@ if TYPE_CHECKING:
 class Activity(Base):
     """活动模型"""
     __tablename__ = "activities"
+    __table_args__ = (
+        # 活动列表键集分页：按 (start_time, id) 顺序翻页，仅覆盖启用的活动
+        Index("idx_activities_active_start_time", "start_time", "id", postgresql_where=text("is_active")),
+        # 全文检索；标题的 pg_trgm 模糊匹配索引依赖扩展，由迁移脚本创建
+        Index("idx_activities_search_vector", "search_vector", postgresql_using="gin"),
+        # 附近的活动：按 geohash 前缀范围扫描（C 排序规则），仅覆盖启用的活动；
+        # 附带计算距离和过滤所需的列，候选活动只读索引
+        Index(
+            "idx_activities_active_geohash", "geohash",
+            postgresql_include=["latitude", "longitude", "end_time", "id"],
+            postgresql_where=text("is_active")
+        ),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False, comment="活动标题")
     description: Mapped[Optional[str]] = mapped_column(Text, comment="活动描述")
     cover_image: Mapped[Optional[str]] = mapped_column(String(500), comment="封面图片")
+    # 上传封面后生成的多尺寸 WebP/AVIF：{"thumbnail", "hero", "webp", "avif"}，webp/avif 为 srcset
+    cover_srcset: Mapped[Optional[dict]] = mapped_column(JSONB(none_as_null=True), comment="封面图的多尺寸版本")
     location: Mapped[Optional[str]] = mapped_column(String(200), comment="活动地点")
+    latitude: Mapped[Optional[float]] = mapped_column(Float, comment="纬度（WGS84）")
+    longitude: Mapped[Optional[float]] = mapped_column(Float, comment="经度（WGS84）")
+    # 由经纬度计算，前缀相同的活动在地理上相邻
+    geohash: Mapped[Optional[str]] = mapped_column(String(12, collation="C"), comment="经纬度的 geohash")
     organizer: Mapped[Optional[str]] = mapped_column(String(100), comment="主办方")
     start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, comment="开始时间")
     end_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, comment="结束时间")
@@ -28,7 +50,39 @@ class Activity(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, comment="是否启用")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, comment="创建时间")
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
+    # 应用侧分词后的检索向量，读取活动时默认不加载
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True, comment="全文检索向量")
     
     # 关系
     bookings: Mapped[List["Booking"]] = relationship("Booking", back_populates="activity")
 
+
+# 参与全文检索的字段及权重（A 最高）
+SEARCH_FIELDS = (("title", "A"), ("organizer", "B"), ("location", "B"), ("description", "C"))
+
+
+def build_search_vector(activity) -> str:
+    """按活动的检索字段构建 tsvector 字面量"""
+    return build_document([(getattr(activity, field), weight) for field, weight in SEARCH_FIELDS])
+
+
+def build_geohash(activity) -> Optional[str]:
+    """按活动的经纬度计算 geohash，未设置坐标时为空"""
+    if activity.latitude is None or activity.longitude is None:
+        return None
+    return encode_geohash(activity.latitude, activity.longitude)
+
+
+@event.listens_for(Activity, "before_insert")
+def _set_search_vector_on_insert(mapper, connection, target: Activity):
+    target.search_vector = build_search_vector(target)
+    target.geohash = build_geohash(target)
+
+
+@event.listens_for(Activity, "before_update")
+def _set_search_vector_on_update(mapper, connection, target: Activity):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field, _ in SEARCH_FIELDS):
+        target.search_vector = build_search_vector(target)
+    if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+        target.geohash = build_geohash(target)
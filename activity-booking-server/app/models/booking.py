@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -23,6 +23,14 @@ class BookingStatus(str, Enum):
 class Booking(Base):
     """预约模型"""
     __tablename__ = "bookings"
+    __table_args__ = (
+        # 我的预约键集分页：按 (created_at, id) 倒序翻页
+        Index("idx_bookings_user_created", "user_id", "created_at", "id"),
+        # 活动的全部预约，同时覆盖删除活动时的外键检查
+        Index("idx_bookings_activity", "activity_id"),
+        # 活动的已确认预约及计数（枚举按名称存储），计数可走仅索引扫描
+        Index("idx_bookings_activity_confirmed", "activity_id", postgresql_where=text("status = 'CONFIRMED'")),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, comment="用户ID")
@@ -26,6 +26,7 @@ class User(Base):
     city: Mapped[Optional[str]] = mapped_column(String(50), comment="城市")
     language: Mapped[Optional[str]] = mapped_column(String(20), comment="语言")
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, comment="是否激活")
+    is_staff: Mapped[bool] = mapped_column(Boolean, default=False, comment="是否工作人员（可为他人签到）")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, comment="创建时间")
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
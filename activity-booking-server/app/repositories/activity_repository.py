@@ -1,74 +1,397 @@
-from typing import Optional, List
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, List, Dict, Tuple
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import Float, Integer, Select, and_, column, or_, select, func, update, cast, false, literal, tuple_, values
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity import Activity
+from app.models.booking import Booking, BookingStatus
 from app.repositories.base import BaseRepository
+from app.repositories.projection import Projection
+from app.utils.geo import EARTH_RADIUS, covering_cells
+from app.utils.search import build_query
+
+# 附近查询的首圈搜索宽度（米）
+NEARBY_INITIAL_WIDTH = 1000
+# 列表项中描述摘要的最大字符数
+SUMMARY_DESCRIPTION_LENGTH = 100
+
+
+@dataclass(slots=True)
+class ActivitySummaryRow:
+    """活动列表项：列表卡片展示的标题、封面、简介、时间、地点、价格和名额；描述只取开头一段"""
+    id: int
+    title: str
+    cover_image: Optional[str]
+    cover_srcset: Optional[dict]
+    description: Optional[str]
+    start_time: datetime
+    end_time: datetime
+    location: Optional[str]
+    price: float
+    max_participants: int
+    booked_count: int
+
+
+ACTIVITY_SUMMARY: Projection[ActivitySummaryRow] = Projection(
+    Activity,
+    dto=ActivitySummaryRow,
+    expressions={"description": func.left(Activity.description, SUMMARY_DESCRIPTION_LENGTH)}
+)
 
 
 class ActivityRepository(BaseRepository[Activity]):
     """活动数据访问层"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         super().__init__(Activity, db)
 
-    def get_active_activities(self, skip: int = 0, limit: int = 100) -> List[Activity]:
-        """获取启用的活动列表"""
-        query = select(Activity).where(Activity.is_active).offset(skip).limit(limit)
-        result = self.db.scalars(query).all()
-        return list(result)
+    @staticmethod
+    def _match(keyword: str):
+        """全文检索条件（走 search_vector 的 GIN 索引），关键词无可检索内容时不匹配任何活动"""
+        tsquery = build_query(keyword)
+        if tsquery is None:
+            return false()
+        return Activity.search_vector.op("@@")(cast(literal(tsquery), TSQUERY))
+
+    @classmethod
+    def _active_filters(cls, keyword: Optional[str] = None) -> list:
+        """启用活动的过滤条件（可按关键词全文检索）"""
+        filters = [Activity.is_active]
+        if keyword:
+            filters.append(cls._match(keyword))
+        return filters
+
+    def _active_query(self, keyword: Optional[str] = None, projection: Optional[Projection] = None) -> Select:
+        return self.select_as(projection).where(*self._active_filters(keyword))
 
-    def count_active_activities(self) -> int:
+    async def get_active_activities(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        keyword: Optional[str] = None,
+        projection: Optional[Projection] = None
+    ) -> list:
+        """获取启用的活动列表（偏移分页），指定 projection 时只查询投影列"""
+        query = self._active_query(keyword, projection).order_by(Activity.start_time, Activity.id)
+        return await self.fetch_all(query.offset(skip).limit(limit), projection)
+
+    async def get_active_activities_after(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        keyword: Optional[str] = None,
+        projection: Optional[Projection] = None
+    ) -> list:
+        """获取启用的活动列表（按 (start_time, id) 键集分页），指定 projection 时只查询投影列"""
+        query = self.paginate_after(self._active_query(keyword, projection), Activity.start_time, after, limit)
+        return await self.fetch_all(query, projection)
+
+    async def count_active_activities(self, keyword: Optional[str] = None) -> int:
         """获取启用的活动总数"""
-        query = select(Activity).where(Activity.is_active)
-        return self.db.scalar(select(func.count()).select_from(query.subquery()))
-    
-    def search_by_title(self, keyword: str) -> List[Activity]:
-        """根据标题搜索活动"""
-        query = select(Activity).where(
-            Activity.is_active,
-            Activity.title.contains(keyword)
+        query = select(func.count()).select_from(Activity).where(*self._active_filters(keyword))
+        return await self.db.scalar(query)
+
+    async def estimate_active_activities(self, keyword: Optional[str] = None) -> int:
+        """估算启用的活动总数：读取查询计划器的行数估计，不扫描数据"""
+        query = select(Activity.id).where(*self._active_filters(keyword))
+        # 关键词等条件仍作为绑定参数传给驱动，不拼接进 SQL
+        compiled = query.compile(dialect=self.db.bind.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        connection = await self.db.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+        plan = result.scalar()
+        if isinstance(plan, (str, bytes)):
+            plan = orjson.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def search(
+        self,
+        keyword: str,
+        skip: int = 0,
+        limit: int = 10
+    ) -> List[Tuple[Activity, float]]:
+        """
+        全文检索启用的活动，按相关度排序，返回 [(活动, 相关度)]
+
+        对全部命中计算相关度并排序后再分页（截断未排序的命中会漏掉最相关的结果），
+        子查询只读取 id 和相关度，只为当前页回表读取完整的活动
+        """
+        tsquery = build_query(keyword)
+        if tsquery is None:
+            return []
+        query_vector = cast(literal(tsquery), TSQUERY)
+        score = func.ts_rank_cd(Activity.search_vector, query_vector)
+        ranked = (
+            select(Activity.id, Activity.start_time, score.label("score"))
+            .where(Activity.is_active, Activity.search_vector.op("@@")(query_vector))
+            .order_by(score.desc(), Activity.start_time, Activity.id)
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        query = (
+            select(Activity, ranked.c.score)
+            .join(ranked, Activity.id == ranked.c.id)
+            .order_by(ranked.c.score.desc(), ranked.c.start_time, Activity.id)
+        )
+        result = await self.db.execute(query)
+        return [(activity, score) for activity, score in result]
+
+    async def fuzzy_search(self, keyword: str, limit: int = 10) -> List[Tuple[Activity, float]]:
+        """按标题模糊匹配（pg_trgm 词相似度，容忍错别字），返回 [(活动, 相似度)]"""
+        score = func.word_similarity(keyword, Activity.title)
+        query = (
+            select(Activity, score)
+            .where(Activity.is_active, literal(keyword).op("<%")(Activity.title))
+            .order_by(score.desc(), Activity.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return [(activity, score) for activity, score in result]
+
+    async def get_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        after: Optional[Tuple[float, int]] = None,
+        limit: int = 10
+    ) -> List[Tuple[Activity, float]]:
+        """
+        获取半径 radius（米）内进行中和未开始的活动，按 (距离, id) 键集分页，返回 [(活动, 距离)]
+
+        从游标位置向外逐圈扩大搜索半径（每次宽度放大 4 倍），取满一页即返回：
+        较小半径内已有 limit 个活动时，更远处的活动不可能排在它们之前。
+        大半径查询在活动密集的区域也只需扫描附近的少量候选
+        """
+        start = after[0] if after else 0.0
+        width = NEARBY_INITIAL_WIDTH
+        while True:
+            search_radius = min(radius, start + width)
+            rows = await self._get_nearby_within(latitude, longitude, search_radius, after, limit)
+            if len(rows) >= limit or search_radius >= radius:
+                return rows
+            width *= 4
+
+    async def _get_nearby_within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        after: Optional[Tuple[float, int]],
+        limit: int
+    ) -> List[Tuple[Activity, float]]:
+        """
+        按覆盖圆的 geohash 网格做前缀范围扫描取出候选（geohash 部分索引，仅索引扫描），
+        再按球面距离过滤和排序，只为最终一页回表读取活动
+        """
+        # 网格内的 geohash 都以网格前缀开头，且小于「前缀 + ~」（C 排序规则下 ~ 大于所有 base32 字符）
+        in_cells = or_(*(
+            and_(Activity.geohash >= cell, Activity.geohash < cell + "~")
+            for cell in covering_cells(latitude, longitude, radius)
+        ))
+        lat, lon = func.radians(Activity.latitude), func.radians(Activity.longitude)
+        origin_lat, origin_lon = math.radians(latitude), math.radians(longitude)
+        haversine = (
+            func.power(func.sin((lat - origin_lat) / 2), 2)
+            + math.cos(origin_lat) * func.cos(lat) * func.power(func.sin((lon - origin_lon) / 2), 2)
+        )
+        candidates = (
+            select(Activity.id, (2 * EARTH_RADIUS * func.asin(func.least(1.0, func.sqrt(haversine)))).label("distance"))
+            .where(Activity.is_active, in_cells, Activity.end_time > datetime.now())
+            .subquery()
         )
-        result = self.db.scalars(query).all()
-        return list(result)
-    
-    def get_hot_activities(self, limit: int = 10) -> List[Activity]:
+        nearest = (
+            select(candidates.c.id, candidates.c.distance)
+            .where(candidates.c.distance <= radius)
+            .order_by(candidates.c.distance, candidates.c.id)
+            .limit(limit)
+        )
+        if after is not None:
+            nearest = nearest.where(tuple_(candidates.c.distance, candidates.c.id) > tuple_(*after))
+        nearest = nearest.subquery()
+        query = (
+            select(Activity, nearest.c.distance)
+            .join(nearest, Activity.id == nearest.c.id)
+            .order_by(nearest.c.distance, nearest.c.id)
+        )
+        result = await self.db.execute(query)
+        return [(activity, distance) for activity, distance in result]
+
+    async def get_hot_activities(self, limit: int = 10) -> List[Activity]:
         """获取热门活动（按预约人数排序）"""
         query = select(Activity).where(
             Activity.is_active
         ).order_by(Activity.booked_count.desc()).limit(limit)
-        result = self.db.scalars(query).all()
-        return list(result)
-
-    def increment_booked_count(self, activity_id: int, count: int = 1) -> bool:
-        """增加活动预约人数"""
-        activity = self.get_by_id(activity_id)
-        if activity:
-            activity.booked_count += count
-            self.db.commit()
-            return True
-        return False
-
-    def decrement_booked_count(self, activity_id: int, count: int = 1) -> bool:
-        """减少活动预约人数"""
-        activity = self.get_by_id(activity_id)
-        if activity:
-            activity.booked_count -= count
-            self.db.commit()
-            return True
-        return False
-
-    def get_activity_with_bookings(self, activity_id: int) -> Optional[Activity]:
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def get_hot_scores(
+        self,
+        epoch: datetime,
+        half_life: float,
+        new_boost: float,
+        since: datetime
+    ) -> List[Tuple[int, datetime, float]]:
+        """
+        计算进行中和未开始活动的热度分数，返回 [(活动ID, 结束时间, 分数)]
+
+        分数为 since 之后有效预约（已确认、已签到）人数的指数衰减和，加上发布时的初始热度；
+        每项贡献按 2^((时间 - epoch) / 半衰期) 计权，与 Redis 排行的增量更新一致
+        """
+        def decay(moment):
+            # 指数下限防止很早以前的时间下溢
+            exponent = cast(func.extract("epoch", moment - epoch), Float) / half_life
+            return func.power(2.0, func.greatest(exponent, -1000))
+
+        booked = (
+            select(Booking.activity_id, func.sum(Booking.participants * decay(Booking.created_at)).label("score"))
+            .where(
+                Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.COMPLETED]),
+                Booking.created_at > since
+            )
+            .group_by(Booking.activity_id)
+            .subquery()
+        )
+        query = (
+            select(
+                Activity.id,
+                Activity.end_time,
+                new_boost * decay(Activity.created_at) + func.coalesce(booked.c.score, 0)
+            )
+            .outerjoin(booked, booked.c.activity_id == Activity.id)
+            .where(Activity.is_active, Activity.end_time > datetime.now())
+        )
+        result = await self.db.execute(query)
+        return [(activity_id, end_time, float(score)) for activity_id, end_time, score in result]
+
+    async def reserve_seats(self, activity_id: int, count: int = 1) -> Optional[Activity]:
+        """
+        原子占座：在一条条件 UPDATE 中完成容量检查和计数递增
+        活动不存在、已停用或剩余名额不足时返回 None，不提交事务
+        """
+        query = (
+            update(Activity)
+            .where(
+                Activity.id == activity_id,
+                Activity.is_active,
+                Activity.booked_count + count <= Activity.max_participants
+            )
+            .values(booked_count=Activity.booked_count + count)
+            .returning(Activity)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return await self.db.scalar(query)
+
+    async def reserve_seats_many(self, seats: Dict[int, int]) -> Dict[int, Activity]:
+        """
+        批量原子占座：seats 为 {活动ID: 人数}，一条 UPDATE ... FROM (VALUES ...) 完成所有活动的
+        容量检查和计数递增。每个活动整体成功或失败，返回占座成功的活动，不提交事务
+        """
+        requested = values(
+            column("id", Integer), column("seats", Integer), name="requested"
+        ).data(list(seats.items()))
+        query = (
+            update(Activity)
+            .where(
+                Activity.id == requested.c.id,
+                Activity.is_active,
+                Activity.booked_count + requested.c.seats <= Activity.max_participants
+            )
+            .values(booked_count=Activity.booked_count + requested.c.seats)
+            .returning(Activity)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self.db.scalars(query)
+        return {activity.id: activity for activity in result.all()}
+
+    async def release_seats(self, activity_id: int, count: int = 1) -> bool:
+        """原子释放名额（不会减到负数），不提交事务"""
+        query = (
+            update(Activity)
+            .where(Activity.id == activity_id, Activity.booked_count >= count)
+            .values(booked_count=Activity.booked_count - count)
+            .returning(Activity.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
+
+    async def increment_booked_count(self, activity_id: int, count: int = 1) -> bool:
+        """增加活动预约人数，不提交事务"""
+        query = (
+            update(Activity)
+            .where(Activity.id == activity_id)
+            .values(booked_count=Activity.booked_count + count)
+            .returning(Activity.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
+
+    async def decrement_booked_count(self, activity_id: int, count: int = 1) -> bool:
+        """减少活动预约人数，不提交事务"""
+        return await self.release_seats(activity_id, count)
+
+    @staticmethod
+    def _confirmed_seats():
+        """按预约表统计活动已确认人数的关联子查询"""
+        return (
+            select(func.coalesce(func.sum(Booking.participants), 0))
+            .where(
+                Booking.activity_id == Activity.id,
+                Booking.status == BookingStatus.CONFIRMED
+            )
+            .scalar_subquery()
+        )
+
+    async def get_seat_snapshots(self, activity_ids: List[int]) -> Dict[int, Tuple[int, bool, int]]:
+        """批量获取活动座位快照：{活动ID: (最大人数, 是否启用, 预约表已确认人数)}"""
+        query = select(
+            Activity.id,
+            Activity.max_participants,
+            Activity.is_active,
+            self._confirmed_seats()
+        ).where(Activity.id.in_(activity_ids))
+        result = await self.db.execute(query)
+        return {row[0]: (row[1], row[2], int(row[3])) for row in result}
+
+    async def sync_booked_counts(self, activity_ids: List[int]) -> None:
+        """按预约表重算 booked_count（仅更新有差异的行），不提交事务"""
+        confirmed = self._confirmed_seats()
+        query = (
+            update(Activity)
+            .where(Activity.id.in_(activity_ids), Activity.booked_count != confirmed)
+            .values(booked_count=confirmed)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(query)
+
+    async def update_cover(self, activity_id: int, cover_image: str, cover_srcset: dict) -> bool:
+        """设置封面图及其多尺寸版本（单条 UPDATE），不提交事务"""
+        query = (
+            update(Activity)
+            .where(Activity.id == activity_id)
+            .values(cover_image=cover_image, cover_srcset=cover_srcset, updated_at=datetime.now())
+            .returning(Activity.id)
+        )
+        return await self.db.scalar(query) is not None
+
+    async def get_activity_with_bookings(self, activity_id: int) -> Optional[Activity]:
         """获取活动及其预约信息"""
         query = select(Activity).where(Activity.id == activity_id)
-        return self.db.scalar(query)
-
-    def soft_delete(self, activity_id: int) -> bool:
-        """软删除活动（设置为不启用）"""
-        activity = self.get_by_id(activity_id)
-        if activity:
-            activity.is_active = False
-            self.db.commit()
-            return True
-        return False
+        return await self.db.scalar(query)
+
+    async def soft_delete(self, activity_id: int) -> bool:
+        """软删除活动（设置为不启用），不提交事务"""
+        query = (
+            update(Activity)
+            .where(Activity.id == activity_id)
+            .values(is_active=False)
+            .returning(Activity.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
@@ -1,66 +1,150 @@
-from typing import TypeVar, Generic, Optional, List, Dict, Any, Type
+from enum import Enum
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Type, Tuple, Mapping
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, delete, select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.repositories.projection import Projection
 
 T = TypeVar('T')
 
+
+class Load(str, Enum):
+    """关系加载策略"""
+    SELECTIN = "selectin"  # 额外一条 IN 查询批量加载，适合一对多
+    JOINED = "joined"      # 在同一条查询中 LEFT JOIN，适合多对一
+    RAISE = "raise"        # 不加载，访问时报错
+
+
+# 关系名 -> 加载策略
+Loads = Mapping[str, Load]
+
+_LOADERS = {
+    Load.SELECTIN: selectinload,
+    Load.JOINED: joinedload,
+    Load.RAISE: raiseload,
+}
+
+
 class BaseRepository(Generic[T]):
     """基础 Repository 类，提供通用的数据访问方法"""
-    
-    def __init__(self, model: Type[T], db: Session):
+
+    def __init__(self, model: Type[T], db: AsyncSession):
         self.model = model
         self.db = db
-    
-    def get_by_id(self, id: int) -> Optional[T]:
+
+    def with_loads(self, query: Select, load: Optional[Loads]) -> Select:
+        """
+        按声明为查询附加关系加载策略
+
+        load 为 {关系名: 策略}，为 None 时不附加任何选项。声明了 load 时其余关系一律
+        raiseload，序列化时访问未声明的关系会立即报错，而不是逐行触发查询（N+1）
+        """
+        if load is None:
+            return query
+        options = [_LOADERS[strategy](getattr(self.model, name)) for name, strategy in load.items()]
+        return query.options(*options, raiseload("*"))
+
+    def select_as(self, projection: Optional[Projection] = None) -> Select:
+        """查询完整实体，或按投影只查询部分列"""
+        return select(self.model) if projection is None else projection.select()
+
+    async def fetch_all(self, query: Select, projection: Optional[Projection] = None) -> list:
+        """执行 select_as 构建的查询：实体查询返回 ORM 对象，投影查询返回 DTO 或结果行"""
+        if projection is None:
+            result = await self.db.scalars(query)
+            return list(result.all())
+        return projection.build(await self.db.execute(query))
+
+    async def get_by_id(self, id: int, load: Optional[Loads] = None) -> Optional[T]:
         """根据 ID 获取单个记录"""
-        query = select(self.model).where(self.model.id == id)
-        return self.db.scalar(query)
-    
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+        query = self.with_loads(select(self.model).where(self.model.id == id), load)
+        return await self.db.scalar(query)
+
+    async def get_by_ids(self, ids: List[int], load: Optional[Loads] = None) -> Dict[int, T]:
+        """按 ID 批量获取记录：{ID: 记录}，不存在的 ID 不在结果中"""
+        query = self.with_loads(select(self.model).where(self.model.id.in_(ids)), load)
+        result = await self.db.scalars(query)
+        return {obj.id: obj for obj in result.all()}
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
         """获取所有记录（分页）"""
         query = select(self.model).offset(skip).limit(limit)
-        result = self.db.scalars(query).all()
-        return list(result)
-    
-    def count(self) -> int:
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    def paginate_after(
+        self,
+        query: Select,
+        sort_column: Any,
+        after: Optional[Tuple[Any, int]],
+        limit: int,
+        descending: bool = False
+    ) -> Select:
+        """
+        键集分页：按 (sort_column, id) 排序，从游标 after 之后取 limit 条
+
+        使用行值比较 (sort_column, id) > (:sort, :id)，配合 (sort_column, id) 复合索引
+        直接定位到游标位置，翻页深度不影响查询耗时
+        """
+        key = tuple_(sort_column, self.model.id)
+        if after is not None:
+            bound = tuple_(*after)
+            query = query.where(key < bound if descending else key > bound)
+        if descending:
+            query = query.order_by(sort_column.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), self.model.id.asc())
+        return query.limit(limit)
+
+    async def get_page(
+        self,
+        after: Optional[Tuple[Any, int]] = None,
+        limit: int = 100,
+        descending: bool = False
+    ) -> List[T]:
+        """获取所有记录（按创建时间键集分页）"""
+        query = self.paginate_after(select(self.model), self.model.created_at, after, limit, descending)
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def count(self) -> int:
         """获取记录总数"""
         query = select(func.count()).select_from(self.model)
-        return self.db.scalar(query)
-    
-    def create(self, obj_in: Dict[str, Any]) -> T:
-        """创建新记录"""
+        return await self.db.scalar(query)
+
+    async def create(self, obj_in: Dict[str, Any]) -> T:
+        """
+        新增记录并 flush，不提交事务
+
+        主键由 INSERT ... RETURNING 回填，其余字段均为应用侧默认值，flush 后即可直接使用，
+        不需要再 refresh 查询一次
+        """
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        await self.db.flush()
         return db_obj
-    
-    def update(self, db_obj: T, obj_in: Dict[str, Any]) -> T:
-        """更新记录"""
+
+    async def update(self, db_obj: T, obj_in: Dict[str, Any]) -> T:
+        """更新记录并 flush，不提交事务"""
         for field, value in obj_in.items():
             setattr(db_obj, field, value)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        await self.db.flush()
         return db_obj
-    
-    def delete(self, id: int) -> bool:
-        """删除记录"""
-        query = select(self.model).where(self.model.id == id)
-        obj = self.db.scalar(query)
-        if obj:
-            self.db.delete(obj)
-            self.db.commit()
-            return True
-        return False
-    
-    def filter_by(self, **kwargs) -> List[T]:
+
+    async def delete(self, id: int) -> bool:
+        """按 ID 删除记录（单条 DELETE ... RETURNING），不提交事务"""
+        query = delete(self.model).where(self.model.id == id).returning(self.model.id)
+        return await self.db.scalar(query) is not None
+
+    async def filter_by(self, **kwargs) -> List[T]:
         """根据条件过滤记录"""
         query = select(self.model).filter_by(**kwargs)
-        result = self.db.scalars(query).all()
-        return list(result)
-    
-    def filter_by_first(self, **kwargs) -> Optional[T]:
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def filter_by_first(self, **kwargs) -> Optional[T]:
         """根据条件获取第一个记录"""
         query = select(self.model).filter_by(**kwargs)
-        return self.db.scalar(query)
+        return await self.db.scalar(query)
@@ -1,81 +1,177 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, any_, bindparam, insert, select, func, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.booking import Booking, BookingStatus
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, Load, Loads
+
+# 预约响应中嵌套活动信息：多对一关系，在同一条查询中 JOIN 加载
+WITH_ACTIVITY: Loads = {"activity": Load.JOINED}
+# 不需要任何关联数据
+NO_RELATIONS: Loads = {}
 
 
 class BookingRepository(BaseRepository[Booking]):
     """预约数据访问层"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         super().__init__(Booking, db)
-    
-    def get_user_bookings(self, user_id: int) -> List[Booking]:
+
+    async def create_many(self, rows: List[dict]) -> List[Booking]:
+        """批量插入预约（多行 INSERT ... RETURNING，按 rows 顺序返回），不提交事务"""
+        query = insert(Booking).returning(Booking, sort_by_parameter_order=True)
+        result = await self.db.scalars(query, rows)
+        return list(result.all())
+
+    async def get_user_bookings(self, user_id: int, load: Optional[Loads] = WITH_ACTIVITY) -> List[Booking]:
         """获取用户的预约列表"""
-        query = select(Booking).where(
-            Booking.user_id == user_id
-        ).order_by(Booking.created_at.desc())
-        result = self.db.scalars(query).all()
-        return list(result)
-    
-    def get_user_booking(self, booking_id: int, user_id: int) -> Optional[Booking]:
+        # 异步会话不支持隐式懒加载，响应中嵌套的活动信息需显式预加载
+        query = select(Booking).where(Booking.user_id == user_id).order_by(Booking.created_at.desc())
+        query = self.with_loads(query, load)
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def get_user_bookings_after(
+        self,
+        user_id: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 20,
+        load: Optional[Loads] = WITH_ACTIVITY
+    ) -> List[Booking]:
+        """获取用户的预约列表（按 (created_at, id) 倒序键集分页）"""
+        query = self.with_loads(select(Booking).where(Booking.user_id == user_id), load)
+        query = self.paginate_after(query, Booking.created_at, after, limit, descending=True)
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def count_user_bookings(self, user_id: int) -> int:
+        """统计用户的预约数量"""
+        query = select(func.count()).select_from(Booking).where(Booking.user_id == user_id)
+        return await self.db.scalar(query)
+
+    async def get_user_booking(
+        self,
+        booking_id: int,
+        user_id: int,
+        load: Optional[Loads] = WITH_ACTIVITY
+    ) -> Optional[Booking]:
         """获取用户特定的预约"""
         query = select(Booking).where(
             Booking.id == booking_id,
             Booking.user_id == user_id
         )
-        return self.db.scalar(query)
-    
-    def get_activity_bookings(self, activity_id: int) -> List[Booking]:
+        query = self.with_loads(query, load)
+        return await self.db.scalar(query)
+
+    async def get_activity_bookings(self, activity_id: int, load: Optional[Loads] = None) -> List[Booking]:
         """获取活动的所有预约"""
-        query = select(Booking).where(Booking.activity_id == activity_id)
-        result = self.db.scalars(query).all()
-        return list(result)
-    
-    def count_activity_bookings(self, activity_id: int) -> int:
+        query = self.with_loads(select(Booking).where(Booking.activity_id == activity_id), load)
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def count_activity_bookings(self, activity_id: int) -> int:
         """统计活动的预约数量"""
-        query = select(Booking).where(
+        query = select(func.count()).select_from(Booking).where(
             Booking.activity_id == activity_id,
             Booking.status == BookingStatus.CONFIRMED
         )
-        return self.db.scalar(select(func.count()).select_from(query.subquery()))
-    
-    def update_booking_status(self, booking_id: int, status: BookingStatus) -> bool:
-        """更新预约状态"""
-        booking = self.get_by_id(booking_id)
-        if booking:
-            booking.status = status
-            self.db.commit()
-            return True
-        return False
-    
-    def checkin_booking(self, booking_id: int) -> bool:
-        """签到预约"""
-        booking = self.get_by_id(booking_id)
-        if booking:
-            booking.checked_in = 1
-            booking.status = BookingStatus.COMPLETED
-            self.db.commit()
-            return True
-        return False
-    
-    def cancel_booking(self, booking_id: int) -> bool:
-        """取消预约"""
-        booking = self.get_by_id(booking_id)
-        if booking:
-            booking.status = BookingStatus.CANCELLED
-            self.db.commit()
-            return True
-        return False
-    
-    def get_confirmed_bookings_by_activity(self, activity_id: int) -> List[Booking]:
+        return await self.db.scalar(query)
+
+    async def update_booking_status(self, booking_id: int, status: BookingStatus) -> bool:
+        """更新预约状态，不提交事务"""
+        query = (
+            update(Booking)
+            .where(Booking.id == booking_id)
+            .values(status=status)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
+
+    async def checkin_user_booking(self, booking_id: int, user_id: int) -> bool:
+        """
+        条件签到：仅当预约属于该用户、处于已确认状态且未签到时才更新
+        在一条 UPDATE 中完成校验和写入，不提交事务
+        """
+        query = (
+            update(Booking)
+            .where(
+                Booking.id == booking_id,
+                Booking.user_id == user_id,
+                Booking.status == BookingStatus.CONFIRMED,
+                Booking.checked_in == 0
+            )
+            .values(checked_in=1, status=BookingStatus.COMPLETED)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
+
+    async def checkin_many(self, booking_ids: List[int], activity_id: Optional[int] = None) -> List[int]:
+        """
+        批量签到：一条 UPDATE ... WHERE id = ANY(:ids) 完成，ID 列表作为单个数组参数传递
+        只签到已确认且未签到的预约（指定 activity_id 时还需属于该活动），返回签到成功的 ID，不提交事务
+        """
+        conditions = [
+            Booking.id == any_(bindparam("booking_ids", booking_ids, type_=ARRAY(Integer))),
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.checked_in == 0
+        ]
+        if activity_id is not None:
+            conditions.append(Booking.activity_id == activity_id)
+        query = (
+            update(Booking)
+            .where(*conditions)
+            .values(checked_in=1, status=BookingStatus.COMPLETED)
+            .returning(Booking.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def get_checkin_states(self, booking_ids: List[int]) -> Dict[int, Tuple[int, BookingStatus, int]]:
+        """批量获取预约签到状态：{预约ID: (活动ID, 状态, 是否签到)}"""
+        query = select(Booking.id, Booking.activity_id, Booking.status, Booking.checked_in).where(
+            Booking.id == any_(bindparam("booking_ids", booking_ids, type_=ARRAY(Integer)))
+        )
+        result = await self.db.execute(query)
+        return {row.id: (row.activity_id, row.status, row.checked_in) for row in result}
+
+    async def cancel_user_booking(self, booking_id: int, user_id: int) -> Optional[Booking]:
+        """
+        条件取消：仅当预约属于该用户且处于已确认状态时才更新
+        返回被取消的预约（含活动 ID 和人数），不提交事务
+        """
+        query = (
+            update(Booking)
+            .where(
+                Booking.id == booking_id,
+                Booking.user_id == user_id,
+                Booking.status == BookingStatus.CONFIRMED
+            )
+            .values(status=BookingStatus.CANCELLED)
+            .returning(Booking)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query)
+
+    async def cancel_booking(self, booking_id: int) -> bool:
+        """取消预约，不提交事务"""
+        return await self.update_booking_status(booking_id, BookingStatus.CANCELLED)
+
+    async def get_confirmed_bookings_by_activity(
+        self,
+        activity_id: int,
+        load: Optional[Loads] = None
+    ) -> List[Booking]:
         """获取活动已确认的预约"""
         query = select(Booking).where(
             Booking.activity_id == activity_id,
             Booking.status == BookingStatus.CONFIRMED
         )
-        result = self.db.scalars(query).all()
-        return list(result)
+        query = self.with_loads(query, load)
+        result = await self.db.scalars(query)
+        return list(result.all())
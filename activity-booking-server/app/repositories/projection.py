@@ -0,0 +1,46 @@
+from dataclasses import fields
+from typing import Any, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from sqlalchemy import Row, Select, select
+
+D = TypeVar('D')
+
+
+class Projection(Generic[D]):
+    """
+    列投影
+
+    只查询声明的列，不加载整个实体：跳过描述等大字段，减少从数据库传输的字节；
+    结果不进入会话的标识映射，也不需要构建 ORM 实例状态。
+    指定 dto（__slots__ 数据类）时按列顺序构造 DTO，否则直接返回结果行（Row 元组）；
+    expressions 可以用 SQL 表达式代替同名列（如只取大字段的前若干字符）。
+    列表视图使用投影，详情和写操作仍使用完整实体
+    """
+
+    def __init__(
+        self,
+        model: Type[Any],
+        *names: str,
+        dto: Optional[Type[D]] = None,
+        expressions: Optional[Dict[str, Any]] = None
+    ):
+        if not names and dto is None:
+            raise ValueError("投影需要声明列名或 DTO")
+        expressions = expressions or {}
+        self.names = names or tuple(field.name for field in fields(dto))
+        self.columns = tuple(
+            expressions[name].label(name) if name in expressions else getattr(model, name)
+            for name in self.names
+        )
+        self.dto = dto
+
+    def select(self) -> Select:
+        """只查询投影列的 SELECT"""
+        return select(*self.columns)
+
+    def build(self, rows: Iterable[Row]) -> List[D]:
+        """将结果行转换为 DTO（未指定 DTO 时原样返回结果行）"""
+        dto = self.dto
+        if dto is None:
+            return list(rows)
+        return [dto(*row) for row in rows]
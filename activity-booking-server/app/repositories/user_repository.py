@@ -1,7 +1,9 @@
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, false, func, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.repositories.base import BaseRepository
@@ -9,28 +11,74 @@ from app.repositories.base import BaseRepository
 
 class UserRepository(BaseRepository[User]):
     """用户数据访问层"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         super().__init__(User, db)
-    
-    def get_by_openid(self, openid: str) -> Optional[User]:
+
+    async def get_by_openid(self, openid: str) -> Optional[User]:
         """根据微信 openid 获取用户"""
         query = select(User).where(User.openid == openid)
-        return self.db.scalar(query)
-    
-    def get_by_wechat_unionid(self, unionid: str) -> Optional[User]:
+        return await self.db.scalar(query)
+
+    async def get_by_wechat_unionid(self, unionid: str) -> Optional[User]:
         """根据微信 unionid 获取用户"""
-        query = select(User).where(User.wechat_unionid == unionid)
-        return self.db.scalar(query)
-    
-    def create_user_from_wechat(self, openid: str, user_data: dict) -> User:
+        query = select(User).where(User.unionid == unionid)
+        return await self.db.scalar(query)
+
+    async def create_user_from_wechat(self, openid: str, user_data: dict) -> User:
         """从微信信息创建用户"""
         user_data['openid'] = openid
-        return self.create(user_data)
-    
-    def update_user_info(self, user_id: int, user_data: dict) -> Optional[User]:
+        return await self.create(user_data)
+
+    async def upsert_by_openid(self, openid: str, profile: Optional[dict] = None) -> Tuple[int, bool]:
+        """
+        按 openid 插入或更新用户，返回 (用户 ID, 是否写入)
+
+        单条语句完成 INSERT ... ON CONFLICT (openid) DO UPDATE ... RETURNING，
+        并发首次登录不会触发唯一约束冲突。profile 中为 None 的字段不覆盖已有值，
+        unionid 只在原值为空时写入；没有字段变化时不更新行，只读出用户 ID。不提交事务
+        """
+        profile = {key: value for key, value in (profile or {}).items() if value is not None}
+        now = datetime.now()
+        stmt = pg_insert(User).values(openid=openid, created_at=now, updated_at=now, **profile)
+
+        changes = {key: stmt.excluded[key] for key in profile if key != "unionid"}
+        if "unionid" in profile:
+            changes["unionid"] = func.coalesce(User.unionid, stmt.excluded.unionid)
+        if changes:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.openid],
+                set_={**changes, "updated_at": now},
+                where=or_(*(getattr(User, key).is_distinct_from(value) for key, value in changes.items()))
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[User.openid])
+
+        # 插入或更新时由 RETURNING 返回 ID；未写入时从表中读出已有用户
+        written = stmt.returning(User.id).cte("written")
+        query = select(written.c.id, true().label("written")).union_all(
+            select(User.id, false()).where(User.openid == openid, ~exists(select(written.c.id)))
+        )
+        row = (await self.db.execute(query)).first()
+        if row is None:
+            # 冲突行由并发事务在本语句快照之后提交，语句内读不到，重新查询一次
+            return await self.db.scalar(select(User.id).where(User.openid == openid)), False
+        return row.id, row.written
+
+    async def update_user_info(self, user_id: int, user_data: dict) -> Optional[User]:
         """更新用户信息"""
-        user = self.get_by_id(user_id)
+        user = await self.get_by_id(user_id)
         if user:
-            return self.update(user, user_data)
+            return await self.update(user, user_data)
         return None
+
+    async def deactivate(self, user_id: int) -> bool:
+        """禁用用户，不提交事务"""
+        query = (
+            update(User)
+            .where(User.id == user_id)
+            .values(is_active=False)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        return await self.db.scalar(query) is not None
@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
+
+from pydantic import Field
 
 from app.schemas.base import CamelCaseModel
 
@@ -10,6 +12,8 @@ class ActivityBase(CamelCaseModel):
     description: Optional[str] = None
     cover_image: Optional[str] = None
     location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # 纬度（WGS84），与经度同时设置后可按距离检索
+    longitude: Optional[float] = Field(None, ge=-180, le=180)  # 经度（WGS84）
     organizer: Optional[str] = None
     start_time: datetime
     end_time: datetime
@@ -28,6 +32,8 @@ class ActivityUpdate(CamelCaseModel):
     description: Optional[str] = None
     cover_image: Optional[str] = None
     location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     organizer: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
@@ -36,9 +42,23 @@ class ActivityUpdate(CamelCaseModel):
     is_active: Optional[bool] = None
 
 
+class CoverSrcset(CamelCaseModel):
+    """
+    封面图的多尺寸版本
+
+    webp、avif 为 srcset 格式（"URL 宽度w, ..."），客户端按显示宽度和格式支持选择；
+    不支持 srcset 的客户端直接使用 thumbnail（列表）或 hero（详情）
+    """
+    thumbnail: str  # 列表缩略图（最小尺寸的 WebP）
+    hero: str  # 详情页头图（最大尺寸的 WebP）
+    webp: str
+    avif: Optional[str] = None  # 未启用或不支持 AVIF 编码时为空
+
+
 class Activity(ActivityBase):
     """活动模型"""
     id: int
+    cover_srcset: Optional[CoverSrcset] = None  # 通过封面上传接口生成，直接设置 cover_image 时为空
     booked_count: int
     is_active: bool
     created_at: datetime
@@ -48,7 +68,65 @@ class Activity(ActivityBase):
 class ActivityList(CamelCaseModel):
     """活动列表模型"""
     items: List[Activity]
-    total: int
+    total: Optional[int] = None  # total=none 模式下不返回
+    page: Optional[int] = None  # 游标分页时为空
+    page_size: int
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多数据时为空
+
+
+class ActivitySummary(CamelCaseModel):
+    """活动列表项（列表视图只返回展示所需的字段，详情见活动详情接口）"""
+    id: int
+    title: str
+    cover_image: Optional[str] = None
+    cover_srcset: Optional[CoverSrcset] = None
+    description: Optional[str] = None  # 描述的开头一段，完整描述见详情接口
+    start_time: datetime
+    end_time: datetime
+    location: Optional[str] = None
+    price: float = 0
+    max_participants: int
+    booked_count: int
+
+
+class ActivitySummaryList(CamelCaseModel):
+    """活动摘要列表模型"""
+    items: List[ActivitySummary]
+    total: Optional[int] = None  # total=none 模式下不返回
+    page: Optional[int] = None  # 游标分页时为空
+    page_size: int
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多数据时为空
+
+
+class ActivityCover(CamelCaseModel):
+    """封面上传结果"""
+    status: str  # ready：已生成；processing：后台生成中，完成后更新到活动上
+    cover_image: Optional[str] = None
+    cover_srcset: Optional[CoverSrcset] = None
+
+
+class ActivitySearchHit(Activity):
+    """活动搜索结果项"""
+    score: float = 0  # 相关度
+    highlights: Dict[str, str] = {}  # 命中字段的高亮片段（<em> 标记，已转义）
+
+
+class ActivitySearchResult(CamelCaseModel):
+    """活动搜索结果"""
+    items: List[ActivitySearchHit]
+    total: Optional[int] = None  # total=none 模式下不返回
     page: int
     page_size: int
+    fuzzy: bool = False  # 全文检索无结果，返回的是标题模糊匹配结果
+
 
+class ActivityNearbyItem(Activity):
+    """附近的活动"""
+    distance: float = 0  # 与查询位置的距离（米）
+
+
+class ActivityNearbyList(CamelCaseModel):
+    """附近的活动列表（按距离由近到远）"""
+    items: List[ActivityNearbyItem]
+    page_size: int
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多数据时为空
@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
 
+from pydantic import Field
+
 from app.models.booking import BookingStatus
 from app.schemas.activity import Activity
 from app.schemas.base import CamelCaseModel
@@ -11,7 +13,7 @@ class BookingBase(CamelCaseModel):
     activity_id: int
     name: str
     phone: str
-    participants: int = 1
+    participants: int = Field(1, ge=1)
     remark: Optional[str] = None
 
 
@@ -43,5 +45,79 @@ class Booking(BookingBase):
 class BookingList(CamelCaseModel):
     """预约列表模型"""
     items: List[Booking]
-    total: int
+    total: Optional[int] = None  # total=none 模式下不返回
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多数据时为空
+
+
+
+class BookingBatchCreate(CamelCaseModel):
+    """批量预约请求（同一活动的多条预约整体占座，全部成功或全部失败）"""
+    items: List[BookingCreate] = Field(..., min_length=1, max_length=200)
+
+
+class BookingBatchItem(CamelCaseModel):
+    """批量预约单项结果"""
+    index: int  # 在请求 items 中的位置
+    success: bool
+    booking: Optional[Booking] = None
+    message: Optional[str] = None
+
+
+class BookingBatchResult(CamelCaseModel):
+    """批量预约结果"""
+    succeeded: int
+    failed: int
+    items: List[BookingBatchItem]
+
+
+class BookingBatchCheckin(CamelCaseModel):
+    """批量签到请求"""
+    booking_ids: List[int] = Field(..., min_length=1, max_length=500)
+    activity_id: Optional[int] = None  # 指定时只签到该活动的预约
+
+
+class BookingCheckinItem(CamelCaseModel):
+    """批量签到单项结果"""
+    booking_id: int
+    success: bool
+    message: Optional[str] = None
+
+
+class BookingBatchCheckinResult(CamelCaseModel):
+    """批量签到结果"""
+    succeeded: int
+    failed: int
+    items: List[BookingCheckinItem]
+
+
+class CheckinToken(CamelCaseModel):
+    """签到二维码令牌"""
+    token: str
+    expires_at: datetime
+
+
+class CheckinScan(CamelCaseModel):
+    """现场扫码签到请求"""
+    token: str
+    activity_id: Optional[int] = None  # 工作人员当前负责的活动，指定时拒绝其他活动的二维码
+
+
+class CheckinSync(CamelCaseModel):
+    """离线扫码批量同步请求（工作人员离线时缓存扫码结果，联网后一次提交）"""
+    tokens: List[str] = Field(..., min_length=1, max_length=500)
+    activity_id: Optional[int] = None
+
+
+class CheckinSyncItem(CamelCaseModel):
+    """离线同步单项结果"""
+    index: int  # 在请求 tokens 中的位置
+    booking_id: Optional[int] = None  # 二维码无效时为空
+    success: bool
+    message: Optional[str] = None
+
 
+class CheckinSyncResult(CamelCaseModel):
+    """离线同步结果"""
+    succeeded: int
+    failed: int
+    items: List[CheckinSyncItem]
@@ -42,8 +42,9 @@ class ApiResponse(BaseModel, Generic[T]):
             timestamp=int(time.time())
         )
     
+    # 不能命名为 error：与 error 字段同名时，Pydantic 会让字段遮蔽该类方法
     @classmethod
-    def error(
+    def failure(
         cls,
         code: ResponseCode,
         message: str,
@@ -67,7 +68,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """400 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.BAD_REQUEST,
             message=message,
             error=error
@@ -80,7 +81,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """401 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.UNAUTHORIZED,
             message=message,
             error=error
@@ -93,7 +94,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """403 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.FORBIDDEN,
             message=message,
             error=error
@@ -106,7 +107,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """404 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.NOT_FOUND,
             message=message,
             error=error
@@ -119,7 +120,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """409 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.CONFLICT,
             message=message,
             error=error
@@ -132,7 +133,7 @@ class ApiResponse(BaseModel, Generic[T]):
         error: str = None
     ) -> "ApiResponse[None]":
         """500 错误响应"""
-        return cls.error(
+        return cls.failure(
             code=ResponseCode.INTERNAL_ERROR,
             message=message,
             error=error
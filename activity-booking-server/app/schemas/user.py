@@ -33,6 +33,7 @@ class User(UserBase):
     openid: str
     unionid: Optional[str] = None
     is_active: bool = True
+    is_staff: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,93 @@
+import hashlib
+from typing import Optional
+
+import orjson
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.tiered_cache import TieredCache
+from app.utils.pagination import TotalMode
+
+
+def dump_model(model: BaseModel) -> bytes:
+    """将响应模型序列化为驼峰命名的 JSON 字节"""
+    return orjson.dumps(model.model_dump(by_alias=True))
+
+
+class ActivityCache:
+    """
+    活动读穿透缓存
+
+    缓存列表、详情和热门活动预序列化后的 JSON 字节，命中时直接拼接响应，
+    跳过数据库查询和 Pydantic 序列化。活动增删改或预约人数变化时，
+    列表和热门缓存整体失效，详情按活动失效
+    """
+
+    def __init__(self):
+        options = dict(
+            ttl=settings.ACTIVITY_CACHE_TTL,
+            stale_ttl=settings.ACTIVITY_CACHE_STALE_TTL,
+            local_ttl=settings.ACTIVITY_CACHE_LOCAL_TTL,
+            enabled=settings.ACTIVITY_CACHE_ENABLED
+        )
+        self.lists = TieredCache("activity:list", **options)
+        self.details = TieredCache("activity:detail", **options)
+        self.hot = TieredCache("activity:hot", **options)
+
+    @staticmethod
+    def _digest(*parts: Optional[str]) -> str:
+        """关键词、游标等客户端传入的值取摘要，避免键过长"""
+        if not any(parts):
+            return ""
+        return hashlib.md5("\0".join(part or "" for part in parts).encode()).hexdigest()
+
+    @classmethod
+    def list_key(
+        cls,
+        page: Optional[int] = None,
+        page_size: int = 10,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> str:
+        """列表缓存键"""
+        return f"{page or ''}:{page_size}:{TotalMode(total_mode).value}:{cls._digest(keyword, cursor)}"
+
+    @classmethod
+    def search_key(
+        cls,
+        keyword: str,
+        page: int = 1,
+        page_size: int = 10,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> str:
+        """搜索结果缓存键（与列表同命名空间，随列表一起失效）"""
+        return f"search:{page}:{page_size}:{TotalMode(total_mode).value}:{cls._digest(keyword)}"
+
+    @classmethod
+    def upcoming_key(cls, page_size: int = 10, cursor: Optional[str] = None) -> str:
+        """即将开始的活动缓存键（与列表同命名空间，随列表一起失效）"""
+        return f"upcoming:{page_size}:{cls._digest(cursor)}"
+
+    @classmethod
+    def count_key(cls, keyword: Optional[str] = None) -> str:
+        """活动总数缓存键（与列表同命名空间，随列表一起失效）"""
+        return f"count:{cls._digest(keyword)}"
+
+    @staticmethod
+    def detail_key(activity_id: int) -> str:
+        return str(activity_id)
+
+    @staticmethod
+    def hot_key(limit: int = 10) -> str:
+        return str(limit)
+
+    async def invalidate(self, *activity_ids: int) -> None:
+        """失效所有列表和热门缓存；传入活动 ID 时同时失效这些活动的详情"""
+        await self.lists.invalidate()
+        await self.hot.invalidate()
+        if activity_ids:
+            await self.details.invalidate(*(self.detail_key(activity_id) for activity_id in activity_ids))
+
+
+activity_cache = ActivityCache()
@@ -1,75 +1,387 @@
-from typing import Optional, List
+import logging
+from datetime import datetime
+from typing import Optional, List, Tuple
 
-from sqlalchemy.orm import Session
+import orjson
 
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.uow import UnitOfWork
 from app.models.activity import Activity
-from app.repositories.activity_repository import ActivityRepository
-from app.schemas.activity import ActivityCreate, ActivityUpdate, ActivityList
+from app.repositories.activity_repository import ACTIVITY_SUMMARY, ActivityRepository
+from app.core.config import settings
+from app.schemas.activity import (
+    Activity as ActivitySchema,
+    ActivityCover,
+    ActivityCreate,
+    ActivityUpdate,
+    ActivityNearbyItem,
+    ActivityNearbyList,
+    ActivitySearchHit,
+    ActivitySearchResult,
+    ActivitySummaryList
+)
+from app.core.tiered_cache import cached
+from app.services.activity_cache import activity_cache, dump_model
+from app.services.cover_images import cover_images
+from app.services.hot_ranking import hot_ranking
+from app.services.seat_inventory import seat_inventory
+from app.utils.pagination import TotalMode, cursor_of, decode_cursor, decode_distance_cursor, encode_distance_cursor
+from app.utils.search import highlight, highlight_terms
+from app.utils.serializer import serializer_for
+
+logger = logging.getLogger(__name__)
 
 
 class ActivityService:
     """活动业务逻辑层"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
+        self.uow = UnitOfWork(db)
         self.activity_repo = ActivityRepository(db)
-    
-    def get_activities(self, page: int = 1, page_size: int = 10, keyword: Optional[str] = None) -> ActivityList:
-        """获取活动列表"""
-        skip = (page - 1) * page_size
-        
-        if keyword:
-            activities = self.activity_repo.search_by_title(keyword)
-            total = len(activities)
+
+    async def get_activities(
+        self,
+        page: Optional[int] = None,
+        page_size: int = 10,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> ActivitySummaryList:
+        """
+        获取活动列表
+
+        传入 page 时使用偏移分页（兼容旧客户端），否则按 (start_time, id) 游标分页，
+        翻页深度不影响查询耗时。两种方式都会返回 next_cursor。
+        列表只查询摘要列（ACTIVITY_SUMMARY 投影），完整信息通过详情接口获取
+        """
+        return ActivitySummaryList(**await self._get_activities_page(page, page_size, keyword, cursor, total_mode))
+
+    async def _get_activities_page(
+        self,
+        page: Optional[int],
+        page_size: int,
+        keyword: Optional[str],
+        cursor: Optional[str],
+        total_mode: TotalMode
+    ) -> dict:
+        """查询一页活动，返回 ActivitySummaryList 的字段（items 为摘要 DTO）"""
+        if page is not None:
+            activities = await self.activity_repo.get_active_activities(
+                (page - 1) * page_size, page_size + 1, keyword, ACTIVITY_SUMMARY
+            )
         else:
-            activities = self.activity_repo.get_active_activities(skip, page_size)
-            total = self.activity_repo.count_active_activities()
-        
-        return ActivityList(
-            items=activities,
-            total=total,
+            after = decode_cursor(cursor) if cursor else None
+            activities = await self.activity_repo.get_active_activities_after(
+                after, page_size + 1, keyword, ACTIVITY_SUMMARY
+            )
+
+        # 多取一条判断是否还有下一页
+        next_cursor = cursor_of(activities[page_size - 1], "start_time") if len(activities) > page_size else None
+
+        return dict(
+            items=activities[:page_size],
+            total=await self._count_activities(keyword, total_mode),
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
+        )
+
+    async def _count_activities(self, keyword: Optional[str], total_mode: TotalMode) -> Optional[int]:
+        """按 total_mode 计算活动总数"""
+        if total_mode == TotalMode.NONE:
+            return None
+        if total_mode == TotalMode.ESTIMATE:
+            return await self.activity_repo.estimate_active_activities(keyword)
+        return int(await self._count_activities_json(keyword))
+
+    @cached(activity_cache.lists, key=lambda self, keyword=None: activity_cache.count_key(keyword))
+    async def _count_activities_json(self, keyword: Optional[str] = None) -> bytes:
+        """精确总数（读穿透缓存，翻页时不再重复计数）"""
+        return b"%d" % await self.activity_repo.count_active_activities(keyword)
+
+    @cached(activity_cache.lists, key=lambda self, *args, **kwargs: activity_cache.list_key(*args, **kwargs))
+    async def get_activities_json(
+        self,
+        page: Optional[int] = None,
+        page_size: int = 10,
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> bytes:
+        """获取活动列表（预序列化 JSON，读穿透缓存；未命中时由摘要 DTO 直接序列化）"""
+        return serializer_for(ActivitySummaryList).dumps(
+            await self._get_activities_page(page, page_size, keyword, cursor, total_mode)
+        )
+
+    async def get_upcoming_activities(self, page_size: int = 10, cursor: Optional[str] = None) -> ActivitySummaryList:
+        """获取即将开始的活动（按开始时间升序，(start_time, id) 游标分页，不返回总数）"""
+        return ActivitySummaryList(**await self._get_upcoming_page(page_size, cursor))
+
+    async def _get_upcoming_page(self, page_size: int, cursor: Optional[str]) -> dict:
+        after = decode_cursor(cursor) if cursor else (datetime.now(), 0)
+        activities = await self.activity_repo.get_active_activities_after(
+            after, page_size + 1, projection=ACTIVITY_SUMMARY
         )
-    
-    def get_activity_by_id(self, activity_id: int) -> Optional[Activity]:
+
+        next_cursor = cursor_of(activities[page_size - 1], "start_time") if len(activities) > page_size else None
+        return dict(items=activities[:page_size], page_size=page_size, next_cursor=next_cursor)
+
+    @cached(activity_cache.lists, key=lambda self, *args, **kwargs: activity_cache.upcoming_key(*args, **kwargs))
+    async def get_upcoming_activities_json(self, page_size: int = 10, cursor: Optional[str] = None) -> bytes:
+        """
+        获取即将开始的活动（预序列化 JSON，读穿透缓存）
+
+        首页在缓存有效期内可能包含刚刚开始的活动
+        """
+        return serializer_for(ActivitySummaryList).dumps(await self._get_upcoming_page(page_size, cursor))
+
+    async def get_nearby_activities(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        page_size: int = 10,
+        cursor: Optional[str] = None
+    ) -> ActivityNearbyList:
+        """获取附近进行中和未开始的活动（按距离由近到远，(距离, id) 游标分页）"""
+        return ActivityNearbyList(**await self._get_nearby_page(latitude, longitude, radius, page_size, cursor))
+
+    async def _get_nearby_page(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        page_size: int,
+        cursor: Optional[str]
+    ) -> dict:
+        """查询一页附近的活动，返回 ActivityNearbyList 的字段（items 为已转换的驼峰字典）"""
+        after = decode_distance_cursor(cursor) if cursor else None
+        rows = await self.activity_repo.get_nearby(latitude, longitude, radius, after, page_size + 1)
+
+        next_cursor = None
+        if len(rows) > page_size:
+            activity, distance = rows[page_size - 1]
+            next_cursor = encode_distance_cursor(distance, activity.id)
+
+        to_dict = serializer_for(ActivityNearbyItem).to_dict
+        items = []
+        for activity, distance in rows[:page_size]:
+            item = to_dict(activity)
+            item["distance"] = round(distance, 1)
+            items.append(item)
+        return dict(items=items, page_size=page_size, next_cursor=next_cursor)
+
+    async def get_nearby_activities_json(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        page_size: int = 10,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """获取附近的活动（预序列化 JSON；查询位置因人而异，不做服务端缓存）"""
+        page = await self._get_nearby_page(latitude, longitude, radius, page_size, cursor)
+        # 与 ActivityNearbyList 的序列化结构一致
+        return orjson.dumps({"items": page["items"], "pageSize": page_size, "nextCursor": page["next_cursor"]})
+
+    async def get_activity_by_id(self, activity_id: int) -> Optional[Activity]:
         """根据 ID 获取活动详情"""
-        return self.activity_repo.get_by_id(activity_id)
-    
-    def create_activity(self, activity_create: ActivityCreate) -> Activity:
+        return await self.activity_repo.get_by_id(activity_id)
+
+    @cached(activity_cache.details, key=lambda self, activity_id: activity_cache.detail_key(activity_id))
+    async def get_activity_json(self, activity_id: int) -> Optional[bytes]:
+        """获取活动详情（预序列化 JSON，读穿透缓存），活动不存在时返回 None"""
+        activity = await self.get_activity_by_id(activity_id)
+        return serializer_for(ActivitySchema).dumps(activity) if activity else None
+
+    async def create_activity(self, activity_create: ActivityCreate) -> Activity:
         """创建活动"""
-        return self.activity_repo.create(activity_create.model_dump())
-    
-    def update_activity(self, activity_id: int, activity_update: ActivityUpdate) -> Optional[Activity]:
+        async with self.uow:
+            activity = await self.activity_repo.create(activity_create.model_dump())
+            self.uow.after_commit(activity_cache.invalidate)
+            self.uow.after_commit(lambda: hot_ranking.add_activity(activity))
+        return activity
+
+    async def update_activity(self, activity_id: int, activity_update: ActivityUpdate) -> Optional[Activity]:
         """更新活动"""
-        activity = self.activity_repo.get_by_id(activity_id)
-        if not activity:
+        async with self.uow:
+            activity = await self.activity_repo.get_by_id(activity_id)
+            if not activity:
+                return None
+
+            update_data = activity_update.model_dump(exclude_unset=True)
+            if "cover_image" in update_data:
+                # 直接设置的封面没有多尺寸版本
+                update_data["cover_srcset"] = None
+            activity = await self.activity_repo.update(activity, update_data)
+            self.uow.after_commit(lambda: activity_cache.invalidate(activity_id))
+
+            # 容量或启用状态变化后，Redis 库存需要重新加载
+            if seat_inventory.enabled and update_data.keys() & {"max_participants", "is_active"}:
+                self.uow.after_commit(lambda: seat_inventory.invalidate(activity_id))
+            if update_data.keys() & {"end_time", "is_active"}:
+                self.uow.after_commit(lambda: hot_ranking.update_activity(activity))
+        return activity
+
+    async def set_cover(self, activity_id: int, data: bytes) -> Optional[ActivityCover]:
+        """
+        上传活动封面，活动不存在时返回 None
+
+        相同图片已处理过时立即生效；否则在进程池中生成多尺寸版本，完成后更新到活动上
+        """
+        if not await self.activity_repo.get_by_id(activity_id):
             return None
-        
-        update_data = activity_update.model_dump(exclude_unset=True)
-        return self.activity_repo.update(activity, update_data)
-    
-    def delete_activity(self, activity_id: int) -> bool:
+        srcset = await cover_images.submit(activity_id, data)
+        if srcset is None:
+            return ActivityCover(status="processing")
+        return ActivityCover(status="ready", cover_image=srcset["hero"], cover_srcset=srcset)
+
+    async def delete_activity(self, activity_id: int) -> bool:
         """删除活动（软删除）"""
-        return self.activity_repo.soft_delete(activity_id)
-    
-    def get_hot_activities(self, limit: int = 10) -> List[Activity]:
-        """获取热门活动"""
-        return self.activity_repo.get_hot_activities(limit)
-    
-    def search_activities(self, keyword: str) -> ActivityList:
-        """搜索活动"""
-        activities = self.activity_repo.search_by_title(keyword)
-        return ActivityList(
-            items=activities,
-            total=len(activities),
-            page=1,
-            page_size=len(activities)
+        async with self.uow:
+            success = await self.activity_repo.soft_delete(activity_id)
+            if success:
+                self.uow.after_commit(lambda: activity_cache.invalidate(activity_id))
+                if seat_inventory.enabled:
+                    self.uow.after_commit(lambda: seat_inventory.invalidate(activity_id))
+                self.uow.after_commit(lambda: hot_ranking.remove(activity_id))
+        return success
+
+    async def get_hot_activities(self, limit: int = 10) -> List[Activity]:
+        """获取热门活动：按 Redis 热度排行，排行不可用时按预约人数排序"""
+        activity_ids = await hot_ranking.top(limit)
+        if activity_ids is None:
+            return await self.activity_repo.get_hot_activities(limit)
+        activities = await self.activity_repo.get_by_ids(activity_ids)
+        return [activities[activity_id] for activity_id in activity_ids if activity_id in activities]
+
+    @cached(activity_cache.hot, key=lambda self, *args, **kwargs: activity_cache.hot_key(*args, **kwargs))
+    async def get_hot_activities_json(self, limit: int = 10) -> bytes:
+        """
+        获取热门活动列表（预序列化 JSON，读穿透缓存）
+
+        排行取自 Redis，活动内容取自详情缓存，缓存都命中时不访问数据库
+        """
+        activity_ids = await hot_ranking.top(limit)
+        if activity_ids is None:
+            activities = await self.activity_repo.get_hot_activities(limit)
+            items = [serializer_for(ActivitySchema).dumps(activity) for activity in activities]
+        else:
+            items = await self._get_activities_json(activity_ids)
+        # 与 ActivityList 的序列化结构一致，活动详情直接嵌入已序列化的 JSON
+        return orjson.dumps({
+            "items": [orjson.Fragment(item) for item in items],
+            "total": len(items),
+            "page": 1,
+            "pageSize": len(items),
+            "nextCursor": None,
+        })
+
+    async def _get_activities_json(self, activity_ids: List[int]) -> List[bytes]:
+        """按顺序获取多个活动的详情 JSON（走详情缓存，首次未命中时一次查询加载全部活动）"""
+        loaded = None
+
+        async def load(activity_id: int) -> Optional[bytes]:
+            nonlocal loaded
+            if loaded is None:
+                loaded = await self.activity_repo.get_by_ids(activity_ids)
+            activity = loaded.get(activity_id)
+            return serializer_for(ActivitySchema).dumps(activity) if activity else None
+
+        items = []
+        for activity_id in activity_ids:
+            item = await activity_cache.details.get_or_load(
+                activity_cache.detail_key(activity_id), lambda: load(activity_id)
+            )
+            if item:
+                items.append(item)
+        return items
+
+    async def search_activities(
+        self,
+        keyword: str,
+        page: int = 1,
+        page_size: int = 10,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> ActivitySearchResult:
+        """
+        搜索活动
+
+        在标题、主办方、地点和描述上全文检索，按相关度排序并返回高亮片段；
+        第一页没有命中时退化为标题模糊匹配（容忍错别字）
+        """
+        skip = (page - 1) * page_size
+        rows = await self.activity_repo.search(keyword, skip, page_size)
+
+        fuzzy = False
+        if not rows and page == 1 and settings.SEARCH_FUZZY_ENABLED:
+            rows = await self._fuzzy_search(keyword, page_size)
+            fuzzy = bool(rows)
+
+        if fuzzy or total_mode == TotalMode.NONE:
+            total = len(rows) if fuzzy else None
+        elif page == 1 and len(rows) < page_size:
+            total = len(rows)
+        else:
+            total = await self._count_activities(keyword, total_mode)
+
+        return ActivitySearchResult(
+            items=self._build_hits(rows, highlight_terms(keyword)),
+            total=total,
+            page=page,
+            page_size=page_size,
+            fuzzy=fuzzy
         )
-    
-    def increment_booking_count(self, activity_id: int, count: int = 1) -> bool:
+
+    @cached(activity_cache.lists, key=lambda self, *args, **kwargs: activity_cache.search_key(*args, **kwargs))
+    async def search_activities_json(
+        self,
+        keyword: str,
+        page: int = 1,
+        page_size: int = 10,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> bytes:
+        """搜索活动（预序列化 JSON，读穿透缓存）"""
+        return dump_model(await self.search_activities(keyword, page, page_size, total_mode))
+
+    async def _fuzzy_search(self, keyword: str, limit: int) -> List[Tuple[Activity, float]]:
+        try:
+            return await self.activity_repo.fuzzy_search(keyword, limit)
+        except DBAPIError:
+            # 未安装 pg_trgm 扩展时跳过模糊匹配
+            logger.warning("活动模糊搜索失败，请确认已安装 pg_trgm 扩展", exc_info=True)
+            await self.activity_repo.db.rollback()
+            return []
+
+    @staticmethod
+    def _build_hits(rows: List[Tuple[Activity, float]], terms: List[str]) -> List[ActivitySearchHit]:
+        """组装搜索结果并生成高亮片段"""
+        hits = []
+        for activity, score in rows:
+            hit = ActivitySearchHit.model_validate(activity)
+            hit.score = round(float(score), 6)
+            fragments = {
+                "title": highlight(activity.title, terms),
+                "organizer": highlight(activity.organizer, terms),
+                "location": highlight(activity.location, terms),
+                "description": highlight(activity.description, terms, max_length=80),
+            }
+            hit.highlights = {field: fragment for field, fragment in fragments.items() if fragment}
+            hits.append(hit)
+        return hits
+
+    async def increment_booking_count(self, activity_id: int, count: int = 1) -> bool:
         """增加活动预约人数"""
-        return self.activity_repo.increment_booked_count(activity_id, count)
-    
-    def decrement_booking_count(self, activity_id: int, count: int = 1) -> bool:
+        async with self.uow:
+            success = await self.activity_repo.increment_booked_count(activity_id, count)
+            self.uow.after_commit(lambda: activity_cache.invalidate(activity_id))
+        return success
+
+    async def decrement_booking_count(self, activity_id: int, count: int = 1) -> bool:
         """减少活动预约人数"""
-        return self.activity_repo.decrement_booked_count(activity_id, count)
+        async with self.uow:
+            success = await self.activity_repo.decrement_booked_count(activity_id, count)
+            self.uow.after_commit(lambda: activity_cache.invalidate(activity_id))
+        return success
@@ -0,0 +1,90 @@
+import hashlib
+from typing import Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.tiered_cache import TieredCache
+from app.core.uow import UnitOfWork
+from app.repositories.user_repository import UserRepository
+from app.services.principal_cache import principal_cache
+from app.utils.wechat import get_wechat_openid, get_wechat_access_token, get_wechat_user_info
+
+# 微信用户信息字段 -> 用户表字段
+_PROFILE_FIELDS = {
+    "nickname": "nickname",
+    "headimgurl": "avatar",
+    "sex": "gender",
+    "country": "country",
+    "province": "province",
+    "city": "city",
+    "language": "language",
+}
+
+# 登录 code 换取结果缓存：客户端超时重试时会带着同一个 code 重复登录，
+# 而 code 只能向微信换取一次，缓存后重复请求直接复用结果；
+# 同一进程内的并发重复请求由单飞合并为一次微信调用
+code_cache = TieredCache(
+    "wechat_code",
+    ttl=settings.WECHAT_CODE_CACHE_TTL,
+    maxsize=10000,
+    enabled=settings.WECHAT_CODE_CACHE_TTL > 0
+)
+
+
+def _code_key(kind: str, code: str) -> str:
+    return f"{kind}:{hashlib.sha256(code.encode()).hexdigest()[:32]}"
+
+
+class AuthService:
+    """登录业务逻辑层"""
+
+    def __init__(self, db: AsyncSession):
+        self.uow = UnitOfWork(db)
+        self.user_repo = UserRepository(db)
+
+    async def wx_login(self, code: str) -> Optional[int]:
+        """微信小程序登录，返回用户 ID；code 无效时返回 None"""
+        raw = await code_cache.get_or_load(_code_key("mp", code), lambda: self._exchange_mp_code(code))
+        if not raw:
+            return None
+        async with self.uow:
+            user_id, _ = await self.user_repo.upsert_by_openid(orjson.loads(raw)["openid"])
+        return user_id
+
+    async def wx_web_login(self, code: str) -> Optional[int]:
+        """微信网页授权登录，返回用户 ID；授权失败时返回 None"""
+        raw = await code_cache.get_or_load(_code_key("web", code), lambda: self._exchange_web_code(code))
+        if not raw:
+            return None
+        identity = orjson.loads(raw)
+        async with self.uow:
+            user_id, written = await self.user_repo.upsert_by_openid(identity["openid"], identity["profile"])
+            if written:
+                self.uow.after_commit(lambda: principal_cache.invalidate(user_id))
+        return user_id
+
+    @staticmethod
+    async def _exchange_mp_code(code: str) -> Optional[bytes]:
+        openid = await get_wechat_openid(code)
+        return orjson.dumps({"openid": openid}) if openid else None
+
+    @staticmethod
+    async def _exchange_web_code(code: str) -> Optional[bytes]:
+        token_data = await get_wechat_access_token(code)
+        if not token_data:
+            return None
+        access_token = token_data.get("access_token")
+        openid = token_data.get("openid")
+        if not access_token or not openid:
+            return None
+
+        profile = {"unionid": token_data.get("unionid")}
+        user_info = await get_wechat_user_info(access_token, openid)
+        if user_info:
+            for source, field in _PROFILE_FIELDS.items():
+                value = user_info.get(source)
+                # 空字符串视为未提供，不覆盖已有值
+                profile[field] = value if value != "" else None
+        return orjson.dumps({"openid": openid, "profile": profile})
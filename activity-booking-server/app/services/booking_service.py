@@ -1,78 +1,270 @@
-from typing import Optional
+from collections import Counter
+from typing import Dict, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.uow import UnitOfWork
 from app.models.booking import Booking, BookingStatus
 from app.repositories.activity_repository import ActivityRepository
-from app.repositories.booking_repository import BookingRepository
-from app.schemas.booking import BookingCreate, BookingList
+from app.repositories.base import Loads
+from app.repositories.booking_repository import BookingRepository, WITH_ACTIVITY
+from app.schemas.booking import (
+    BookingCreate,
+    BookingList,
+    BookingBatchItem,
+    BookingBatchResult,
+    BookingBatchCheckinResult,
+    BookingCheckinItem
+)
+from app.services.activity_cache import activity_cache
+from app.services.hot_ranking import hot_ranking
+from app.services.seat_inventory import seat_inventory
+from app.utils.pagination import TotalMode, cursor_of, decode_cursor
+from app.utils.serializer import serializer_for
 
 
 class BookingService:
     """预约业务逻辑层"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.uow = UnitOfWork(db)
         self.booking_repo = BookingRepository(db)
         self.activity_repo = ActivityRepository(db)
-    
-    def create_booking(self, booking_create: BookingCreate, user_id: int) -> Optional[Booking]:
-        """创建预约"""
-        # 检查活动是否存在
-        activity = self.activity_repo.get_by_id(booking_create.activity_id)
-        if not activity:
-            return None
-        
-        # 检查是否已满员
-        if activity.booked_count >= activity.max_participants:
+
+    async def create_booking(self, booking_create: BookingCreate, user_id: int) -> Optional[Booking]:
+        """
+        创建预约
+
+        容量检查、计数递增和预约写入在同一事务中完成：
+        条件 UPDATE 占座成功后才插入预约，并发下不会超卖，整个流程只提交一次
+        """
+        if seat_inventory.enabled:
+            return await self._create_booking_with_inventory(booking_create, user_id)
+
+        async with self.uow:
+            # 原子占座（活动不存在、已停用或已满员时返回 None）
+            activity = await self.activity_repo.reserve_seats(
+                booking_create.activity_id,
+                booking_create.participants
+            )
+            if not activity:
+                return None
+
+            # 创建预约，关联活动直接使用占座 UPDATE ... RETURNING 返回的行
+            booking_data = booking_create.model_dump()
+            booking_data['user_id'] = user_id
+            booking = await self.booking_repo.create(booking_data)
+            set_committed_value(booking, "activity", activity)
+
+            # 预约人数变化，提交后失效活动缓存并更新热门排行
+            self.uow.after_commit(lambda: activity_cache.invalidate(activity.id))
+            self.uow.after_commit(lambda: hot_ranking.record_bookings([booking]))
+        return booking
+
+    async def _create_booking_with_inventory(self, booking_create: BookingCreate, user_id: int) -> Optional[Booking]:
+        """
+        Redis 库存模式下创建预约
+
+        先在 Redis 中原子占座，满员请求不访问数据库；占座成功后只插入预约，
+        不更新 activities 行，booked_count 由后台任务异步回写
+        """
+        activity_id = booking_create.activity_id
+        participants = booking_create.participants
+        if not await seat_inventory.reserve(self.db, activity_id, participants):
             return None
-        
-        # 创建预约
-        booking_data = booking_create.model_dump()
-        booking_data['user_id'] = user_id
-        booking = self.booking_repo.create(booking_data)
-        
-        # 更新活动已预约人数
-        self.activity_repo.increment_booked_count(activity.id, booking_create.participants)
-        
+
+        try:
+            async with self.uow:
+                booking_data = booking_create.model_dump()
+                booking_data['user_id'] = user_id
+                booking = await self.booking_repo.create(booking_data)
+                # 响应中嵌套活动信息，在同一事务内加载
+                await self.db.refresh(booking, attribute_names=["activity"])
+                self.uow.after_commit(lambda: hot_ranking.record_bookings([booking]))
+        except Exception:
+            await seat_inventory.release(activity_id, participants)
+            raise
         return booking
-    
-    def get_user_bookings(self, user_id: int) -> BookingList:
-        """获取用户的预约列表"""
-        bookings = self.booking_repo.get_user_bookings(user_id)
-        return BookingList(items=bookings, total=len(bookings))
-    
-    def get_user_booking(self, booking_id: int, user_id: int) -> Optional[Booking]:
+
+    async def create_bookings(self, items: List[BookingCreate], user_id: int) -> BookingBatchResult:
+        """
+        批量创建预约（团体报名）
+
+        按活动汇总人数后一次性占座，同一活动的预约整体成功或失败；占座成功的预约
+        用一条多行 INSERT 写入，整个批次只提交一次
+        """
+        seats = Counter()
+        for item in items:
+            seats[item.activity_id] += item.participants
+
+        if seat_inventory.enabled:
+            reserved = await self._reserve_inventory(seats)
+        else:
+            reserved = None
+
+        try:
+            async with self.uow:
+                if reserved is None:
+                    activities = await self.activity_repo.reserve_seats_many(dict(seats))
+                else:
+                    activities = await self.activity_repo.get_by_ids(list(reserved)) if reserved else {}
+
+                rows = [
+                    {**item.model_dump(), "user_id": user_id}
+                    for item in items if item.activity_id in activities
+                ]
+                bookings = await self.booking_repo.create_many(rows) if rows else []
+                for booking in bookings:
+                    set_committed_value(booking, "activity", activities[booking.activity_id])
+
+                if activities and reserved is None:
+                    self.uow.after_commit(lambda: activity_cache.invalidate(*activities))
+                if bookings:
+                    self.uow.after_commit(lambda: hot_ranking.record_bookings(bookings))
+        except Exception:
+            for activity_id in reserved or ():
+                await seat_inventory.release(activity_id, seats[activity_id])
+            raise
+
+        created = iter(bookings)
+        results = [
+            BookingBatchItem(index=index, success=True, booking=next(created))
+            if item.activity_id in activities else
+            BookingBatchItem(index=index, success=False, message="活动不存在或已满员")
+            for index, item in enumerate(items)
+        ]
+        return BookingBatchResult(succeeded=len(bookings), failed=len(items) - len(bookings), items=results)
+
+    async def _reserve_inventory(self, seats: Dict[int, int]) -> List[int]:
+        """Redis 库存模式下按活动占座，返回占座成功的活动 ID"""
+        reserved = []
+        for activity_id, count in seats.items():
+            if await seat_inventory.reserve(self.db, activity_id, count):
+                reserved.append(activity_id)
+        return reserved
+
+    async def get_user_bookings(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        total_mode: TotalMode = TotalMode.EXACT,
+        load: Loads = WITH_ACTIVITY
+    ) -> BookingList:
+        """
+        获取用户的预约列表（按创建时间倒序游标分页）
+
+        load 声明需要加载的关联数据，默认在同一条查询中 JOIN 活动信息，查询数与列表长度无关
+        """
+        return BookingList(**await self._get_user_bookings_page(user_id, cursor, page_size, total_mode, load))
+
+    async def get_user_bookings_json(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        total_mode: TotalMode = TotalMode.EXACT
+    ) -> bytes:
+        """获取用户的预约列表（由 ORM 对象直接序列化为 JSON，跳过 Pydantic 模型）"""
+        return serializer_for(BookingList).dumps(
+            await self._get_user_bookings_page(user_id, cursor, page_size, total_mode, WITH_ACTIVITY)
+        )
+
+    async def _get_user_bookings_page(
+        self,
+        user_id: int,
+        cursor: Optional[str],
+        page_size: int,
+        total_mode: TotalMode,
+        load: Loads
+    ) -> dict:
+        """查询一页预约，返回 BookingList 的字段（items 为 ORM 对象）"""
+        after = decode_cursor(cursor) if cursor else None
+        # 多取一条判断是否还有下一页
+        bookings = await self.booking_repo.get_user_bookings_after(user_id, after, page_size + 1, load)
+        next_cursor = cursor_of(bookings[page_size - 1], "created_at") if len(bookings) > page_size else None
+        bookings = bookings[:page_size]
+
+        # 单个用户的预约数走 (user_id, ...) 索引，估算模式同样返回精确值
+        total = None
+        if total_mode != TotalMode.NONE:
+            if after is None and next_cursor is None:
+                total = len(bookings)
+            else:
+                total = await self.booking_repo.count_user_bookings(user_id)
+        return dict(items=bookings, total=total, next_cursor=next_cursor)
+
+    async def get_user_booking(
+        self,
+        booking_id: int,
+        user_id: int,
+        load: Loads = WITH_ACTIVITY
+    ) -> Optional[Booking]:
         """获取用户特定的预约"""
-        return self.booking_repo.get_user_booking(booking_id, user_id)
-    
-    def cancel_booking(self, booking_id: int, user_id: int) -> bool:
-        """取消预约"""
-        booking = self.booking_repo.get_user_booking(booking_id, user_id)
-        if not booking:
-            return False
-        
-        if booking.status != BookingStatus.CONFIRMED:
-            return False
-        
-        # 更新预约状态
-        success = self.booking_repo.cancel_booking(booking_id)
-        if success:
-            # 更新活动已预约人数
-            self.activity_repo.decrement_booked_count(booking.activity_id, booking.participants)
-        
-        return success
-    
-    def checkin_booking(self, booking_id: int, user_id: int) -> bool:
-        """签到预约"""
-        booking = self.booking_repo.get_user_booking(booking_id, user_id)
-        if not booking:
-            return False
-        
-        if booking.status != BookingStatus.CONFIRMED:
-            return False
-        
-        if booking.checked_in:
-            return False
-        
-        # 更新签到状态
-        return self.booking_repo.checkin_booking(booking_id)
+        return await self.booking_repo.get_user_booking(booking_id, user_id, load)
+
+    async def cancel_booking(self, booking_id: int, user_id: int) -> bool:
+        """取消预约（状态变更与名额释放在同一事务中完成）"""
+        async with self.uow:
+            booking = await self.booking_repo.cancel_user_booking(booking_id, user_id)
+            if not booking:
+                return False
+
+            # 释放活动名额（Redis 库存模式下由库存释放，booked_count 异步回写）
+            if seat_inventory.enabled:
+                self.uow.after_commit(lambda: seat_inventory.release(booking.activity_id, booking.participants))
+            else:
+                await self.activity_repo.release_seats(booking.activity_id, booking.participants)
+                self.uow.after_commit(lambda: activity_cache.invalidate(booking.activity_id))
+            self.uow.after_commit(lambda: hot_ranking.record_cancellation(booking))
+        return True
+
+    async def checkin_booking(self, booking_id: int, user_id: int) -> bool:
+        """签到（仅已确认且未签到的预约可以签到）"""
+        async with self.uow:
+            return await self.booking_repo.checkin_user_booking(booking_id, user_id)
+
+    async def checkin_bookings(
+        self,
+        booking_ids: List[int],
+        activity_id: Optional[int] = None
+    ) -> BookingBatchCheckinResult:
+        """
+        批量签到（工作人员现场签到）
+
+        一条 UPDATE ... WHERE id = ANY(...) 完成所有签到；只有存在失败项时才再查询一次失败原因
+        """
+        booking_ids = list(dict.fromkeys(booking_ids))
+        async with self.uow:
+            checked = set(await self.booking_repo.checkin_many(booking_ids, activity_id))
+            failed = [booking_id for booking_id in booking_ids if booking_id not in checked]
+            states = await self.booking_repo.get_checkin_states(failed) if failed else {}
+
+        results = []
+        for booking_id in booking_ids:
+            if booking_id in checked:
+                results.append(BookingCheckinItem(booking_id=booking_id, success=True))
+            else:
+                message = self._checkin_failure(states.get(booking_id), activity_id)
+                results.append(BookingCheckinItem(booking_id=booking_id, success=False, message=message))
+        return BookingBatchCheckinResult(
+            succeeded=len(checked),
+            failed=len(booking_ids) - len(checked),
+            items=results
+        )
+
+    @staticmethod
+    def _checkin_failure(state: Optional[tuple], activity_id: Optional[int]) -> str:
+        """签到失败原因"""
+        if state is None:
+            return "预约不存在"
+        booking_activity_id, status, checked_in = state
+        if activity_id is not None and booking_activity_id != activity_id:
+            return "预约不属于该活动"
+        if checked_in or status == BookingStatus.COMPLETED:
+            return "已签到"
+        if status == BookingStatus.CANCELLED:
+            return "预约已取消"
+        return "预约无法签到"
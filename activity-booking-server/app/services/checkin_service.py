@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.booking import BookingStatus
+from app.repositories.booking_repository import BookingRepository
+from app.schemas.booking import BookingCheckinItem, CheckinSyncItem, CheckinSyncResult, CheckinToken
+from app.services.booking_service import BookingService
+from app.utils.checkin_token import InvalidCheckinTokenError, issue_checkin_token, verify_checkin_token
+
+
+class CheckinService:
+    """
+    扫码签到业务逻辑层
+
+    预约人出示 HMAC 签名的二维码，工作人员扫码后在本地校验签名和有效期（不查询数据库），
+    再用一条条件 UPDATE 完成签到；离线扫码的结果可以批量同步
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.booking_repo = BookingRepository(db)
+        self.booking_service = BookingService(db)
+
+    async def issue_token(self, booking_id: int, user_id: int) -> Optional[CheckinToken]:
+        """为用户自己的已确认预约签发签到令牌，有效期到活动结束后 CHECKIN_TOKEN_GRACE 秒"""
+        booking = await self.booking_repo.get_user_booking(booking_id, user_id)
+        if not booking or booking.status != BookingStatus.CONFIRMED or booking.checked_in:
+            return None
+
+        expires_at = booking.activity.end_time + timedelta(seconds=settings.CHECKIN_TOKEN_GRACE)
+        if expires_at <= datetime.now():
+            return None
+        return CheckinToken(
+            token=issue_checkin_token(booking.id, booking.activity_id, expires_at),
+            expires_at=expires_at
+        )
+
+    async def scan(self, token: str, activity_id: Optional[int] = None) -> BookingCheckinItem:
+        """扫码签到；二维码无效或不属于指定活动时抛出 InvalidCheckinTokenError"""
+        claims = verify_checkin_token(token)
+        if activity_id is not None and claims.activity_id != activity_id:
+            raise InvalidCheckinTokenError("二维码不属于该活动")
+
+        result = await self.booking_service.checkin_bookings([claims.booking_id])
+        return result.items[0]
+
+    async def sync(self, tokens: List[str], activity_id: Optional[int] = None) -> CheckinSyncResult:
+        """
+        批量同步离线扫码结果
+
+        先在本地校验所有二维码，有效的预约用一条 UPDATE 批量签到。
+        重复提交是安全的：已签到的预约返回「已签到」
+        """
+        items: List[Optional[CheckinSyncItem]] = [None] * len(tokens)
+        pending = {}
+        for index, token in enumerate(tokens):
+            try:
+                claims = verify_checkin_token(token)
+                if activity_id is not None and claims.activity_id != activity_id:
+                    raise InvalidCheckinTokenError("二维码不属于该活动")
+            except InvalidCheckinTokenError as e:
+                items[index] = CheckinSyncItem(index=index, success=False, message=str(e))
+                continue
+            pending.setdefault(claims.booking_id, []).append(index)
+
+        if pending:
+            result = await self.booking_service.checkin_bookings(list(pending))
+            for item in result.items:
+                for position, index in enumerate(pending[item.booking_id]):
+                    # 同一个二维码被扫了多次：只有第一次计为签到成功
+                    success = item.success and position == 0
+                    message = item.message if position == 0 else "重复扫码"
+                    items[index] = CheckinSyncItem(
+                        index=index,
+                        booking_id=item.booking_id,
+                        success=success,
+                        message=None if success else message
+                    )
+
+        succeeded = sum(1 for item in items if item.success)
+        return CheckinSyncResult(succeeded=succeeded, failed=len(items) - succeeded, items=items)
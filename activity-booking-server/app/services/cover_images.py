@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.repositories.activity_repository import ActivityRepository
+from app.services.activity_cache import activity_cache
+from app.utils.images import (
+    avif_supported,
+    derive,
+    probe,
+    rendition_digest,
+    rendition_name,
+    target_widths
+)
+
+logger = logging.getLogger(__name__)
+
+# 生成的文件存放在静态文件目录下，通过 /static 访问
+COVER_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "static", "images", "covers")
+COVER_URL_PREFIX = "/static/images/covers"
+
+
+class CoverImagePipeline:
+    """
+    活动封面图处理
+
+    上传的原图只在请求中校验格式和尺寸，缩放和编码在进程池中执行，不占用事件循环；
+    生成各宽度的 WebP（和 AVIF）并去除元数据，按内容摘要命名，相同图片只处理一次。
+    完成后把 srcset 写入活动并失效缓存；原图不保存
+    """
+
+    def __init__(self):
+        self.directory = COVER_DIRECTORY
+        self.widths: List[int] = sorted(settings.COVER_IMAGE_WIDTHS)
+        self.formats: Dict[str, int] = {"webp": settings.COVER_WEBP_QUALITY}
+        if settings.COVER_AVIF_ENABLED and avif_supported():
+            self.formats["avif"] = settings.COVER_AVIF_QUALITY
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """创建进程池（在应用启动时调用）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=settings.COVER_PROCESS_WORKERS)
+
+    async def close(self) -> None:
+        """等待进行中的处理完成并关闭进程池"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def inspect(self, data: bytes) -> Tuple[str, int]:
+        """校验原图，返回 (内容摘要, 原图宽度)；不是支持的图片时抛出 InvalidImageError"""
+        _, width, _ = probe(data, settings.COVER_MAX_PIXELS)
+        return rendition_digest(data, self.widths, self.formats), width
+
+    def srcset(self, renditions: Dict[str, List[Tuple[int, str]]]) -> dict:
+        """由生成结果构建 cover_srcset，键固定为 thumbnail、hero、webp、avif（未生成 AVIF 时为 None）"""
+        urls = {
+            image_format: [(width, f"{COVER_URL_PREFIX}/{name}") for width, name in items]
+            for image_format, items in renditions.items()
+        }
+        return {
+            "thumbnail": urls["webp"][0][1],
+            "hero": urls["webp"][-1][1],
+            "webp": ", ".join(f"{url} {width}w" for width, url in urls["webp"]),
+            "avif": ", ".join(f"{url} {width}w" for width, url in urls["avif"]) if "avif" in urls else None,
+        }
+
+    def existing_srcset(self, digest: str, width: int) -> Optional[dict]:
+        """相同内容已处理过（文件都已存在）时直接返回 srcset"""
+        renditions = {image_format: [] for image_format in self.formats}
+        for target in target_widths(width, self.widths):
+            for image_format in self.formats:
+                name = rendition_name(digest, target, image_format)
+                if not os.path.exists(os.path.join(self.directory, name)):
+                    return None
+                renditions[image_format].append((target, name))
+        return self.srcset(renditions)
+
+    async def derive(self, data: bytes, digest: str) -> dict:
+        """在进程池中生成各版本，返回 cover_srcset"""
+        self.start()
+        renditions = await asyncio.get_running_loop().run_in_executor(
+            self._executor, derive, data, self.directory, digest, self.widths, self.formats
+        )
+        return self.srcset(renditions)
+
+    async def submit(self, activity_id: int, data: bytes) -> Optional[dict]:
+        """
+        为活动设置封面
+
+        已处理过的图片立即写入活动并返回 srcset；否则在后台生成，完成后写入活动，返回 None
+        """
+        digest, width = self.inspect(data)
+        srcset = self.existing_srcset(digest, width)
+        if srcset is not None:
+            await self.apply(activity_id, srcset)
+            return srcset
+
+        task = asyncio.create_task(self._process(activity_id, data, digest))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return None
+
+    async def _process(self, activity_id: int, data: bytes, digest: str) -> None:
+        try:
+            await self.apply(activity_id, await self.derive(data, digest))
+        except Exception:
+            logger.exception("生成活动 %s 的封面图失败", activity_id)
+
+    async def apply(self, activity_id: int, srcset: dict) -> None:
+        """把封面写入活动（cover_image 使用详情页头图），提交后失效缓存"""
+        async with AsyncSessionLocal() as db:
+            updated = await ActivityRepository(db).update_cover(activity_id, srcset["hero"], srcset)
+            await db.commit()
+        if updated:
+            await activity_cache.invalidate(activity_id)
+
+
+cover_images = CoverImagePipeline()
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_async_redis
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.repositories.activity_repository import ActivityRepository
+
+logger = logging.getLogger(__name__)
+
+# 重建时只统计最近若干个半衰期内的预约，更早的贡献已不足千分之一
+_WINDOW_HALF_LIVES = 10
+
+# 增量更新热度：按 2^((事件时间 - epoch) / 半衰期) 计权后 ZINCRBY
+# 传入结束时间（预约、发布）时登记结束时间，已结束的活动忽略；
+# 不传结束时间（取消）时只更新已在排行中的活动；排行未构建时跳过，等待重建
+RECORD_SCRIPT = """
+local epoch = tonumber(redis.call('GET', KEYS[3]))
+if not epoch then
+    return 0
+end
+local end_time = tonumber(ARGV[5])
+if end_time then
+    if end_time <= tonumber(ARGV[6]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[2], end_time, ARGV[1])
+elseif not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+local weight = 2 ^ math.max((tonumber(ARGV[3]) - epoch) / tonumber(ARGV[4]), -1000)
+redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[2]) * weight, ARGV[1])
+return 1
+"""
+
+# 读取排行：先惰性移除已结束的活动，再按分数倒序取前 N 个；排行未构建时返回 nil
+TOP_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 0 then
+    return false
+end
+local ended = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 1000)
+if #ended > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ended))
+    redis.call('ZREM', KEYS[2], unpack(ended))
+end
+return redis.call('ZREVRANGE', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+"""
+
+# 原子替换为重建结果并推进 epoch
+REPLACE_SCRIPT = """
+for i = 1, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('RENAME', KEYS[i], KEYS[i + 2])
+        redis.call('PERSIST', KEYS[i + 2])
+    else
+        redis.call('DEL', KEYS[i + 2])
+    end
+end
+redis.call('SET', KEYS[5], ARGV[1])
+return 1
+"""
+
+
+def _timestamp(moment: Optional[datetime]) -> float:
+    return moment.timestamp() if moment else time.time()
+
+
+class HotRanking:
+    """
+    热门活动排行
+
+    活动热度保存在 Redis 有序集合中：每位参与者的预约贡献随时间按半衰期
+    HOT_RANKING_HALF_LIFE 指数衰减，新发布的活动带有同样衰减的初始热度。
+    采用前向衰减，事件发生时按 2^((t - epoch) / 半衰期) 放大权重，
+    衰减后的相对排序不随时间变化，预约和取消都只需一次 ZINCRBY，不需要重写已有分数；
+    重建任务定期从数据库重新计算全部分数并推进 epoch，修正增量更新的偏差、防止权重无限增长。
+    读取前 N 名为 O(log n + N)，不访问数据库；已结束的活动在读取时惰性移除
+    """
+
+    SCORES_KEY = "hot:scores"
+    ENDS_KEY = "hot:ends"
+    EPOCH_KEY = "hot:epoch"
+    LOCK_KEY = "hot:rebuild:lock"
+
+    def __init__(self):
+        self.client = get_async_redis()
+        self._record = self.client.register_script(RECORD_SCRIPT)
+        self._top = self.client.register_script(TOP_SCRIPT)
+        self._replace = self.client.register_script(REPLACE_SCRIPT)
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用 Redis 热门排行"""
+        return settings.HOT_RANKING_ENABLED
+
+    async def _record_many(self, events: Iterable[tuple]) -> None:
+        """批量写入热度事件：(活动ID, 热度增量, 事件时间, 结束时间或 None)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        keys = [self.SCORES_KEY, self.ENDS_KEY, self.EPOCH_KEY]
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for activity_id, amount, at, end_time in events:
+                    args = [
+                        activity_id, amount, _timestamp(at), settings.HOT_RANKING_HALF_LIFE,
+                        end_time.timestamp() if end_time else "", now
+                    ]
+                    await self._record(keys=keys, args=args, client=pipe)
+                await pipe.execute()
+        except Exception:
+            # 排行只影响热门列表的排序，写入失败由下一次重建修正，不影响预约流程
+            logger.warning("更新热门活动排行失败", exc_info=True)
+
+    async def record_bookings(self, bookings: Iterable) -> None:
+        """记录新预约（预约需已关联活动，用于登记活动结束时间）"""
+        await self._record_many(
+            (booking.activity_id, booking.participants, None, booking.activity.end_time)
+            for booking in bookings
+        )
+
+    async def record_cancellation(self, booking) -> None:
+        """记录取消：按原预约时间扣除该预约贡献的热度"""
+        await self._record_many([(booking.activity_id, -booking.participants, booking.created_at, None)])
+
+    async def add_activity(self, activity) -> None:
+        """新发布的活动进入排行，带有初始热度"""
+        await self._record_many([
+            (activity.id, settings.HOT_RANKING_NEW_BOOST, activity.created_at, activity.end_time)
+        ])
+
+    async def update_activity(self, activity) -> None:
+        """活动停用时移出排行，结束时间变化时更新；重新启用的活动在下次重建时加入"""
+        if not self.enabled:
+            return
+        if not activity.is_active:
+            await self.remove(activity.id)
+            return
+        try:
+            await self.client.zadd(self.ENDS_KEY, {activity.id: activity.end_time.timestamp()}, xx=True)
+        except Exception:
+            logger.warning("更新热门活动排行失败", exc_info=True)
+
+    async def remove(self, activity_id: int) -> None:
+        """移出排行"""
+        if not self.enabled:
+            return
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.SCORES_KEY, activity_id)
+                pipe.zrem(self.ENDS_KEY, activity_id)
+                await pipe.execute()
+        except Exception:
+            logger.warning("更新热门活动排行失败", exc_info=True)
+
+    async def top(self, limit: int = 10) -> Optional[List[int]]:
+        """热度最高的活动 ID；未启用、排行尚未构建或 Redis 不可用时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            ids = await self._top(
+                keys=[self.SCORES_KEY, self.ENDS_KEY, self.EPOCH_KEY],
+                args=[time.time(), limit]
+            )
+        except Exception:
+            logger.warning("读取热门活动排行失败", exc_info=True)
+            return None
+        return None if ids is None else [int(activity_id) for activity_id in ids]
+
+    async def acquire_rebuild_lock(self, ttl: int) -> bool:
+        """多个进程之间每个周期只由一个进程重建"""
+        return bool(await self.client.set(self.LOCK_KEY, 1, nx=True, ex=max(ttl, 1)))
+
+    async def rebuild(self, db: AsyncSession, batch_size: int = 1000) -> int:
+        """
+        从数据库重新计算所有进行中和未开始活动的热度，原子替换排行并推进 epoch，返回活动数
+
+        查询和替换之间发生的增量更新会被覆盖，由下一次重建计入
+        """
+        epoch = time.time()
+        epoch_at = datetime.fromtimestamp(epoch)
+        half_life = settings.HOT_RANKING_HALF_LIFE
+        rows = await ActivityRepository(db).get_hot_scores(
+            epoch_at,
+            half_life,
+            settings.HOT_RANKING_NEW_BOOST,
+            epoch_at - timedelta(seconds=half_life * _WINDOW_HALF_LIVES)
+        )
+
+        suffix = uuid.uuid4().hex
+        scores_key = f"{self.SCORES_KEY}:rebuild:{suffix}"
+        ends_key = f"{self.ENDS_KEY}:rebuild:{suffix}"
+        async with self.client.pipeline(transaction=False) as pipe:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                pipe.zadd(scores_key, {activity_id: score for activity_id, _, score in batch})
+                pipe.zadd(ends_key, {activity_id: end_time.timestamp() for activity_id, end_time, _ in batch})
+            # 重建中断时临时键自动过期
+            pipe.expire(scores_key, 600)
+            pipe.expire(ends_key, 600)
+            await pipe.execute()
+
+        await self._replace(
+            keys=[scores_key, ends_key, self.SCORES_KEY, self.ENDS_KEY, self.EPOCH_KEY],
+            args=[epoch]
+        )
+        return len(rows)
+
+
+hot_ranking = HotRanking()
+
+
+async def run_hot_ranking_rebuild(stop: asyncio.Event) -> None:
+    """后台任务：定期从数据库重建热门排行（启动时立即重建一次）"""
+    interval = settings.HOT_RANKING_REBUILD_INTERVAL
+    while not stop.is_set():
+        try:
+            if await hot_ranking.acquire_rebuild_lock(interval - 1):
+                async with AsyncSessionLocal() as db:
+                    count = await hot_ranking.rebuild(db)
+                logger.info("热门活动排行已重建: %s 个活动", count)
+        except Exception:
+            logger.exception("重建热门活动排行失败")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
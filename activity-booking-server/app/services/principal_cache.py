@@ -0,0 +1,45 @@
+from typing import Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.tiered_cache import TieredCache
+from app.repositories.user_repository import UserRepository
+from app.schemas.user import User as UserSchema
+
+
+class PrincipalCache:
+    """
+    已认证用户快照缓存
+
+    按用户 ID 缓存用户信息快照（进程内 LRU + Redis），认证时命中缓存即可完成，
+    不需要查询数据库，也不会从连接池取连接。用户信息更新或被禁用时失效，
+    所有进程通过 pub/sub 同步清理本地缓存
+    """
+
+    def __init__(self):
+        self.cache = TieredCache(
+            "principal",
+            ttl=settings.PRINCIPAL_CACHE_TTL,
+            local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+            maxsize=10000,
+            enabled=settings.PRINCIPAL_CACHE_ENABLED
+        )
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[UserSchema]:
+        """获取用户快照，用户不存在时返回 None"""
+        raw = await self.cache.get_or_load(str(user_id), lambda: self._load(db, user_id))
+        return UserSchema.model_validate_json(raw) if raw else None
+
+    @staticmethod
+    async def _load(db: AsyncSession, user_id: int) -> Optional[bytes]:
+        user = await UserRepository(db).get_by_id(user_id)
+        return orjson.dumps(UserSchema.model_validate(user).model_dump()) if user else None
+
+    async def invalidate(self, user_id: int) -> None:
+        """失效用户快照"""
+        await self.cache.invalidate(str(user_id))
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_async_redis
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.repositories.activity_repository import ActivityRepository
+from app.services.activity_cache import activity_cache
+
+logger = logging.getLogger(__name__)
+
+# 占座：库存未加载返回 -2，余量不足返回 -1，成功返回剩余名额
+RESERVE_SCRIPT = """
+local remaining = redis.call('HGET', KEYS[1], 'remaining')
+if not remaining then
+    return -2
+end
+local count = tonumber(ARGV[1])
+if tonumber(remaining) < count then
+    return -1
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+return redis.call('HINCRBY', KEYS[1], 'remaining', -count)
+"""
+
+# 释放名额：不超过活动容量；库存未加载返回 -2
+RELEASE_SCRIPT = """
+local values = redis.call('HMGET', KEYS[1], 'remaining', 'capacity')
+if not values[1] then
+    return -2
+end
+local remaining = math.min(tonumber(values[1]) + tonumber(ARGV[1]), tonumber(values[2]))
+redis.call('HSET', KEYS[1], 'remaining', remaining)
+redis.call('SADD', KEYS[2], ARGV[2])
+return remaining
+"""
+
+# 加载库存：仅在不存在时写入，避免覆盖并发加载或已发生的占座
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'remaining', ARGV[1], 'capacity', ARGV[2])
+return 1
+"""
+
+# 修复漂移：仅当余量自观测以来未变化时才覆盖（比较并设置）
+REPAIR_SCRIPT = """
+local remaining = redis.call('HGET', KEYS[1], 'remaining')
+if remaining ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'remaining', ARGV[2], 'capacity', ARGV[3])
+return 1
+"""
+
+
+class SeatInventory:
+    """
+    Redis 座位库存
+
+    热门活动的剩余名额保存在 Redis 哈希中，通过 Lua 脚本原子占座和释放，
+    满员请求直接在 Redis 中拒绝而不访问数据库；
+    Activity.booked_count 由后台任务根据预约表异步回写。
+    释放名额、删除库存在数据库提交之后执行，Redis 出错时不向调用方抛出，
+    只记录活动，由后台任务对账修复
+    """
+
+    KEY_PREFIX = "seat:inventory:"
+    DIRTY_KEY = "seat:dirty"
+    NOT_LOADED = -2
+    SOLD_OUT = -1
+
+    def __init__(self):
+        self.client = get_async_redis()
+        self._reserve = self.client.register_script(RESERVE_SCRIPT)
+        self._release = self.client.register_script(RELEASE_SCRIPT)
+        self._load = self.client.register_script(LOAD_SCRIPT)
+        self._repair = self.client.register_script(REPAIR_SCRIPT)
+        # 释放或删除库存失败、等待对账的活动（进程内记录，Redis 不可用时也能保留）
+        self._pending: Set[int] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用 Redis 库存模式"""
+        return settings.SEAT_INVENTORY_MODE == "redis"
+
+    def _key(self, activity_id: int) -> str:
+        return f"{self.KEY_PREFIX}{activity_id}"
+
+    async def reserve(self, db: AsyncSession, activity_id: int, count: int = 1) -> bool:
+        """占座，库存未加载时先从数据库加载"""
+        keys = [self._key(activity_id), self.DIRTY_KEY]
+        result = await self._reserve(keys=keys, args=[count, activity_id])
+        if result == self.NOT_LOADED:
+            if not await self.load(db, activity_id):
+                return False
+            result = await self._reserve(keys=keys, args=[count, activity_id])
+        return result >= 0
+
+    async def release(self, activity_id: int, count: int = 1) -> None:
+        """释放名额；Redis 出错时记录活动等待对账"""
+        try:
+            await self._release(keys=[self._key(activity_id), self.DIRTY_KEY], args=[count, activity_id])
+        except RedisError:
+            logger.exception("释放座位库存失败，等待对账: activity=%s count=%s", activity_id, count)
+            self._pending.add(activity_id)
+
+    async def load(self, db: AsyncSession, activity_id: int) -> bool:
+        """从预约表加载剩余名额，活动不存在或已停用时返回 False"""
+        snapshot = await ActivityRepository(db).get_seat_snapshots([activity_id])
+        if activity_id not in snapshot:
+            return False
+        capacity, is_active, booked = snapshot[activity_id]
+        if not is_active:
+            return False
+        await self._load(keys=[self._key(activity_id)], args=[max(capacity - booked, 0), capacity])
+        return True
+
+    async def invalidate(self, activity_id: int) -> None:
+        """删除活动库存（活动停用或容量变化时调用，下次占座重新加载）；Redis 出错时记录活动等待对账"""
+        try:
+            await self.client.delete(self._key(activity_id))
+        except RedisError:
+            logger.exception("删除座位库存失败，等待对账: activity=%s", activity_id)
+            self._pending.add(activity_id)
+
+    async def sync_booked_counts(self, db: AsyncSession, batch_size: int = 500) -> int:
+        """将有变动的活动 booked_count 按预约表回写数据库，返回处理的活动数"""
+        activity_ids = await self.client.spop(self.DIRTY_KEY, batch_size)
+        if not activity_ids:
+            return 0
+        ids = [int(activity_id) for activity_id in activity_ids]
+        try:
+            await ActivityRepository(db).sync_booked_counts(ids)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # 回写失败时重新标记，等待下一轮
+            await self.client.sadd(self.DIRTY_KEY, *ids)
+            raise
+        await activity_cache.invalidate(*ids)
+        return len(ids)
+
+    async def _read_remaining(self, activity_ids: List[int]) -> Dict[int, Optional[Tuple[str, str]]]:
+        pipe = self.client.pipeline(transaction=False)
+        for activity_id in activity_ids:
+            pipe.hmget(self._key(activity_id), "remaining", "capacity")
+        values = await pipe.execute()
+        return {
+            activity_id: (remaining, capacity) if remaining is not None else None
+            for activity_id, (remaining, capacity) in zip(activity_ids, values)
+        }
+
+    async def reconcile(self, db: AsyncSession, grace: float = 1.0, batch_size: int = 500) -> List[dict]:
+        """
+        检测并修复 Redis 库存与预约表之间的漂移
+
+        对每批库存键，先比较 Redis 余量与「容量 - 已确认人数」；存在差异的活动
+        等待 grace 秒后再次观测，两次观测结果一致（没有进行中的预约）才修复，
+        避免把尚未提交的占座误判为漂移。同时按预约表修正 booked_count。
+        """
+        repaired = []
+        activity_repo = ActivityRepository(db)
+        cursor = 0
+        while True:
+            cursor, keys = await self.client.scan(cursor, match=f"{self.KEY_PREFIX}*", count=batch_size)
+            activity_ids = [int(key[len(self.KEY_PREFIX):]) for key in keys]
+            if activity_ids:
+                repaired.extend(await self._reconcile_batch(db, activity_repo, activity_ids, grace))
+            if cursor == 0:
+                break
+        return repaired
+
+    async def reconcile_pending(self, db: AsyncSession, grace: float = 1.0) -> List[dict]:
+        """对账释放或删除库存失败的活动；Redis 仍不可用时保留记录，等待下一轮"""
+        if not self._pending:
+            return []
+        activity_ids = list(self._pending)
+        repaired = await self._reconcile_batch(db, ActivityRepository(db), activity_ids, grace)
+        self._pending.difference_update(activity_ids)
+        return repaired
+
+    async def _reconcile_batch(
+        self,
+        db: AsyncSession,
+        activity_repo: ActivityRepository,
+        activity_ids: List[int],
+        grace: float
+    ) -> List[dict]:
+        repaired = []
+        first = await self._find_drift(activity_repo, activity_ids)
+        if first:
+            await asyncio.sleep(grace)
+            second = await self._find_drift(activity_repo, list(first))
+            for activity_id, observed in second.items():
+                if first.get(activity_id) != observed:
+                    continue
+                repaired.append(await self._repair_one(activity_id, observed))
+        await activity_repo.sync_booked_counts(activity_ids)
+        await db.commit()
+        await activity_cache.invalidate(*activity_ids)
+        return repaired
+
+    async def _find_drift(self, activity_repo: ActivityRepository, activity_ids: List[int]) -> Dict[int, tuple]:
+        """返回存在漂移的活动：{活动ID: (Redis余量, 容量, 是否启用, 期望余量)}"""
+        cached = await self._read_remaining(activity_ids)
+        snapshots = await activity_repo.get_seat_snapshots(activity_ids)
+        drift = {}
+        for activity_id, values in cached.items():
+            if values is None:
+                continue
+            remaining, capacity = values
+            db_capacity, is_active, booked = snapshots.get(activity_id, (0, False, 0))
+            expected = max(db_capacity - booked, 0)
+            if not is_active or int(remaining) != expected or int(capacity) != db_capacity:
+                drift[activity_id] = (remaining, db_capacity, is_active, expected)
+        return drift
+
+    async def _repair_one(self, activity_id: int, observed: tuple) -> dict:
+        remaining, capacity, is_active, expected = observed
+        if not is_active:
+            await self.invalidate(activity_id)
+            applied = True
+        else:
+            applied = bool(await self._repair(
+                keys=[self._key(activity_id)],
+                args=[remaining, expected, capacity]
+            ))
+        logger.warning(
+            "座位库存漂移: activity=%s redis=%s expected=%s applied=%s",
+            activity_id, remaining, expected, applied
+        )
+        return {"activity_id": activity_id, "redis": int(remaining), "expected": expected, "applied": applied}
+
+
+seat_inventory = SeatInventory()
+
+
+async def run_booked_count_sync(stop: asyncio.Event) -> None:
+    """后台任务：定期回写 booked_count，并对账释放名额失败的活动（仅 Redis 库存模式）"""
+    while not stop.is_set():
+        try:
+            async with AsyncSessionLocal() as db:
+                while await seat_inventory.sync_booked_counts(db):
+                    pass
+                await seat_inventory.reconcile_pending(db)
+        except Exception:
+            logger.exception("回写活动预约人数失败")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.SEAT_INVENTORY_SYNC_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
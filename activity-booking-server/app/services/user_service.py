@@ -1,31 +1,45 @@
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.uow import UnitOfWork
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.schemas.user import UserUpdate
+from app.services.principal_cache import principal_cache
 
 
 class UserService:
     """用户业务逻辑层"""
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
+        self.uow = UnitOfWork(db)
         self.user_repo = UserRepository(db)
-    
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """根据 ID 获取用户"""
-        return self.user_repo.get_by_id(user_id)
-    
-    def get_user_by_openid(self, openid: str) -> Optional[User]:
+        return await self.user_repo.get_by_id(user_id)
+
+    async def get_user_by_openid(self, openid: str) -> Optional[User]:
         """根据微信 openid 获取用户"""
-        return self.user_repo.get_by_openid(openid)
-    
-    def create_user_from_wechat(self, openid: str, user_data: dict) -> User:
+        return await self.user_repo.get_by_openid(openid)
+
+    async def create_user_from_wechat(self, openid: str, user_data: dict) -> User:
         """从微信信息创建用户"""
-        return self.user_repo.create_user_from_wechat(openid, user_data)
-    
-    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+        async with self.uow:
+            return await self.user_repo.create_user_from_wechat(openid, user_data)
+
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
         """更新用户信息"""
-        update_data = user_update.model_dump(exclude_unset=True)
-        return self.user_repo.update_user_info(user_id, update_data)
+        async with self.uow:
+            update_data = user_update.model_dump(exclude_unset=True)
+            user = await self.user_repo.update_user_info(user_id, update_data)
+            self.uow.after_commit(lambda: principal_cache.invalidate(user_id))
+        return user
+
+    async def deactivate_user(self, user_id: int) -> bool:
+        """禁用用户（已签发的令牌随缓存失效立即不可用）"""
+        async with self.uow:
+            success = await self.user_repo.deactivate(user_id)
+            self.uow.after_commit(lambda: principal_cache.invalidate(user_id))
+        return success
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.core.config import settings
+
+# 令牌格式版本，密钥派生或载荷格式变化时递增
+_VERSION = 1
+
+# 载荷：版本(1) + 预约ID(4) + 活动ID(4) + 过期时间 Unix 秒(4)，大端
+_PAYLOAD = struct.Struct(">BIII")
+
+# 截断后的 HMAC-SHA256 长度（128 位），在二维码尺寸和安全性之间取舍
+_SIGNATURE_SIZE = 16
+
+
+class InvalidCheckinTokenError(ValueError):
+    """签到二维码无效（格式错误、签名不匹配或已过期）"""
+
+
+class CheckinClaims(NamedTuple):
+    """签到令牌中携带的信息"""
+    booking_id: int
+    activity_id: int
+    expires_at: int  # Unix 秒
+
+
+@lru_cache(maxsize=1)
+def _signing_key() -> bytes:
+    """从 SECRET_KEY 派生签到专用子密钥，与 JWT 签名密钥隔离"""
+    return hmac.new(settings.SECRET_KEY.encode(), b"checkin-token", hashlib.sha256).digest()
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(_signing_key(), payload, hashlib.sha256).digest()[:_SIGNATURE_SIZE]
+
+
+def issue_checkin_token(booking_id: int, activity_id: int, expires_at: datetime) -> str:
+    """签发预约签到令牌（用于生成二维码）"""
+    payload = _PAYLOAD.pack(_VERSION, booking_id, activity_id, int(expires_at.timestamp()))
+    return base64.urlsafe_b64encode(payload + _sign(payload)).rstrip(b"=").decode()
+
+
+def verify_checkin_token(token: str) -> CheckinClaims:
+    """校验签到令牌，只做本地计算，不访问数据库"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCheckinTokenError("无效的签到二维码") from exc
+    if len(raw) != _PAYLOAD.size + _SIGNATURE_SIZE:
+        raise InvalidCheckinTokenError("无效的签到二维码")
+
+    payload, signature = raw[:_PAYLOAD.size], raw[_PAYLOAD.size:]
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidCheckinTokenError("无效的签到二维码")
+
+    version, booking_id, activity_id, expires_at = _PAYLOAD.unpack(payload)
+    if version != _VERSION:
+        raise InvalidCheckinTokenError("签到二维码版本已失效，请刷新")
+    if expires_at < time.time():
+        raise InvalidCheckinTokenError("签到二维码已过期")
+    return CheckinClaims(booking_id, activity_id, expires_at)
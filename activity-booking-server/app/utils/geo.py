@@ -0,0 +1,88 @@
+import math
+from typing import List, Tuple
+
+# geohash 的 base32 字母表（去掉 a、i、l、o），按 C 排序规则与编码顺序一致
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# 存储精度：9 位约 4.8m x 4.8m，足以按前缀截取到任意更粗的网格
+GEOHASH_PRECISION = 9
+
+# 附近查询最多按多少个网格取候选（每个网格一段索引范围扫描）
+MAX_COVERING_CELLS = 32
+
+EARTH_RADIUS = 6371008.8  # 地球平均半径（米）
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """将经纬度编码为 geohash（经度、纬度二分交替，每 5 位一个字符）"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        if coordinate >= mid:
+            value = (value << 1) | 1
+            interval[0] = mid
+        else:
+            value <<= 1
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """指定精度下单个网格的 (纬度跨度, 经度跨度)，单位为度"""
+    bits = precision * 5
+    return 180.0 / (1 << (bits // 2)), 360.0 / (1 << ((bits + 1) // 2))
+
+
+def covering_cells(latitude: float, longitude: float, radius: float, max_cells: int = MAX_COVERING_CELLS) -> List[str]:
+    """
+    覆盖以 (latitude, longitude) 为圆心、radius（米）为半径的圆的 geohash 网格
+
+    取圆的外接经纬度矩形，选择网格数不超过 max_cells 的最高精度，返回与矩形相交的全部网格；
+    按前缀匹配这些网格即可用 B-tree 索引取出候选活动，再按实际距离过滤。
+    网格越细，候选中落在圆外的活动越少
+    """
+    lat_radius = radius / _METERS_PER_DEGREE
+    # 经度方向按圆覆盖范围内离赤道最远处的纬度计算，保证矩形足够宽
+    far_latitude = min(abs(latitude) + lat_radius, 89.9)
+    lon_radius = lat_radius / math.cos(math.radians(far_latitude))
+    south, north = max(latitude - lat_radius, -90.0), min(latitude + lat_radius, 90.0)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = cell_size(precision)
+        lat_count, lon_count = round(180 / lat_step), round(360 / lon_step)
+        rows = range(
+            int((south + 90) / lat_step),
+            min(int((north + 90) / lat_step), lat_count - 1) + 1
+        )
+        if lon_radius >= 180:
+            columns = range(lon_count)
+        else:
+            first = math.floor((longitude - lon_radius + 180) / lon_step)
+            last = math.floor((longitude + lon_radius + 180) / lon_step)
+            # 跨越 180° 经线时按取模回绕
+            columns = [column % lon_count for column in range(first, last + 1)][:lon_count]
+        if len(rows) * len(columns) > max_cells and precision > 1:
+            continue
+        return [
+            encode((row + 0.5) * lat_step - 90, (column + 0.5) * lon_step - 180, precision)
+            for row in rows
+            for column in columns
+        ]
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """两点间的大圆距离（米，haversine 公式）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Dict, List, Tuple
+
+from PIL import ExifTags, Image, ImageCms, ImageOps, features
+
+# 接受上传的原图格式
+ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP", "AVIF"}
+
+# 生成规则变化（缩放算法、编码参数等）时修改版本号，生成新的摘要和文件名
+RENDITION_VERSION = 1
+
+# 格式 -> Pillow 编码器名称
+_ENCODERS = {"webp": "WEBP", "avif": "AVIF"}
+
+
+class InvalidImageError(ValueError):
+    """不是支持的图片，或尺寸超出限制"""
+
+
+def avif_supported() -> bool:
+    """当前 Pillow 是否支持 AVIF 编码"""
+    return features.check("avif")
+
+
+def probe(data: bytes, max_pixels: int) -> Tuple[str, int, int]:
+    """只解析图片头，校验格式和像素数，返回 (格式, 宽, 高)；宽高为按 EXIF 方向旋正后的值"""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format, (width, height) = image.format, image.size
+            # 方向 5~8 需要旋转 90 度，宽高互换
+            if image.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8):
+                width, height = height, width
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise InvalidImageError("无法识别的图片") from exc
+    if image_format not in ACCEPTED_FORMATS:
+        raise InvalidImageError(f"不支持的图片格式: {image_format}")
+    if width * height > max_pixels:
+        raise InvalidImageError(f"图片尺寸过大: {width}x{height}")
+    return image_format, width, height
+
+
+def rendition_digest(data: bytes, widths: List[int], formats: Dict[str, int]) -> str:
+    """内容摘要：由原图字节和生成参数共同决定，相同图片和参数只生成一次"""
+    digest = hashlib.sha256(data)
+    digest.update(repr((RENDITION_VERSION, sorted(widths), sorted(formats.items()))).encode())
+    return digest.hexdigest()[:16]
+
+
+def rendition_name(digest: str, width: int, image_format: str) -> str:
+    """生成文件名，如 640w.3f2a9c1d0b1e2f3a.webp（带内容指纹，静态文件服务据此设置长期缓存）"""
+    return f"{width}w.{digest}.{image_format}"
+
+
+def target_widths(width: int, widths: List[int]) -> List[int]:
+    """不放大原图：只生成不超过原图宽度的尺寸，原图比最小尺寸还窄时按原宽度生成一份"""
+    return [target for target in sorted(widths) if target <= width] or [width]
+
+
+def _normalize(image: Image.Image) -> Image.Image:
+    """按 EXIF 方向旋正，转换到 sRGB，并去掉 EXIF、ICC、XMP 等全部元数据"""
+    image = ImageOps.exif_transpose(image)
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    mode = "RGBA" if has_alpha else "RGB"
+
+    icc_profile = image.info.get("icc_profile")
+    if icc_profile:
+        try:
+            image = ImageCms.profileToProfile(
+                image,
+                ImageCms.ImageCmsProfile(io.BytesIO(icc_profile)),
+                ImageCms.createProfile("sRGB"),
+                outputMode=mode
+            )
+        except (ImageCms.PyCMSError, ValueError):
+            # 损坏或与图片模式不匹配的色彩配置按 sRGB 处理
+            pass
+    if image.mode != mode:
+        image = image.convert(mode)
+    image.info = {}
+    return image
+
+
+def _save(image: Image.Image, path: str, image_format: str, quality: int) -> None:
+    """写入临时文件后原子替换，并发处理同一张图片时不会读到写了一半的文件"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            image.save(file, format=_ENCODERS[image_format], quality=quality)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def derive(data: bytes, directory: str, digest: str, widths: List[int], formats: Dict[str, int]) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    生成各尺寸、各格式的版本（CPU 密集，在进程池中执行）
+
+    formats 为 {格式: 压缩质量}，返回 {格式: [(宽度, 文件名), ...]}（按宽度升序）；
+    文件已存在（相同内容已处理过）时不重复生成
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = _normalize(source)
+
+    os.makedirs(directory, exist_ok=True)
+    renditions = {image_format: [] for image_format in formats}
+    for width in target_widths(image.width, widths):
+        resized = None
+        for image_format, quality in formats.items():
+            name = rendition_name(digest, width, image_format)
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                if resized is None:
+                    height = max(1, round(image.height * width / image.width))
+                    resized = image if width == image.width else image.resize(
+                        (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+                    )
+                _save(resized, path, image_format, quality)
+            renditions[image_format].append((width, name))
+    return renditions
@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime
+from enum import Enum
+from typing import Any, Tuple
+
+import orjson
+
+
+class TotalMode(str, Enum):
+    """列表总数的计算方式"""
+    EXACT = "exact"  # 精确计数（结果会被缓存）
+    ESTIMATE = "estimate"  # 使用查询计划器的行数估算，不扫描数据
+    NONE = "none"  # 不返回总数
+
+
+class InvalidCursorError(ValueError):
+    """分页游标无法解析"""
+
+
+def _encode(sort_value: Any, id: int) -> str:
+    payload = orjson.dumps([sort_value, id])
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def _decode(cursor: str) -> Tuple[Any, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    sort_value, id = orjson.loads(base64.urlsafe_b64decode(padded))
+    return sort_value, int(id)
+
+
+def encode_cursor(sort_value: datetime, id: int) -> str:
+    """将排序键 (时间, ID) 编码为不透明游标"""
+    return _encode(sort_value.isoformat(), id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标，返回排序键 (时间, ID)"""
+    try:
+        sort_value, id = _decode(cursor)
+        return datetime.fromisoformat(sort_value), id
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("无效的分页游标") from exc
+
+
+def encode_distance_cursor(distance: float, id: int) -> str:
+    """将排序键 (距离, ID) 编码为不透明游标"""
+    return _encode(distance, id)
+
+
+def decode_distance_cursor(cursor: str) -> Tuple[float, int]:
+    """解析距离游标，返回排序键 (距离, ID)"""
+    try:
+        sort_value, id = _decode(cursor)
+        return float(sort_value), id
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("无效的分页游标") from exc
+
+
+def cursor_of(item: Any, sort_attr: str) -> str:
+    """根据列表最后一项生成下一页游标"""
+    return encode_cursor(getattr(item, sort_attr), item.id)
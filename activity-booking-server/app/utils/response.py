@@ -1,8 +1,13 @@
-from typing import Any, Optional
+import hashlib
+import time
+from typing import Any, Optional, Type
 
-from fastapi import HTTPException
+import orjson
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
 
 from app.schemas.response import ApiResponse, ResponseCode
+from app.utils.serializer import serializer_for
 
 
 def create_success_response(
@@ -13,13 +18,70 @@ def create_success_response(
     """创建成功响应"""
     return ApiResponse.success(data=data, message=message, code=code)
 
+def create_raw_success_response(
+    data: bytes,
+    message: str = "操作成功",
+    code: ResponseCode = ResponseCode.SUCCESS
+) -> Response:
+    """使用预序列化的 data（JSON 字节）直接拼接统一响应，跳过 Pydantic 校验和序列化"""
+    body = b'{"code":%d,"message":%s,"data":%s,"error":null,"timestamp":%d}' % (
+        code, orjson.dumps(message), data, int(time.time())
+    )
+    return Response(content=body, media_type="application/json")
+
+def create_serialized_response(
+    data: Any,
+    schema: Type[BaseModel],
+    message: str = "操作成功",
+    code: ResponseCode = ResponseCode.SUCCESS
+) -> Response:
+    """
+    按响应模型的预编译序列化器直接从 ORM 对象生成统一响应
+
+    跳过 ApiResponse 包装和 FastAPI 按 response_model 的二次校验，适合返回数据库实体的接口按需启用
+    """
+    return create_raw_success_response(data=serializer_for(schema).dumps(data), message=message, code=code)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较，支持多个值和 *）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def create_cached_response(
+    request: Request,
+    data: bytes,
+    message: str = "操作成功",
+    max_age: int = 0,
+    stale_while_revalidate: int = 0
+) -> Response:
+    """
+    带 HTTP 缓存头的预序列化响应
+
+    ETag 由 data 和 message 计算（不含时间戳），客户端携带的 If-None-Match 命中时返回 304，
+    不再重复下载未变化的内容。max_age 为 0 时使用 no-cache，客户端每次都重新验证
+    """
+    etag = 'W/"%s"' % hashlib.md5(data + message.encode()).hexdigest()
+    cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+    if stale_while_revalidate:
+        cache_control += f", stale-while-revalidate={stale_while_revalidate}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response = create_raw_success_response(data=data, message=message)
+    response.headers.update(headers)
+    return response
+
 def create_error_response(
     code: ResponseCode,
     message: str,
     error: Optional[str] = None
 ) -> ApiResponse[None]:
     """创建错误响应"""
-    return ApiResponse.error(code=code, message=message, error=error)
+    return ApiResponse.failure(code=code, message=message, error=error)
 
 def raise_http_exception(
     status_code: int,
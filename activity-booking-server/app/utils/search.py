@@ -0,0 +1,85 @@
+import html
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from app.utils.tokenizer import get_tokenizer
+
+# tsvector 单个文档最多支持的位置
+_MAX_POSITION = 16383
+
+
+def _quote(lexeme: str) -> str:
+    """按 tsvector/tsquery 字面量规则给词元加引号"""
+    return "'" + lexeme.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def build_document(fields: Sequence[Tuple[Optional[str], str]]) -> str:
+    """
+    构建 tsvector 字面量
+
+    fields 为 (文本, 权重) 列表，权重取 A-D。分词在应用侧完成，
+    数据库直接按字面量存储词元，不依赖数据库的分词配置和 locale
+    """
+    positions = {}
+    position = 0
+    for text, weight in fields:
+        if not text:
+            continue
+        for token in get_tokenizer().tokenize(text):
+            position = min(position + 1, _MAX_POSITION)
+            positions.setdefault(token, []).append(f"{position}{weight}")
+        # 字段之间空出位置，避免跨字段的短语匹配
+        position = min(position + 1, _MAX_POSITION)
+    return " ".join(f"{_quote(token)}:{','.join(items)}" for token, items in positions.items())
+
+
+def build_query(keyword: str) -> Optional[str]:
+    """构建 tsquery 字面量，关键词中没有可检索的内容时返回 None"""
+    clauses = []
+    for tokens, prefix in get_tokenizer().query_terms(keyword):
+        clause = " <-> ".join(_quote(token) for token in tokens)
+        if prefix:
+            clause += ":*"
+        clauses.append(f"({clause})" if len(tokens) > 1 else clause)
+    return " & ".join(clauses) or None
+
+
+def highlight_terms(keyword: str) -> List[str]:
+    """高亮使用的原始查询词（中文片段和英文单词）"""
+    return get_tokenizer().runs(keyword)
+
+
+def highlight(
+    text: Optional[str],
+    terms: List[str],
+    max_length: Optional[int] = None,
+    tag: str = "em"
+) -> Optional[str]:
+    """
+    在文本中标记查询词（大小写不敏感），返回转义后的 HTML 片段
+
+    max_length 不为空时截取首个命中附近的片段；没有命中时返回 None
+    """
+    if not text or not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    first = pattern.search(text)
+    if first is None:
+        return None
+
+    prefix = suffix = ""
+    if max_length and len(text) > max_length:
+        start = max(first.start() - max_length // 4, 0)
+        end = min(start + max_length, len(text))
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        text = text[start:end]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<{tag}>{html.escape(match.group())}</{tag}>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return prefix + "".join(parts) + suffix
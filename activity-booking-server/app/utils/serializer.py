@@ -0,0 +1,158 @@
+from collections.abc import Mapping
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+
+
+class _Field:
+    """预编译的字段：输出键（驼峰别名）、源属性名、默认值和值转换"""
+
+    __slots__ = ("name", "alias", "default", "convert")
+
+    def __init__(self, name: str, alias: str, default: Any, convert: Optional[Callable[[Any], Any]]):
+        self.name = name
+        self.alias = alias
+        self.default = default
+        self.convert = convert
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """按字段类型生成值转换：嵌套模型递归序列化，float 字段统一为浮点数，其余类型交给 orjson"""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        inner = _converter(args[0])
+        return (lambda value: None if value is None else inner(value)) if inner else None
+    if origin in (list, List, tuple, Tuple):
+        args = get_args(annotation)
+        inner = _converter(args[0]) if args else None
+        return (lambda values: [inner(value) for value in values]) if inner else list
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return serializer_for(annotation).to_dict
+    if annotation is float:
+        return float
+    return None
+
+
+class Serializer:
+    """
+    响应模型的预编译序列化器
+
+    按 Pydantic 响应模型的字段生成 (别名, 属性名, 默认值, 转换) 表，直接从 ORM 对象、
+    SQL 结果行（Row）、__slots__ DTO、字典或模型实例读取属性，构建驼峰命名的字典交给 orjson 编码，
+    输出与 model_validate + model_dump(by_alias=True) 一致，但跳过校验和中间模型。
+    不做任何校验，只用于序列化数据库中已有的可信数据
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.fields: Tuple[_Field, ...] = ()
+        # 按数据来源的类型缓存读取方式：{来源键: (取值函数, 取到的字段, 缺失的字段)}，
+        # 字典等映射的键可能逐行不同，不缓存取值函数（取值函数为 None），逐个字段按 .get 读取
+        self._plans: Dict[Any, tuple] = {}
+
+    def _compile(self) -> None:
+        # 在首次使用时编译，允许模型之间相互引用
+        self.fields = tuple(
+            _Field(
+                name,
+                field.alias or name,
+                None if field.is_required() else field.get_default(call_default_factory=True),
+                _converter(field.annotation)
+            )
+            for name, field in self.schema.model_fields.items()
+        )
+
+    def _plan(self, source: Any) -> tuple:
+        fields = getattr(source, "_fields", None)  # SQLAlchemy Row / namedtuple
+        key = (type(source), fields)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+        if not self.fields:
+            self._compile()
+
+        if isinstance(source, Mapping):
+            plan = self._plans[key] = (None, self.fields, ())
+            return plan
+
+        if fields is not None:
+            available = set(fields)
+        else:
+            # ORM 实体的列和关系、__slots__ 对象的字段是类属性；普通对象和模型实例的值在实例字典中
+            available = {field.name for field in self.fields if hasattr(type(source), field.name)}
+            available.update(getattr(source, "__dict__", ()))
+        present = [field for field in self.fields if field.name in available]
+        missing = [field for field in self.fields if field not in present]
+
+        names = [field.name for field in present]
+        if len(names) == 1:
+            single = attrgetter(names[0])
+            fetch = lambda item: (single(item),)  # noqa: E731
+        elif names:
+            fetch = attrgetter(*names)
+        else:
+            fetch = lambda item: ()  # noqa: E731
+        if fields is None and names and hasattr(source, "__dict__"):
+            fetch = self._from_instance_dict(fetch, names)
+        plan = self._plans[key] = (fetch, tuple(present), tuple(missing))
+        return plan
+
+    @staticmethod
+    def _from_instance_dict(fetch: Callable, names: List[str]) -> Callable:
+        """
+        优先从实例字典取值：已加载的 ORM 列值就在 __dict__ 中，
+        跳过属性描述符的开销；有属性未加载（过期或懒加载关系）时回退到属性访问
+        """
+        from_dict = itemgetter(*names) if len(names) > 1 else (lambda values: (values[names[0]],))
+
+        def fetch_from_dict(item):
+            try:
+                return from_dict(item.__dict__)
+            except KeyError:
+                return fetch(item)
+        return fetch_from_dict
+
+    def to_dict(self, source: Any) -> Dict[str, Any]:
+        """将一个对象转换为驼峰命名的字典（嵌套模型递归转换）"""
+        fetch, present, missing = self._plan(source)
+        if fetch is None:
+            return self._mapping_to_dict(source)
+        result = {}
+        for field, value in zip(present, fetch(source)):
+            if field.convert is not None and value is not None:
+                value = field.convert(value)
+            result[field.alias] = value
+        for field in missing:
+            result[field.alias] = field.default
+        return result
+
+    def _mapping_to_dict(self, source: Mapping) -> Dict[str, Any]:
+        """字典等映射：缺少的键使用字段默认值"""
+        result = {}
+        for field in self.fields:
+            value = source.get(field.name, field.default)
+            if field.convert is not None and value is not None:
+                value = field.convert(value)
+            result[field.alias] = value
+        return result
+
+    def dumps(self, source: Any) -> bytes:
+        """序列化为 JSON 字节"""
+        return orjson.dumps(self.to_dict(source))
+
+    def dumps_many(self, sources: Iterable[Any]) -> bytes:
+        """序列化为 JSON 数组字节"""
+        to_dict = self.to_dict
+        return orjson.dumps([to_dict(source) for source in sources])
+
+
+@lru_cache(maxsize=None)
+def serializer_for(schema: Type[BaseModel]) -> Serializer:
+    """获取响应模型的序列化器（每个模型只编译一次）"""
+    return Serializer(schema)
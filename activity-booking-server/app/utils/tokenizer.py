@@ -0,0 +1,120 @@
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List
+
+from app.core.config import settings
+
+# 连续的中日韩字符，或连续的字母数字
+_CJK = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_RUN_PATTERN = re.compile(rf"[{_CJK}]+|[0-9a-z]+")
+_CJK_PATTERN = re.compile(rf"[{_CJK}]")
+
+
+def is_cjk(text: str) -> bool:
+    return bool(_CJK_PATTERN.match(text))
+
+
+class Tokenizer(ABC):
+    """
+    分词器基类
+
+    tokenize 用于建索引，按出现顺序返回词元（顺序即位置，用于短语匹配）；
+    query_terms 用于查询，每个查询词返回 (词元列表, 是否前缀匹配)，
+    同一查询词的多个词元需要按顺序相邻出现
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[str]:
+        """建索引用的词元"""
+
+    @abstractmethod
+    def query_terms(self, text: str) -> List[tuple]:
+        """查询用的 [(词元列表, 是否前缀匹配)]"""
+
+    @staticmethod
+    def runs(text: str) -> List[str]:
+        """按中文片段和字母数字片段切分（字母统一小写）"""
+        return _RUN_PATTERN.findall(text.lower())
+
+
+class BigramTokenizer(Tokenizer):
+    """
+    二元分词（默认）
+
+    中文片段按相邻两字切分，并在每个片段末尾补一个单字，保证每个字都是某个词元的开头，
+    这样单字查询可以用前缀匹配命中；字母数字按整词处理。无需词典，召回率高
+    """
+
+    name = "bigram"
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = []
+        for run in self.runs(text):
+            if is_cjk(run):
+                tokens.extend(run[i:i + 2] for i in range(len(run)))
+            else:
+                tokens.append(run)
+        return tokens
+
+    def query_terms(self, text: str) -> List[tuple]:
+        terms = []
+        for run in self.runs(text):
+            if is_cjk(run) and len(run) > 1:
+                terms.append(([run[i:i + 2] for i in range(len(run) - 1)], False))
+            else:
+                # 单个汉字或英文单词使用前缀匹配
+                terms.append(([run], True))
+        return terms
+
+
+class JiebaTokenizer(Tokenizer):
+    """
+    结巴分词（需要安装 jieba）
+
+    建索引使用搜索引擎模式切分，词元更少、排序更准，但依赖词典，未登录词可能召回不到
+    """
+
+    name = "jieba"
+
+    def __init__(self):
+        try:
+            import jieba
+        except ImportError as exc:
+            raise RuntimeError("SEARCH_TOKENIZER=jieba 需要安装 jieba: uv sync --extra jieba") from exc
+        self._jieba = jieba
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = []
+        for run in self.runs(text):
+            if is_cjk(run):
+                tokens.extend(self._jieba.cut_for_search(run))
+            else:
+                tokens.append(run)
+        return tokens
+
+    def query_terms(self, text: str) -> List[tuple]:
+        terms = []
+        for run in self.runs(text):
+            if is_cjk(run):
+                terms.extend(([word], len(word) == 1) for word in self._jieba.cut(run))
+            else:
+                terms.append(([run], True))
+        return terms
+
+
+TOKENIZERS = {
+    BigramTokenizer.name: BigramTokenizer,
+    JiebaTokenizer.name: JiebaTokenizer,
+}
+
+
+@lru_cache()
+def get_tokenizer() -> Tokenizer:
+    """按配置 SEARCH_TOKENIZER 获取分词器"""
+    try:
+        return TOKENIZERS[settings.SEARCH_TOKENIZER]()
+    except KeyError:
+        raise ValueError(f"未知的分词器: {settings.SEARCH_TOKENIZER}") from None
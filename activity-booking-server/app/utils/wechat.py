@@ -1,67 +1,180 @@
+import asyncio
+import logging
+import random
+import time
 from typing import Optional, Dict, Any
 
 import httpx
 
 from app.core.config import settings
+from app.core.metrics import WECHAT_REQUEST_DURATION
+
+logger = logging.getLogger(__name__)
+
+# 微信接口返回「系统繁忙」，此时请求未被处理，可以安全重试
+_ERRCODE_BUSY = -1
+
+# 连接建立阶段的错误：请求尚未发出，一次性的 code 没有被消费
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class WechatAPIError(Exception):
+    """微信接口调用失败（重试后仍失败）"""
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class WechatClient:
+    """
+    微信接口客户端
+
+    应用生命周期内复用同一个 httpx.AsyncClient，保持长连接（可用时启用 HTTP/2），
+    避免每次登录重新建立 TCP + TLS 连接；并发数、超时和重试次数均可配置
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> None:
+        """创建连接池（在应用启动时调用）"""
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=settings.WECHAT_API_BASE,
+            http2=settings.WECHAT_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.WECHAT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WECHAT_MAX_CONNECTIONS,
+                keepalive_expiry=settings.WECHAT_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.WECHAT_TIMEOUT, connect=settings.WECHAT_CONNECT_TIMEOUT)
+        )
+        self._semaphore = asyncio.Semaphore(settings.WECHAT_MAX_CONCURRENCY)
+
+    async def close(self) -> None:
+        """关闭连接池（在应用关闭时调用）"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, path: str, params: Dict[str, Any], idempotent: bool = True) -> Dict[str, Any]:
+        """
+        调用微信 GET 接口，返回 JSON
+
+        失败时按指数退避重试：连接失败、5xx 和「系统繁忙」总是重试；
+        非幂等请求（如用一次性 code 换取凭证）在请求已发出后超时不重试，避免 code 被重复使用
+        """
+        if self._client is None:
+            # 脚本等未经过应用生命周期的场景
+            await self.start()
+
+        attempts = settings.WECHAT_MAX_RETRIES + 1
+        for attempt in range(attempts):
+            # 每次调用按结果记录耗时（不含等待并发许可的时间）：ok、busy（系统繁忙）、http_error（5xx）、error
+            outcome = "error"
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    response = await self._client.get(path, params=params)
+                if response.status_code < 500:
+                    data = response.json()
+                    if data.get("errcode") != _ERRCODE_BUSY:
+                        outcome = "ok"
+                        return data
+                    outcome = "busy"
+                else:
+                    outcome = "http_error"
+                error = f"HTTP {response.status_code} {response.text[:200]}"
+            except ValueError as exc:
+                raise WechatAPIError(f"{path}: 响应不是合法的 JSON") from exc
+            except _CONNECT_ERRORS as exc:
+                error = repr(exc)
+            except httpx.TransportError as exc:
+                if not idempotent:
+                    raise WechatAPIError(f"{path}: {exc!r}") from exc
+                error = repr(exc)
+            finally:
+                WECHAT_REQUEST_DURATION.labels(path, outcome).observe(time.perf_counter() - started)
+
+            if attempt + 1 < attempts:
+                delay = settings.WECHAT_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+                logger.warning("微信接口调用失败，%.2f 秒后重试: %s %s", delay, path, error)
+                await asyncio.sleep(delay)
+
+        raise WechatAPIError(f"{path}: {error}")
+
+
+wechat_client = WechatClient()
 
 
 async def get_wechat_openid(code: str) -> Optional[str]:
     """获取微信小程序openid"""
-    url = "https://api.weixin.qq.com/sns/jscode2session"
     params = {
         "appid": settings.WECHAT_APPID,
         "secret": settings.WECHAT_SECRET,
         "js_code": code,
         "grant_type": "authorization_code"
     }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        data = response.json()
-        
-        if "openid" in data:
-            return data["openid"]
-        else:
-            return None
+
+    try:
+        data = await wechat_client.get("/sns/jscode2session", params, idempotent=False)
+    except WechatAPIError:
+        logger.exception("获取微信 openid 失败")
+        return None
+
+    if "openid" in data:
+        return data["openid"]
+    else:
+        return None
 
 
 async def get_wechat_access_token(code: str) -> Optional[Dict[str, Any]]:
     """获取微信网页授权access_token"""
-    url = "https://api.weixin.qq.com/sns/oauth2/access_token"
     params = {
         "appid": settings.WECHAT_WEB_APPID,
         "secret": settings.WECHAT_WEB_SECRET,
         "code": code,
         "grant_type": "authorization_code"
     }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        data = response.json()
-        
-        if "access_token" in data:
-            return data
-        else:
-            return None
+
+    try:
+        data = await wechat_client.get("/sns/oauth2/access_token", params, idempotent=False)
+    except WechatAPIError:
+        logger.exception("获取微信网页授权 access_token 失败")
+        return None
+
+    if "access_token" in data:
+        return data
+    else:
+        return None
 
 
 async def get_wechat_user_info(access_token: str, openid: str) -> Optional[Dict[str, Any]]:
     """获取微信用户信息"""
-    url = "https://api.weixin.qq.com/sns/userinfo"
     params = {
         "access_token": access_token,
         "openid": openid,
         "lang": "zh_CN"
     }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        data = response.json()
-        
-        if "openid" in data:
-            return data
-        else:
-            return None
+
+    try:
+        data = await wechat_client.get("/sns/userinfo", params)
+    except WechatAPIError:
+        logger.exception("获取微信用户信息失败")
+        return None
+
+    if "openid" in data:
+        return data
+    else:
+        return None
 
 
 def get_wechat_web_login_url(redirect_uri: str, state: str = "") -> str:
@@ -74,7 +187,6 @@ def get_wechat_web_login_url(redirect_uri: str, state: str = "") -> str:
         "scope": "snsapi_login",
         "state": state
     }
-    
+
     param_str = "&".join([f"{k}={v}" for k, v in params.items()])
     return f"{url}?{param_str}#wechat_redirect"
-
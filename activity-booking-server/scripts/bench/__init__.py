@@ -0,0 +1 @@
+# 性能测试脚本
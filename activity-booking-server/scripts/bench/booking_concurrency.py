@@ -0,0 +1,107 @@
+"""
+预约并发测试脚本
+向同一个活动并发发起大量预约，校验不超卖并统计每秒预约数
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import select, func
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.models.booking import Booking, BookingStatus
+from app.models.user import User
+from app.schemas.booking import BookingCreate
+from app.services.booking_service import BookingService
+from app.services.seat_inventory import seat_inventory
+
+
+async def prepare(capacity: int) -> tuple:
+    """创建压测用户和活动"""
+    async with AsyncSessionLocal() as db:
+        user = User(openid=f"bench-{time.time_ns()}", nickname="并发测试")
+        activity = Activity(
+            title="并发预约测试活动",
+            start_time=datetime.now() + timedelta(days=1),
+            end_time=datetime.now() + timedelta(days=1, hours=2),
+            max_participants=capacity,
+            booked_count=0,
+            is_active=True
+        )
+        db.add_all([user, activity])
+        await db.commit()
+        return user.id, activity.id
+
+
+async def book(user_id: int, activity_id: int, participants: int) -> bool:
+    """使用独立会话发起一次预约"""
+    async with AsyncSessionLocal() as db:
+        booking = await BookingService(db).create_booking(
+            BookingCreate(activity_id=activity_id, name="测试", phone="13800000000", participants=participants),
+            user_id
+        )
+        return booking is not None
+
+
+async def main(attempts: int, capacity: int, concurrency: int, participants: int) -> int:
+    user_id, activity_id = await prepare(capacity)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> bool:
+        async with semaphore:
+            return await book(user_id, activity_id, participants)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(attempts)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    accepted = sum(1 for r in results if r is True)
+    rejected = sum(1 for r in results if r is False)
+    errors = [r for r in results if isinstance(r, Exception)]
+
+    async with AsyncSessionLocal() as db:
+        # Redis 库存模式下 booked_count 异步回写，校验前先同步
+        if seat_inventory.enabled:
+            while await seat_inventory.sync_booked_counts(db):
+                pass
+        booked_count = await db.scalar(select(Activity.booked_count).where(Activity.id == activity_id))
+        seats_in_bookings = await db.scalar(
+            select(func.coalesce(func.sum(Booking.participants), 0)).where(
+                Booking.activity_id == activity_id,
+                Booking.status == BookingStatus.CONFIRMED
+            )
+        )
+    await async_engine.dispose()
+
+    mode = "redis" if seat_inventory.enabled else "db"
+    print(f"模式: {mode}  尝试: {attempts}  并发: {concurrency}  容量: {capacity}  每单人数: {participants}")
+    print("-" * 60)
+    print(f"成功: {accepted}  拒绝: {rejected}  异常: {len(errors)}")
+    print(f"耗时: {elapsed:.2f}s  吞吐: {attempts / elapsed:.1f} 次/秒  成功预约: {accepted / elapsed:.1f} 单/秒")
+    print(f"活动计数: {booked_count}  预约表合计: {seats_in_bookings}")
+    if errors:
+        print(f"首个异常: {errors[0]!r}")
+
+    oversold = booked_count > capacity or seats_in_bookings > capacity
+    drifted = booked_count != seats_in_bookings
+    if oversold or drifted:
+        print("❌ 检测到超卖或计数不一致")
+        return 1
+    print("✅ 无超卖，计数一致")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="预约并发测试")
+    parser.add_argument("--attempts", type=int, default=5000, help="预约尝试次数")
+    parser.add_argument("--capacity", type=int, default=1000, help="活动容量")
+    parser.add_argument("--concurrency", type=int, default=40, help="并发数（建议不超过连接池上限）")
+    parser.add_argument("--participants", type=int, default=1, help="每次预约人数")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.attempts, args.capacity, args.concurrency, args.participants)))
@@ -0,0 +1,70 @@
+"""
+封面图处理基准脚本
+对 static/images 下的原图（或指定文件）执行与上传接口相同的处理，
+统计每张图的处理耗时，以及各宽度 WebP/AVIF 与原图的字节数对比。
+生成的文件写入临时目录，不影响 static/images/covers
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.cover_images import COVER_DIRECTORY, cover_images
+from app.utils.images import InvalidImageError, derive
+
+
+def main(paths: list):
+    formats = cover_images.formats
+    print(f"宽度: {cover_images.widths}  格式: {formats}")
+    print("-" * 100)
+    original_total, thumbnail_total, hero_total = 0, 0, 0
+    with tempfile.TemporaryDirectory() as directory:
+        for path in paths:
+            with open(path, "rb") as file:
+                data = file.read()
+            try:
+                digest, _ = cover_images.inspect(data)
+            except InvalidImageError as e:
+                print(f"{os.path.basename(path):<24} 跳过：{e}")
+                continue
+
+            started = time.perf_counter()
+            renditions = derive(data, directory, digest, cover_images.widths, formats)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            sizes = {
+                image_format: [(width, os.path.getsize(os.path.join(directory, name))) for width, name in items]
+                for image_format, items in renditions.items()
+            }
+            detail = "  ".join(
+                f"{image_format} " + "/".join(f"{width}w {size / 1024:.1f}KB" for width, size in items)
+                for image_format, items in sizes.items()
+            )
+            print(f"{os.path.basename(path):<24} 原图 {len(data) / 1024:7.1f} KB  耗时 {elapsed:6.0f} ms  {detail}")
+            original_total += len(data)
+            thumbnail_total += sizes["webp"][0][1]
+            hero_total += sizes["webp"][-1][1]
+
+    if original_total:
+        print("-" * 100)
+        print(
+            f"合计 原图 {original_total / 1024:.1f} KB -> 列表缩略图 {thumbnail_total / 1024:.1f} KB"
+            f"（{original_total / thumbnail_total:.1f}x）、详情头图 {hero_total / 1024:.1f} KB"
+            f"（{original_total / hero_total:.1f}x）"
+        )
+
+
+if __name__ == "__main__":
+    static_images = os.path.dirname(COVER_DIRECTORY)
+    parser = argparse.ArgumentParser(description="封面图处理基准")
+    parser.add_argument(
+        "paths", nargs="*",
+        default=sorted(glob.glob(os.path.join(static_images, "*.jpg")) + glob.glob(os.path.join(static_images, "*.png"))),
+        help="原图路径（默认 static/images 下的 JPEG/PNG）"
+    )
+    args = parser.parse_args()
+    main(args.paths)
@@ -0,0 +1,82 @@
+"""
+热门活动排行基准脚本
+在当前数据库上对比两种取热门活动前 N 名的方式：
+按 booked_count 排序的 SQL 查询，与 Redis 有序集合排行（重建后读取），
+并统计详情缓存预热后 GET /api/activities/hot 发出的 SQL 语句数。
+数据量不足时可先用 scripts/db/bulk_load.py generate 造数
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from sqlalchemy import event, func, select
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models.activity import Activity
+from app.repositories.activity_repository import ActivityRepository
+from app.services.activity_cache import activity_cache
+from app.services.hot_ranking import hot_ranking
+
+
+async def timed(func_, rounds: int) -> list:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func_()
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def report(name: str, latencies: list) -> None:
+    print(
+        f"{name:<16} p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+        f"p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:7.2f} ms"
+    )
+
+
+async def main(rounds: int, limit: int):
+    async with AsyncSessionLocal() as db:
+        activities = await db.scalar(select(func.count()).select_from(Activity).where(Activity.is_active))
+        print(f"启用的活动: {activities}")
+
+        started = time.perf_counter()
+        ranked = await hot_ranking.rebuild(db)
+        print(f"重建排行: {ranked} 个活动，耗时 {(time.perf_counter() - started) * 1000:.0f} ms")
+        print()
+
+        repo = ActivityRepository(db)
+        report("SQL 排序", await timed(lambda: repo.get_hot_activities(limit), rounds))
+        report("Redis 排行", await timed(lambda: hot_ranking.top(limit), rounds))
+
+    # 接口：热门列表缓存失效后重新组装（排行 + 详情缓存），统计 SQL 语句数
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/api/activities/hot")
+        await activity_cache.hot.invalidate()
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+        try:
+            await client.get("/api/activities/hot")
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+    print(f"\n详情缓存预热后，重新组装热门列表的 SQL 语句数: {statements}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="热门活动排行基准")
+    parser.add_argument("--rounds", type=int, default=200, help="每种方式的执行次数")
+    parser.add_argument("--limit", type=int, default=10, help="取前 N 名")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.limit))
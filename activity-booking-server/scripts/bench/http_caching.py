@@ -0,0 +1,73 @@
+"""
+响应压缩与条件请求基准脚本
+通过 ASGI 直接调用应用（不经过网络），对活动列表接口统计：
+不同每页数量下未压缩、gzip、brotli（已安装时）的传输字节数和耗时，
+以及携带 If-None-Match 重新验证（304，缓存命中时不查询数据库）与完整下载的耗时和传输字节数
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from sqlalchemy import event
+
+from app.core.compression import brotli
+from app.core.db import async_engine
+from app.main import app
+
+
+async def timed(client: httpx.AsyncClient, url: str, params: dict, headers: dict, rounds: int):
+    latencies, response = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.get(url, params=params, headers=headers)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies) * 1000, response
+
+
+async def main(sizes: list, rounds: int):
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    if brotli is None:
+        print("未安装 brotli，跳过 br（uv sync --extra brotli）")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for size in sizes:
+            params = {"pageSize": size, "total": "none"}
+            # 预热读穿透缓存
+            await client.get("/api/activities", params=params)
+            print(f"每页 {size}")
+            for encoding in encodings:
+                p50, response = await timed(client, "/api/activities", params, {"accept-encoding": encoding}, rounds)
+                print(f"  {encoding:<8} 传输 {response.num_bytes_downloaded / 1024:8.1f} KB  p50 {p50:6.2f} ms")
+
+            response = await client.get("/api/activities", params=params, headers={"accept-encoding": "gzip"})
+            headers = {"accept-encoding": "gzip", "if-none-match": response.headers["etag"]}
+            before = statements
+            p50, revalidated = await timed(client, "/api/activities", params, headers, rounds)
+            print(
+                f"  重新验证 状态 {revalidated.status_code}  传输 {revalidated.num_bytes_downloaded} B  "
+                f"p50 {p50:6.2f} ms  SQL 语句 {statements - before}"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="响应压缩与条件请求基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100], help="每页数量")
+    parser.add_argument("--rounds", type=int, default=50, help="每种方式的重复次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.rounds))
@@ -0,0 +1,88 @@
+"""
+活动列表列投影基准脚本
+在当前数据库上对比活动列表的两种查询方式：
+查询完整 Activity 实体（含描述等大字段，进入会话标识映射）与
+ACTIVITY_SUMMARY 列投影（只查询列表展示的列、描述只取开头一段，构造 __slots__ DTO），
+统计每页的查询耗时、从数据库读取的行数据字节数和序列化后的响应体大小。
+数据量不足时可先用 scripts/db/bulk_load.py generate 造数
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, select
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.repositories.activity_repository import ACTIVITY_SUMMARY, ActivityRepository
+from app.schemas.activity import ActivityList, ActivitySummaryList
+from app.utils.serializer import serializer_for
+
+
+async def timed(func_, rounds: int) -> list:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await func_()
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+async def row_bytes(db, query) -> int:
+    """查询结果的行数据字节数（pg_column_size 按列求和，近似于传输量）"""
+    subquery = query.subquery()
+    sizes = [func.coalesce(func.pg_column_size(column), 0) for column in subquery.c]
+    return await db.scalar(select(func.sum(sum(sizes[1:], sizes[0]))).select_from(subquery))
+
+
+async def main(sizes: list, rounds: int):
+    async with AsyncSessionLocal() as db:
+        repo = ActivityRepository(db)
+        activities = await db.scalar(select(func.count()).select_from(Activity).where(Activity.is_active))
+        print(f"启用的活动: {activities}  重复: {rounds}")
+        print("-" * 110)
+
+        for size in sizes:
+            async def entity():
+                activities_ = await repo.get_active_activities_after(None, size)
+                # 与接口一致：每次请求使用新的会话，实体不在标识映射中复用
+                db.expunge_all()
+                return activities_
+
+            async def projected():
+                return await repo.get_active_activities_after(None, size, projection=ACTIVITY_SUMMARY)
+
+            entity_query = repo.paginate_after(repo.select_as().where(Activity.is_active), Activity.start_time, None, size)
+            projected_query = repo.paginate_after(
+                repo.select_as(ACTIVITY_SUMMARY).where(Activity.is_active), Activity.start_time, None, size
+            )
+            entity_bytes = await row_bytes(db, entity_query)
+            projected_bytes = await row_bytes(db, projected_query)
+
+            entity_body = serializer_for(ActivityList).dumps({"items": await entity(), "page_size": size})
+            projected_body = serializer_for(ActivitySummaryList).dumps({"items": await projected(), "page_size": size})
+
+            for name, fn, rows, body in (
+                ("完整实体", entity, entity_bytes, entity_body),
+                ("列投影", projected, projected_bytes, projected_body),
+            ):
+                latencies = await timed(fn, rounds)
+                print(
+                    f"每页 {size:>5}  {name:<6} p50 {statistics.median(latencies) * 1000:8.2f} ms  "
+                    f"p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:8.2f} ms  "
+                    f"行数据 {rows / 1024:8.1f} KB  响应体 {len(body) / 1024:8.1f} KB"
+                )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="活动列表列投影基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="每页数量")
+    parser.add_argument("--rounds", type=int, default=50, help="每种方式的重复次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.rounds))
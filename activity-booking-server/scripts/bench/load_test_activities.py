@@ -0,0 +1,117 @@
+"""
+活动列表并发压测脚本
+对比「async 路由中调用同步 Session」与「AsyncSession」两种数据库访问方式
+在并发 /api/activities 流量下的吞吐量和延迟
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db
+from app.core.db import SessionLocal, async_engine
+from app.models.activity import Activity
+
+
+def build_app(latency: float = 0.0) -> FastAPI:
+    """构建只包含两种列表实现的压测应用
+
+    latency 大于 0 时，每次查询前执行 pg_sleep 模拟网络往返或慢查询
+    """
+    app = FastAPI()
+    delay = text("SELECT pg_sleep(:seconds)").bindparams(seconds=latency)
+
+    @app.get("/sync/activities")
+    async def sync_activities(
+        page: int = Query(1, ge=1),
+        page_size: int = Query(10, ge=1, le=100, alias="pageSize")
+    ):
+        # 旧实现：在事件循环中直接执行阻塞查询
+        db = SessionLocal()
+        try:
+            if latency:
+                db.execute(delay)
+            query = select(Activity).where(Activity.is_active).offset((page - 1) * page_size).limit(page_size)
+            return {"count": len(db.scalars(query).all())}
+        finally:
+            db.close()
+
+    @app.get("/async/activities")
+    async def async_activities(
+        page: int = Query(1, ge=1),
+        page_size: int = Query(10, ge=1, le=100, alias="pageSize"),
+        db: AsyncSession = Depends(get_db)
+    ):
+        if latency:
+            await db.execute(delay)
+        query = select(Activity).where(Activity.is_active).offset((page - 1) * page_size).limit(page_size)
+        result = await db.scalars(query)
+        return {"count": len(result.all())}
+
+    return app
+
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    """以固定并发发送请求，返回统计结果"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, params={"page": i % 10 + 1, "pageSize": 10})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(total: int, concurrency: int, latency_ms: float):
+    app = build_app(latency_ms / 1000)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热连接池
+        await run_load(client, "/async/activities", concurrency, concurrency)
+        await run_load(client, "/sync/activities", 20, 20)
+
+        print(f"并发: {concurrency}  请求数: {total}  模拟查询延迟: {latency_ms} ms")
+        print("-" * 60)
+        for name, path in (("同步 Session", "/sync/activities"), ("AsyncSession", "/async/activities")):
+            stats = await run_load(client, path, total, concurrency)
+            print(
+                f"{name:<14} {stats['rps']:>9.1f} req/s  "
+                f"p50 {stats['p50']:>8.2f} ms  p99 {stats['p99']:>8.2f} ms  "
+                f"错误 {stats['errors']}"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="活动列表并发压测")
+    parser.add_argument("--requests", type=int, default=2000, help="总请求数")
+    parser.add_argument("--concurrency", type=int, default=200, help="并发数")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="每次查询附加的模拟延迟（毫秒）")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency_ms))
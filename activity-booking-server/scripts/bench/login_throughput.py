@@ -0,0 +1,139 @@
+"""
+登录吞吐压测脚本
+对比「每次请求新建 httpx.AsyncClient」与「应用级复用的微信客户端」调用微信接口的吞吐量，
+并压测完整的 /api/auth/wx-login 接口。默认自动启动本地桩服务（wechat_stub.py）
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+
+from app.core.config import settings
+
+STUB_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wechat_stub.py")
+
+
+async def wait_for_stub(base_url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/sns/userinfo", params={"openid": "ping"})
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+async def run_load(call, total: int, concurrency: int) -> dict:
+    """以固定并发执行 call，返回统计结果"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call()
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(base_url: str, total: int, concurrency: int, with_login: bool):
+    # 在导入应用模块前切换微信接口地址
+    settings.WECHAT_API_BASE = base_url
+    from app.main import app
+    from app.core.db import async_engine
+    from app.utils.wechat import get_wechat_openid, wechat_client
+
+    await wait_for_stub(base_url)
+
+    async def per_request_client() -> bool:
+        # 旧实现：每次调用新建客户端，重新建立连接
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{base_url}/sns/jscode2session",
+                params={"js_code": uuid.uuid4().hex, "grant_type": "authorization_code"}
+            )
+            return "openid" in response.json()
+
+    async def pooled_client() -> bool:
+        return await get_wechat_openid(uuid.uuid4().hex) is not None
+
+    await wechat_client.start()
+    print(f"桩服务: {base_url}  并发: {concurrency}  请求数: {total}")
+    print("-" * 72)
+    for name, call in (("每次新建客户端", per_request_client), ("复用微信客户端", pooled_client)):
+        await run_load(call, concurrency, concurrency)  # 预热
+        stats = await run_load(call, total, concurrency)
+        print(
+            f"{name:<10} {stats['rps']:>9.1f} req/s  "
+            f"p50 {stats['p50']:>8.2f} ms  p99 {stats['p99']:>8.2f} ms  错误 {stats['errors']}"
+        )
+
+    if with_login:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def login() -> bool:
+                response = await client.post("/api/auth/wx-login", json={"code": uuid.uuid4().hex})
+                return response.status_code == 200
+
+            stats = await run_load(login, total, concurrency)
+            print(
+                f"{'完整登录接口':<10} {stats['rps']:>9.1f} req/s  "
+                f"p50 {stats['p50']:>8.2f} ms  p99 {stats['p99']:>8.2f} ms  错误 {stats['errors']}"
+            )
+
+    await wechat_client.close()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="登录吞吐压测")
+    parser.add_argument("--requests", type=int, default=2000, help="总请求数")
+    parser.add_argument("--concurrency", type=int, default=100, help="并发数")
+    parser.add_argument("--stub-url", default="", help="已启动的桩服务地址（为空时自动启动）")
+    parser.add_argument("--port", type=int, default=9001, help="自动启动桩服务时使用的端口")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="自动启动桩服务时的模拟延迟（毫秒）")
+    parser.add_argument("--with-login", action="store_true", help="同时压测完整登录接口（会写入压测用户）")
+    args = parser.parse_args()
+
+    stub = None
+    url = args.stub_url
+    if not url:
+        url = f"http://127.0.0.1:{args.port}"
+        stub = subprocess.Popen([
+            sys.executable, STUB_SCRIPT, "--port", str(args.port), "--latency-ms", str(args.latency_ms)
+        ])
+    try:
+        asyncio.run(main(url, args.requests, args.concurrency, args.with_login))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
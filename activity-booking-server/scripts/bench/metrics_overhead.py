@@ -0,0 +1,85 @@
+"""
+请求指标开销基准脚本
+直接以 ASGI 调用一个只返回固定字节的 FastAPI 路由（不经过网络、数据库），
+对比加与不加 MetricsMiddleware 时每个请求的耗时，差值即为指标记录的开销
+（两种应用交替执行多轮、各取最快一轮，减少 GC 和调度抖动的影响）；
+同时统计生成一次 /metrics 响应的耗时
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from app.core.metrics import MetricsMiddleware, render_metrics
+
+
+def make_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/activities/{activity_id}")
+    async def detail(activity_id: int):
+        return Response(b'{"code":200}', media_type="application/json")
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    """依次发送 requests 个请求，返回每个请求的平均耗时（微秒）"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": f"/api/activities/{i % 100}",
+            "raw_path": b"", "root_path": "", "query_string": b"", "headers": [],
+            "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main(requests: int, rounds: int):
+    apps = {"无指标": make_app(False), "MetricsMiddleware": make_app(True)}
+    # 预热：构建中间件栈、创建指标子对象
+    for app in apps.values():
+        await run(app, 1000)
+
+    results = {name: [] for name in apps}
+    for _ in range(rounds):
+        for name, app in apps.items():
+            results[name].append(await run(app, requests))
+
+    print(f"每轮 {requests} 个请求，{rounds} 轮取最快一轮")
+    print("-" * 60)
+    fastest = {name: min(values) for name, values in results.items()}
+    for name, value in fastest.items():
+        print(f"{name:<20} {value:8.1f} µs/请求（中位数 {statistics.median(results[name]):.1f}）")
+    overhead = fastest["MetricsMiddleware"] - fastest["无指标"]
+    print(f"指标开销 {overhead:.1f} µs/请求（{overhead / fastest['无指标'] * 100:.1f}%）")
+
+    started = time.perf_counter()
+    for _ in range(100):
+        body = render_metrics()
+    print(f"生成 /metrics {(time.perf_counter() - started) * 10:.2f} ms（{len(body) / 1024:.1f} KB）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="请求指标开销基准")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--rounds", type=int, default=30, help="轮数")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
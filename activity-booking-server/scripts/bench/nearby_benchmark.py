@@ -0,0 +1,139 @@
+"""
+附近活动基准脚本
+在指定数量的带坐标活动（默认 100 万，不足时用 bulk_load 补齐）上，对比
+全表计算球面距离排序与 geohash 前缀索引 + 距离过滤的查询延迟，
+并测量按 (距离, id) 游标翻到第 N 页的耗时，校验两种方式首页结果一致
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, select, text
+
+from app.core.db import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.activity import Activity
+from app.repositories.activity_repository import ActivityRepository
+from app.utils.geo import EARTH_RADIUS
+from scripts.db.bulk_load import CITY_CENTERS, BulkLoader, generate
+
+# 旧做法：不走索引，对所有进行中和未开始的活动计算距离后排序
+FULL_SCAN_SQL = text(f"""
+    SELECT id FROM (
+        SELECT id, 2 * {EARTH_RADIUS} * asin(least(1.0, sqrt(
+            power(sin((radians(latitude) - radians(:lat)) / 2), 2)
+            + cos(radians(:lat)) * cos(radians(latitude)) * power(sin((radians(longitude) - radians(:lng)) / 2), 2)
+        ))) AS distance
+        FROM activities
+        WHERE is_active AND latitude IS NOT NULL AND end_time > :now
+    ) AS candidates
+    WHERE distance <= :radius
+    ORDER BY distance, id
+    LIMIT :limit
+""")
+
+
+def seed(rows: int) -> None:
+    """带坐标的活动不足时通过 COPY 补齐"""
+    db = SessionLocal()
+    try:
+        existing = db.scalar(select(func.count()).select_from(Activity).where(Activity.geohash.is_not(None)))
+    finally:
+        db.close()
+    if existing >= rows:
+        return
+    print(f"生成带坐标的活动: {existing} -> {rows}")
+    generate(BulkLoader(50000, 1000000), users=0, activities=rows - existing, bookings=0, seed=existing, defer_indexes=False)
+
+
+async def measure(fn, repeat: int) -> dict:
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        "result": result,
+    }
+
+
+async def main(rows: int, radii: list, repeat: int, page_size: int, depth: int):
+    seed(rows)
+    rng = random.Random(0)
+    origins = [
+        (lat + rng.uniform(-0.1, 0.1), lng + rng.uniform(-0.1, 0.1))
+        for lat, lng in rng.sample(list(CITY_CENTERS.values()), 3)
+    ]
+
+    async with AsyncSessionLocal() as db:
+        repo = ActivityRepository(db)
+
+        plan = "\n".join(await db.scalars(text(
+            "EXPLAIN SELECT id FROM activities WHERE is_active AND geohash >= 'wtmk' AND geohash < 'wtmk~'"
+        )))
+        print(f"活动数: >= {rows}  每页: {page_size}  重复: {repeat}  geohash 索引: "
+              f"{'✅' if 'idx_activities_active_geohash' in plan else '❌ 未使用'}")
+        print("-" * 120)
+
+        for radius in radii:
+            for lat, lng in origins:
+                async def full_scan():
+                    result = await db.execute(FULL_SCAN_SQL, {
+                        "lat": lat, "lng": lng, "radius": radius, "now": datetime.now(), "limit": page_size
+                    })
+                    return [row[0] for row in result]
+
+                async def nearby():
+                    return [activity.id for activity, _ in await repo.get_nearby(lat, lng, radius, None, page_size)]
+
+                async def deep_page():
+                    # 逐页跟随游标，计时只取最后一页
+                    after = None
+                    for _ in range(depth - 1):
+                        rows_ = await repo.get_nearby(lat, lng, radius, after, page_size)
+                        if len(rows_) < page_size:
+                            return None
+                        activity, distance = rows_[-1]
+                        after = (distance, activity.id)
+                    start = time.perf_counter()
+                    await repo.get_nearby(lat, lng, radius, after, page_size)
+                    return time.perf_counter() - start
+
+                scan = await measure(full_scan, max(repeat // 5, 1))
+                indexed = await measure(nearby, repeat)
+                deep = await deep_page()
+                within = await db.scalar(text(
+                    f"SELECT count(*) FROM activities WHERE is_active AND geohash IS NOT NULL AND end_time > now() "
+                    f"AND 2 * {EARTH_RADIUS} * asin(least(1.0, sqrt(power(sin((radians(latitude) - radians(:lat)) / 2), 2)"
+                    f" + cos(radians(:lat)) * cos(radians(latitude)) * power(sin((radians(longitude) - radians(:lng)) / 2), 2))))"
+                    f" <= :radius"
+                ), {"lat": lat, "lng": lng, "radius": radius})
+                print(
+                    f"半径 {radius / 1000:>5.1f} km ({lat:.3f},{lng:.3f}) 范围内 {within:>6} | "
+                    f"全表计算 p50 {scan['p50']:>7.1f} ms | "
+                    f"geohash 首页 p50 {indexed['p50']:>6.1f} ms p99 {indexed['p99']:>6.1f} ms | "
+                    f"第 {depth} 页 {'-' if deep is None else f'{deep * 1000:.1f} ms':>9} | "
+                    f"首页一致 {'✅' if scan['result'] == indexed['result'] else '❌'}"
+                )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="附近活动基准")
+    parser.add_argument("--rows", type=int, default=1000000, help="带坐标的活动数（不足时自动生成）")
+    parser.add_argument("--radii", type=float, nargs="+", default=[1000, 5000, 20000], help="查询半径（米）")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    parser.add_argument("--page-size", type=int, default=10, help="每页数量")
+    parser.add_argument("--depth", type=int, default=10, help="游标翻页深度")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.radii, args.repeat, args.page_size, args.depth))
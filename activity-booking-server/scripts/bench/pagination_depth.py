@@ -0,0 +1,93 @@
+"""
+分页深度基准脚本
+对比偏移分页（OFFSET/LIMIT + 精确计数）与游标分页（键集 + 不计数）
+在不同翻页深度下的查询延迟
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, select, text
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.repositories.activity_repository import ActivityRepository
+
+SEED_SQL = text("""
+    INSERT INTO activities (title, start_time, end_time, price, max_participants, booked_count,
+                            is_active, created_at, updated_at)
+    SELECT '基准活动 ' || g,
+           now() + (g % 100000) * interval '1 minute',
+           now() + (g % 100000) * interval '1 minute' + interval '2 hours',
+           0, 100, 0, true, now(), now()
+    FROM generate_series(1, :count) AS g
+""")
+
+
+async def seed(rows: int) -> None:
+    """活动数不足时批量补齐"""
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(select(func.count()).select_from(Activity))
+        if existing < rows:
+            print(f"补齐活动数据: {existing} -> {rows}")
+            await db.execute(SEED_SQL, {"count": rows - existing})
+            await db.commit()
+            await db.execute(text("ANALYZE activities"))
+            await db.commit()
+
+
+async def measure(fn, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+    }
+
+
+async def main(rows: int, page_size: int, depths: list, repeat: int):
+    await seed(rows)
+
+    async with AsyncSessionLocal() as db:
+        repo = ActivityRepository(db)
+        print(f"活动数: >= {rows}  每页: {page_size}  每个深度重复: {repeat}")
+        print("-" * 72)
+        for page in depths:
+            # 先用偏移分页找到目标页前一条，作为游标分页的起点
+            anchor = await repo.get_active_activities((page - 1) * page_size - 1, 1) if page > 1 else []
+            after = (anchor[0].start_time, anchor[0].id) if anchor else None
+
+            async def offset_page():
+                await repo.get_active_activities((page - 1) * page_size, page_size)
+                await repo.count_active_activities()
+
+            async def keyset_page():
+                await repo.get_active_activities_after(after, page_size)
+
+            offset_stats = await measure(offset_page, repeat)
+            keyset_stats = await measure(keyset_page, repeat)
+            print(
+                f"第 {page:>6} 页  "
+                f"偏移 p50 {offset_stats['p50']:>8.2f} ms  p99 {offset_stats['p99']:>8.2f} ms  |  "
+                f"游标 p50 {keyset_stats['p50']:>7.2f} ms  p99 {keyset_stats['p99']:>7.2f} ms"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="偏移分页 vs 游标分页")
+    parser.add_argument("--rows", type=int, default=200000, help="活动数据量（不足时自动补齐）")
+    parser.add_argument("--page-size", type=int, default=10, help="每页数量")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100, 1000, 10000], help="测试的页码")
+    parser.add_argument("--repeat", type=int, default=50, help="每个深度的重复次数")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page_size, args.depths, args.repeat))
@@ -0,0 +1,112 @@
+"""
+接口 SQL 语句数检查脚本
+为不同预约数量的用户请求 GET /api/bookings/my，统计每个请求发出的 SQL 语句数，
+语句数随列表长度增长（N+1）或超过预算时以非零状态码退出
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx
+from sqlalchemy import event, insert
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models.activity import Activity
+from app.models.booking import Booking, BookingStatus
+from app.models.user import User
+from app.utils.security import create_access_token
+
+
+class StatementCounter:
+    """统计期间引擎发出的 SQL 语句数"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, *args):
+        self.count += 1
+
+
+async def create_user_with_bookings(size: int) -> int:
+    """创建一个用户，并为其在 size 个不同活动上各创建一条预约"""
+    now = datetime.now()
+    async with AsyncSessionLocal() as db:
+        user = User(openid=f"query-count-{size}-{now.timestamp()}")
+        db.add(user)
+        await db.flush()
+        activity_ids = (await db.scalars(
+            insert(Activity).returning(Activity.id),
+            [
+                {
+                    "title": f"语句数检查活动 {i}",
+                    "start_time": now + timedelta(days=1),
+                    "end_time": now + timedelta(days=1, hours=2),
+                    "max_participants": 100,
+                }
+                for i in range(size)
+            ]
+        )).all()
+        if activity_ids:
+            await db.execute(insert(Booking), [
+                {
+                    "user_id": user.id,
+                    "activity_id": activity_id,
+                    "name": "预约人",
+                    "phone": "13800000000",
+                    "status": BookingStatus.CONFIRMED,
+                    "created_at": now - timedelta(seconds=i),
+                }
+                for i, activity_id in enumerate(activity_ids)
+            ])
+        await db.commit()
+        return user.id
+
+
+async def main(sizes: list, page_size: int, budget: int):
+    counts = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for size in sizes:
+            user_id = await create_user_with_bookings(size)
+            headers = {"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"}
+            params = {"pageSize": page_size}
+            # 预热：认证缓存未命中时会多一次用户查询，不计入统计
+            await client.get("/api/bookings/my", params=params, headers=headers)
+
+            with StatementCounter() as counter:
+                response = await client.get("/api/bookings/my", params=params, headers=headers)
+            items = response.json()["data"]["items"]
+            counts[size] = counter.count
+            print(f"预约数 {size:>5}  返回 {len(items):>4} 条  SQL 语句 {counter.count}")
+
+    await async_engine.dispose()
+
+    failures = []
+    if len(set(counts.values())) > 1:
+        failures.append("语句数随列表长度变化（疑似 N+1）")
+    if max(counts.values()) > budget:
+        failures.append(f"语句数超过预算 {budget}")
+    if failures:
+        print("\n❌ " + "；".join(failures))
+        sys.exit(1)
+    print(f"\n✅ 语句数恒定为 {max(counts.values())}（预算 {budget}）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GET /api/bookings/my 的 SQL 语句数检查")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50], help="用户的预约数量")
+    parser.add_argument("--page-size", type=int, default=50, help="每页数量")
+    parser.add_argument("--budget", type=int, default=3, help="每个请求允许的最大语句数")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.page_size, args.budget))
@@ -0,0 +1,166 @@
+"""
+查询计划回归检查脚本
+在合成数据集（默认 1000 万预约）上执行仓储层的热点查询，记录实际发出的 SQL，
+用 EXPLAIN 校验每条查询都走了预期的索引、没有对大表做顺序扫描。
+任一检查失败时以非零状态码退出，可在索引或查询改动后运行
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event, func, select, text
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.models.booking import Booking
+from app.models.user import User
+from app.repositories.activity_repository import ActivityRepository
+from app.repositories.booking_repository import BookingRepository
+
+SEED_USERS_SQL = text("""
+    INSERT INTO users (openid, gender, is_active, created_at, updated_at)
+    SELECT 'plan-' || g || '-' || md5(random()::text), 0, true, now(), now()
+    FROM generate_series(1, :count) AS g
+""")
+
+SEED_ACTIVITIES_SQL = text("""
+    INSERT INTO activities (title, start_time, end_time, price, max_participants, booked_count,
+                            is_active, created_at, updated_at)
+    SELECT '计划检查活动 ' || g,
+           now() + (g % 100000) * interval '1 minute',
+           now() + (g % 100000) * interval '1 minute' + interval '2 hours',
+           0, 100, 0, g % 10 <> 0, now(), now()
+    FROM generate_series(1, :count) AS g
+""")
+
+# 约 80% 已确认，其余分布在其他状态；创建时间分散在过去一年
+SEED_BOOKINGS_SQL = text("""
+    INSERT INTO bookings (user_id, activity_id, name, phone, participants, status, checked_in,
+                          created_at, updated_at)
+    SELECT u.ids[1 + (random() * (array_length(u.ids, 1) - 1))::int],
+           a.ids[1 + (random() * (array_length(a.ids, 1) - 1))::int],
+           '预约人', '13800000000', 1,
+           (CASE WHEN random() < 0.8 THEN 'CONFIRMED'
+                 WHEN random() < 0.5 THEN 'CANCELLED' ELSE 'COMPLETED' END)::bookingstatus,
+           0,
+           now() - random() * interval '365 days',
+           now()
+    FROM generate_series(1, :count) AS g,
+         (SELECT array_agg(id) AS ids FROM users) AS u,
+         (SELECT array_agg(id) AS ids FROM activities) AS a
+""")
+
+
+async def seed(db, model, sql, rows: int, batch_size: int = 1000000) -> None:
+    """表中行数不足时分批补齐"""
+    table = model.__tablename__
+    existing = await db.scalar(select(func.count()).select_from(model))
+    if existing >= rows:
+        return
+    print(f"补齐 {table}: {existing} -> {rows}")
+    started = time.perf_counter()
+    for offset in range(existing, rows, batch_size):
+        await db.execute(sql, {"count": min(batch_size, rows - offset)})
+        await db.commit()
+        print(f"  已写入 {min(offset + batch_size, rows)} 条，{time.perf_counter() - started:.0f} 秒")
+    await db.execute(text(f"ANALYZE {table}"))
+    await db.commit()
+
+
+def plan_nodes(plan: dict):
+    """深度优先遍历计划树"""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+class StatementRecorder:
+    """记录仓储方法实际发出的 SQL 和参数"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+
+async def check(name: str, call, expected_index: str) -> bool:
+    """执行 call，校验其发出的第一条查询使用 expected_index 且没有顺序扫描"""
+    async with AsyncSessionLocal() as db:
+        with StatementRecorder() as recorder:
+            await call(db)
+        statement, parameters = recorder.statements[0]
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()[0]["Plan"]
+
+    nodes = list(plan_nodes(plan))
+    indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    seq_scans = {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+    passed = expected_index in indexes and not seq_scans
+    scans = ", ".join(
+        f"{node['Node Type']}({node.get('Index Name') or node.get('Relation Name')})"
+        for node in nodes if "Relation Name" in node or "Index Name" in node
+    )
+    print(f"{'✅' if passed else '❌'} {name:<16} 期望 {expected_index:<34} 实际 {scans}")
+    return passed
+
+
+async def main(users: int, activities: int, bookings: int):
+    async with AsyncSessionLocal() as db:
+        await seed(db, User, SEED_USERS_SQL, users)
+        await seed(db, Activity, SEED_ACTIVITIES_SQL, activities)
+        await seed(db, Booking, SEED_BOOKINGS_SQL, bookings)
+        # 取预约最多的用户和活动，避免样本过于稀疏
+        user_id = await db.scalar(
+            select(Booking.user_id).group_by(Booking.user_id).order_by(func.count().desc()).limit(1)
+        )
+        activity_id = await db.scalar(
+            select(Booking.activity_id).group_by(Booking.activity_id).order_by(func.count().desc()).limit(1)
+        )
+
+    print(f"用户: >= {users}  活动: >= {activities}  预约: >= {bookings}  样本用户 {user_id}  样本活动 {activity_id}")
+    print("-" * 100)
+    checks = [
+        ("我的预约翻页", lambda db: BookingRepository(db).get_user_bookings_after(user_id, None, 20),
+         "idx_bookings_user_created"),
+        ("我的预约列表", lambda db: BookingRepository(db).get_user_bookings(user_id),
+         "idx_bookings_user_created"),
+        ("我的预约计数", lambda db: BookingRepository(db).count_user_bookings(user_id),
+         "idx_bookings_user_created"),
+        ("活动全部预约", lambda db: BookingRepository(db).get_activity_bookings(activity_id),
+         "idx_bookings_activity"),
+        ("活动已确认预约", lambda db: BookingRepository(db).get_confirmed_bookings_by_activity(activity_id),
+         "idx_bookings_activity_confirmed"),
+        ("活动已确认计数", lambda db: BookingRepository(db).count_activity_bookings(activity_id),
+         "idx_bookings_activity_confirmed"),
+        ("活动列表翻页", lambda db: ActivityRepository(db).get_active_activities_after(None, 10),
+         "idx_activities_active_start_time"),
+    ]
+    results = [await check(name, call, index) for name, call, index in checks]
+    await async_engine.dispose()
+
+    if not all(results):
+        print(f"\n{results.count(False)} 项检查未通过，请确认迁移已执行（scripts/db/migrations）")
+        sys.exit(1)
+    print("\n全部检查通过")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="热点查询计划回归检查")
+    parser.add_argument("--users", type=int, default=100000, help="用户数据量（不足时自动补齐）")
+    parser.add_argument("--activities", type=int, default=100000, help="活动数据量（不足时自动补齐）")
+    parser.add_argument("--bookings", type=int, default=10000000, help="预约数据量（不足时自动补齐）")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.activities, args.bookings))
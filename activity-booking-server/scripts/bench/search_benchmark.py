@@ -0,0 +1,137 @@
+"""
+活动搜索基准脚本
+生成指定数量的合成活动（默认 100 万），对比旧的 LIKE '%kw%' 标题匹配
+与全文检索（相关度排序取首页、精确计数、估算计数）在不同关键词下的查询延迟
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.db import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.activity import Activity, build_search_vector
+from app.repositories.activity_repository import ActivityRepository
+
+CITIES = ["北京", "上海", "广州", "深圳", "杭州", "成都", "南京", "武汉", "西安", "苏州"]
+PLACES = ["公园", "体育馆", "图书馆", "会议中心", "书店", "咖啡馆", "社区中心", "美术馆", "剧场", "广场"]
+TOPICS = [
+    "徒步", "瑜伽", "摄影", "读书", "编程", "篮球", "羽毛球", "跑步", "骑行", "露营",
+    "烘焙", "插花", "书法", "绘画", "吉他", "钢琴", "围棋", "桌游", "亲子", "志愿者",
+    "Python", "Java", "AI", "Startup", "Marathon",
+]
+KINDS = ["活动", "分享会", "体验课", "训练营", "交流会", "工作坊", "比赛", "沙龙", "讲座", "俱乐部"]
+ORGANIZERS = ["户外运动协会", "技术交流社", "健康生活馆", "摄影爱好者协会", "读书会", "青年志愿者联盟"]
+
+DEFAULT_KEYWORDS = ["徒步", "瑜伽体验", "python", "杭州 读书", "马拉松", "围棋比赛", "书"]
+
+
+def fake_activity(rng: random.Random, start: datetime) -> dict:
+    city, topic, kind = rng.choice(CITIES), rng.choice(TOPICS), rng.choice(KINDS)
+    activity = {
+        "title": f"{city}{topic}{kind}第{rng.randint(1, 999)}期",
+        "description": f"欢迎喜欢{topic}的朋友参加，{rng.choice(TOPICS)}爱好者也可以一起交流。"
+                       f"活动地点在{city}{rng.choice(PLACES)}，名额有限。",
+        "location": f"{city}{rng.choice(PLACES)}",
+        "organizer": rng.choice(ORGANIZERS),
+        "start_time": start + timedelta(minutes=rng.randint(0, 525600)),
+        "price": 0,
+        "max_participants": 100,
+        "booked_count": 0,
+        "is_active": True,
+        "created_at": start,
+        "updated_at": start,
+    }
+    activity["end_time"] = activity["start_time"] + timedelta(hours=2)
+    activity["search_vector"] = build_search_vector(type("Row", (), activity))
+    return activity
+
+
+def seed(rows: int, batch_size: int = 5000) -> None:
+    """活动数不足时生成合成数据（分批多行 INSERT）"""
+    db = SessionLocal()
+    try:
+        existing = db.scalar(select(func.count()).select_from(Activity))
+        if existing >= rows:
+            return
+        print(f"生成合成活动: {existing} -> {rows}")
+        rng = random.Random(existing)
+        now = datetime.now()
+        started = time.perf_counter()
+        for offset in range(existing, rows, batch_size):
+            batch = [fake_activity(rng, now) for _ in range(min(batch_size, rows - offset))]
+            db.execute(insert(Activity.__table__).values(batch))
+            db.commit()
+            if (offset // batch_size) % 20 == 0:
+                print(f"  已写入 {offset + len(batch)} 条，{time.perf_counter() - started:.0f} 秒")
+        db.execute(text("ANALYZE activities"))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def measure(fn, repeat: int) -> dict:
+    latencies = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        "result": result,
+    }
+
+
+async def main(rows: int, keywords: list, repeat: int, page_size: int):
+    seed(rows)
+
+    async with AsyncSessionLocal() as db:
+        repo = ActivityRepository(db)
+        print(f"活动数: >= {rows}  每页: {page_size}  每个关键词重复: {repeat}")
+        print("-" * 120)
+        for keyword in keywords:
+            async def like_search():
+                # 旧实现：标题 LIKE 全表扫描，返回全部命中后在应用内计数
+                query = select(Activity).where(Activity.is_active, Activity.title.contains(keyword))
+                return len((await db.scalars(query)).all())
+
+            async def fts_search():
+                return len(await repo.search(keyword, 0, page_size))
+
+            async def fts_count():
+                return await repo.count_active_activities(keyword)
+
+            async def fts_estimate():
+                return await repo.estimate_active_activities(keyword)
+
+            like = await measure(like_search, max(repeat // 5, 1))
+            page = await measure(fts_search, repeat)
+            count = await measure(fts_count, repeat)
+            estimate = await measure(fts_estimate, repeat)
+            print(
+                f"{keyword:<10} LIKE 命中 {like['result']:>7} p50 {like['p50']:>7.1f} ms | "
+                f"检索首页 p50 {page['p50']:>6.1f} ms p99 {page['p99']:>6.1f} ms | "
+                f"精确计数 {count['result']:>7} p50 {count['p50']:>6.1f} ms | "
+                f"估算 {estimate['result']:>7} p50 {estimate['p50']:>5.1f} ms"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="活动搜索基准")
+    parser.add_argument("--rows", type=int, default=1000000, help="活动数据量（不足时自动生成）")
+    parser.add_argument("--keywords", nargs="+", default=DEFAULT_KEYWORDS, help="测试的关键词")
+    parser.add_argument("--repeat", type=int, default=20, help="每个关键词的重复次数")
+    parser.add_argument("--page-size", type=int, default=10, help="每页数量")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.keywords, args.repeat, args.page_size))
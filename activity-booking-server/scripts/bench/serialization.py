@@ -0,0 +1,125 @@
+"""
+响应序列化基准脚本
+用内存中构造的 ORM 对象（不访问数据库）对比两种生成列表响应体的方式：
+原路径：ORM -> ActivityList/BookingList 模型 -> ApiResponse 包装 -> FastAPI 按 response_model
+重新校验并 model_dump(mode="json") -> orjson 编码；
+预编译序列化器：ORM -> 驼峰字典 -> orjson 编码，再拼接统一响应外壳。
+同时校验两种方式输出的 data 内容一致
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models.activity import Activity
+from app.models.booking import Booking, BookingStatus
+from app.schemas.activity import ActivityList
+from app.schemas.booking import BookingList
+from app.schemas.response import ApiResponse
+from app.utils.response import create_raw_success_response
+from app.utils.serializer import serializer_for
+
+
+def make_activity(rng: random.Random, activity_id: int) -> Activity:
+    start = datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(500000))
+    return Activity(
+        id=activity_id,
+        title=f"活动 {activity_id}",
+        description="周末户外徒步，沿途讲解植物和地貌" * 3,
+        cover_image=f"https://cdn.example.com/covers/{activity_id}.jpg",
+        location="杭州市西湖区",
+        latitude=30.25 + rng.uniform(-0.1, 0.1),
+        longitude=120.15 + rng.uniform(-0.1, 0.1),
+        organizer="户外俱乐部",
+        start_time=start,
+        end_time=start + timedelta(hours=3),
+        price=rng.choice([0, 49.9, 99, 199.5]),
+        max_participants=100,
+        booked_count=rng.randrange(100),
+        is_active=True,
+        created_at=start - timedelta(days=30),
+        updated_at=start - timedelta(days=1),
+    )
+
+
+def make_booking(rng: random.Random, booking_id: int) -> Booking:
+    activity = make_activity(rng, booking_id)
+    return Booking(
+        id=booking_id,
+        user_id=1,
+        activity_id=activity.id,
+        name="张三",
+        phone="13800000000",
+        participants=rng.randint(1, 5),
+        remark=None,
+        status=BookingStatus.CONFIRMED,
+        checked_in=0,
+        created_at=activity.created_at,
+        updated_at=activity.updated_at,
+        activity=activity,
+    )
+
+
+def pydantic_path(schema, adapter: TypeAdapter, page: dict) -> bytes:
+    # 与原接口一致：服务层构建响应模型，路由包装为 ApiResponse，
+    # FastAPI 先 model_dump 再按 response_model 校验，最后按别名序列化
+    response = ApiResponse.success(data=schema(**page), message="获取列表成功")
+    content = response.model_dump(by_alias=True)
+    validated = adapter.validate_python(content)
+    return orjson.dumps(adapter.dump_python(validated, mode="json", by_alias=True))
+
+
+def serializer_path(schema, page: dict) -> bytes:
+    return create_raw_success_response(serializer_for(schema).dumps(page), "获取列表成功").body
+
+
+def measure(fn, rounds: int) -> list:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def report(name: str, latencies: list, baseline: float = None) -> float:
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    speedup = f"  {baseline / p50:5.1f}x" if baseline else ""
+    print(f"  {name:<12} p50 {p50:8.3f} ms  p99 {p99:8.3f} ms{speedup}")
+    return p50
+
+
+def main(sizes: list, rounds: int):
+    rng = random.Random(0)
+    cases = [
+        ("活动列表", ActivityList, make_activity, {"page": 1, "page_size": max(sizes)}),
+        ("预约列表（嵌套活动）", BookingList, make_booking, {}),
+    ]
+    for title, schema, factory, extra in cases:
+        adapter = TypeAdapter(ApiResponse[schema])
+        for size in sizes:
+            page = dict(items=[factory(rng, i + 1) for i in range(size)], total=size, next_cursor=None, **extra)
+            old = orjson.loads(pydantic_path(schema, adapter, page))
+            new = orjson.loads(serializer_path(schema, page))
+            same = old["data"] == new["data"]
+            print(f"{title} {size} 项  响应体 {len(serializer_path(schema, page)) / 1024:.1f} KB  "
+                  f"data 一致 {'✅' if same else '❌'}")
+            baseline = report("Pydantic", measure(lambda: pydantic_path(schema, adapter, page), rounds))
+            report("预编译序列化", measure(lambda: serializer_path(schema, page), rounds), baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="响应序列化基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="列表长度")
+    parser.add_argument("--rounds", type=int, default=200, help="每种方式的重复次数")
+    args = parser.parse_args()
+    main(args.sizes, args.rounds)
@@ -0,0 +1,70 @@
+"""
+微信接口本地桩服务
+模拟 jscode2session、网页授权 access_token 和 userinfo 接口，用于登录压测，
+可配置响应延迟和「系统繁忙」比例（用于验证重试）
+
+启动后将 WECHAT_API_BASE 指向该服务，例如 http://127.0.0.1:9001
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+
+import uvicorn
+from fastapi import FastAPI
+
+LATENCY = 0.0
+BUSY_RATE = 0.0
+
+app = FastAPI()
+
+
+def _openid(code: str) -> str:
+    return "stub-" + hashlib.md5(code.encode()).hexdigest()[:20]
+
+
+async def _simulate() -> dict:
+    """模拟网络延迟，按比例返回系统繁忙"""
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if BUSY_RATE and random.random() < BUSY_RATE:
+        return {"errcode": -1, "errmsg": "system error"}
+    return {}
+
+
+@app.get("/sns/jscode2session")
+async def jscode2session(js_code: str):
+    return await _simulate() or {"openid": _openid(js_code), "session_key": "stub-session-key"}
+
+
+@app.get("/sns/oauth2/access_token")
+async def oauth2_access_token(code: str):
+    return await _simulate() or {
+        "access_token": "stub-access-token",
+        "expires_in": 7200,
+        "openid": _openid(code),
+        "scope": "snsapi_login"
+    }
+
+
+@app.get("/sns/userinfo")
+async def userinfo(openid: str):
+    return await _simulate() or {
+        "openid": openid,
+        "nickname": "压测用户",
+        "sex": 0,
+        "headimgurl": "",
+        "language": "zh_CN"
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="微信接口本地桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="每个请求的模拟延迟（毫秒）")
+    parser.add_argument("--busy-rate", type=float, default=0.0, help="返回「系统繁忙」的比例（0~1）")
+    args = parser.parse_args()
+    LATENCY = args.latency_ms / 1000
+    BUSY_RATE = args.busy_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
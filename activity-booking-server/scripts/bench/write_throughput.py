@@ -0,0 +1,170 @@
+"""
+写请求吞吐基准脚本
+通过服务层执行常见写操作（预约、取消、签到、创建和更新活动、更新用户），
+统计每种操作的 SQL 语句数、提交次数和并发下的每秒操作数。
+在改动前后的代码上各运行一次即可对比事务和往返次数的变化
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.models.user import User
+from app.schemas.activity import ActivityCreate, ActivityUpdate
+from app.schemas.booking import BookingCreate
+from app.schemas.user import UserUpdate
+from app.services.activity_service import ActivityService
+from app.services.booking_service import BookingService
+from app.services.user_service import UserService
+
+
+class RoundTripCounter:
+    """统计期间引擎发出的 SQL 语句数和提交次数"""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(async_engine.sync_engine, "commit", self._commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self._statement)
+        event.remove(async_engine.sync_engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, *args):
+        self.commits += 1
+
+
+async def prepare(workers: int) -> tuple:
+    """创建压测用户和活动（每个并发一个活动，避免行锁争用干扰往返次数的对比）"""
+    async with AsyncSessionLocal() as db:
+        now = datetime.now()
+        user = User(openid=f"write-bench-{time.time_ns()}", nickname="写入压测")
+        activities = [
+            Activity(
+                title=f"写入压测活动 {i}",
+                start_time=now + timedelta(days=1),
+                end_time=now + timedelta(days=1, hours=2),
+                max_participants=1000000,
+                booked_count=0,
+                is_active=True
+            )
+            for i in range(workers)
+        ]
+        db.add_all([user, *activities])
+        await db.commit()
+        return user.id, [activity.id for activity in activities]
+
+
+def operations(user_id: int):
+    """写操作：名称 -> 异步函数（每次使用独立会话，与一次请求相当）"""
+
+    def booking_create(activity_id: int) -> BookingCreate:
+        return BookingCreate(activity_id=activity_id, name="测试", phone="13800000000", participants=1)
+
+    async def create_booking(activity_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            booking = await BookingService(db).create_booking(booking_create(activity_id), user_id)
+            state["booking_id"] = booking.id
+
+    async def cancel_booking(activity_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            assert await BookingService(db).cancel_booking(state["booking_id"], user_id)
+
+    async def checkin_booking(activity_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            assert await BookingService(db).checkin_booking(state["booking_id"], user_id)
+
+    async def create_activity(activity_id: int, state: dict):
+        now = datetime.now()
+        async with AsyncSessionLocal() as db:
+            await ActivityService(db).create_activity(ActivityCreate(
+                title="写入压测新活动",
+                start_time=now + timedelta(days=1),
+                end_time=now + timedelta(days=1, hours=2),
+                max_participants=10
+            ))
+
+    async def update_activity(activity_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            await ActivityService(db).update_activity(activity_id, ActivityUpdate(location=f"场地 {time.time_ns()}"))
+
+    async def update_user(activity_id: int, state: dict):
+        async with AsyncSessionLocal() as db:
+            await UserService(db).update_user(user_id, UserUpdate(nickname=f"用户 {time.time_ns() % 1000}"))
+
+    # 取消和签到依赖前一步创建的预约
+    return [
+        ("预约", create_booking),
+        ("取消预约", cancel_booking),
+        ("预约", create_booking),
+        ("签到", checkin_booking),
+        ("创建活动", create_activity),
+        ("更新活动", update_activity),
+        ("更新用户", update_user),
+    ]
+
+
+async def main(rounds: int, workers: int):
+    user_id, activity_ids = await prepare(workers)
+    ops = operations(user_id)
+
+    # 单次执行统计每种操作的语句数和提交次数
+    print("每次操作的数据库往返")
+    print("-" * 48)
+    state = {}
+    seen = set()
+    for name, op in ops:
+        with RoundTripCounter() as counter:
+            await op(activity_ids[0], state)
+        if name not in seen:
+            seen.add(name)
+            print(f"{name:<8} SQL 语句 {counter.statements:>2}  提交 {counter.commits}")
+
+    # 并发执行完整流程统计吞吐
+    latencies = []
+
+    async def worker(activity_id: int):
+        state = {}
+        for _ in range(rounds):
+            for _, op in ops:
+                start = time.perf_counter()
+                await op(activity_id, state)
+                latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(activity_id) for activity_id in activity_ids))
+    elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+
+    latencies.sort()
+    print()
+    print(f"并发 {workers}  写操作 {len(latencies)} 次  耗时 {elapsed:.2f} 秒")
+    print(
+        f"吞吐 {len(latencies) / elapsed:.1f} ops/s  "
+        f"p50 {statistics.median(latencies) * 1000:.2f} ms  "
+        f"p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="写请求吞吐基准")
+    parser.add_argument("--rounds", type=int, default=50, help="每个并发执行完整流程的轮数")
+    parser.add_argument("--workers", type=int, default=20, help="并发数")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.workers))
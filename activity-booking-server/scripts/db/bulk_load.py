@@ -0,0 +1,554 @@
+"""
+批量导入与造数脚本
+通过 PostgreSQL COPY 批量写入用户、活动、预约，用于容量测试造数和从导出目录恢复数据
+
+- import：读取 export_data.py 的导出目录（NDJSON / CSV / Parquet，可带 gzip/zstd 压缩），
+  按 users → activities → bookings 的顺序导入并保留原 ID，导入后校正自增序列
+- generate：按指定规模生成合成数据，ID 从各表当前最大 ID 之后连续分配，
+  写入后按已确认预约回填活动的 booked_count
+- 行在客户端编码为 COPY 文本格式，每 --batch-rows 行一次 COPY，每 --chunk-rows 行提交一次；
+  --workers 大于 1 时按文件（导入）或 ID 区间（造数）拆分到多个进程，各自使用独立连接并行 COPY
+- --defer-indexes：写入前删除二级索引和外键，写入后重建索引，外键以 NOT VALID 方式加回
+  再 VALIDATE（一次集合校验代替逐行触发器检查）；主键和唯一索引始终保留
+- 活动的 search_vector 按当前分词器、geohash 按经纬度在应用侧生成，随行写入
+
+用法：
+    uv run python scripts/db/bulk_load.py generate --users 100000 --activities 10000 --bookings 1000000
+    uv run python scripts/db/bulk_load.py import export_data_20250101_120000 --truncate --defer-indexes
+    uv run python scripts/ops/run_script.py db/bulk_load generate --bookings 5000000 --defer-indexes
+
+generate 直接指定 ID 写入，运行期间不要有其他写入者；导入 Parquet 需要 pyarrow，zstd 需要 zstandard
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import orjson
+from sqlalchemy import Enum as SQLEnum
+
+from app.core.db import engine
+from app.models.activity import SEARCH_FIELDS
+from app.utils.geo import encode as encode_geohash
+from app.utils.search import build_document
+from scripts.db.export_data import CSV_NULL, EXCLUDED_COLUMNS, TABLES, parse_csv_cell
+
+# COPY 文本格式：列之间用制表符分隔，NULL 写作 \N，反斜杠和控制字符需转义
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_ENCODERS = {
+    str: lambda value: value.translate(_ESCAPES),
+    int: str,
+    float: repr,
+    bool: lambda value: "t" if value else "f",
+    datetime: datetime.isoformat,
+    type(None): lambda value: "\\N",
+}
+
+
+def _encode(value) -> str:
+    encoder = _ENCODERS.get(type(value))
+    return encoder(value) if encoder else str(value).translate(_ESCAPES)
+
+
+def _encode_row(row) -> str:
+    return "\t".join(map(_encode, row)) + "\n"
+
+
+@lru_cache(maxsize=100000)
+def _search_vector(*texts) -> str:
+    """活动检索向量；造数时字段组合有限，缓存分词结果"""
+    return build_document(list(zip(texts, (weight for _, weight in SEARCH_FIELDS))))
+
+
+class BulkLoader:
+    """在一个数据库连接上按批 COPY 写入"""
+
+    def __init__(self, batch_rows: int = 50000, chunk_rows: int = 1000000):
+        self.batch_rows = batch_rows
+        self.chunk_rows = chunk_rows
+        # 原生 psycopg2 连接，COPY 需要使用游标的 copy_expert
+        self.conn = engine.raw_connection()
+
+    def close(self):
+        self.conn.close()
+
+    def execute(self, sql: str, params=None):
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else None
+        self.conn.commit()
+        return rows
+
+    def copy(self, table: str, columns, lines) -> int:
+        """把已编码的 COPY 文本行写入表，返回写入行数"""
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        total = pending = 0
+        started = time.perf_counter()
+        lines = iter(lines)
+        with self.conn.cursor() as cursor:
+            while batch := list(islice(lines, self.batch_rows)):
+                buffer = io.StringIO()
+                buffer.writelines(batch)
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+                total += len(batch)
+                pending += len(batch)
+                if pending >= self.chunk_rows:
+                    self.conn.commit()
+                    pending = 0
+                    elapsed = time.perf_counter() - started
+                    print(f"  {table}: 已写入 {total} 行，{total / elapsed:,.0f} 行/秒")
+        self.conn.commit()
+        elapsed = time.perf_counter() - started
+        print(f"- {table}: 写入 {total} 行，耗时 {elapsed:.1f} 秒（{total / max(elapsed, 1e-9):,.0f} 行/秒）")
+        return total
+
+    def copy_parallel(self, table: str, columns, sources, workers: int) -> int:
+        """
+        并行写入：sources 为返回文本行迭代器的无参函数列表，按轮询分配给 workers 个进程
+
+        使用 fork 启动子进程，sources 不需要可序列化；只有一个进程时在当前连接上顺序写入
+        """
+        workers = min(workers, len(sources))
+        if workers <= 1:
+            return self.copy(table, columns, (line for source in sources for line in source()))
+
+        context = multiprocessing.get_context("fork")
+        written = context.Value("q", 0)
+        started = time.perf_counter()
+        processes = [
+            context.Process(
+                target=_copy_worker,
+                args=(self.batch_rows, self.chunk_rows, table, columns, sources[i::workers], written)
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if any(process.exitcode != 0 for process in processes):
+            raise SystemExit(f"{table}: 并行写入进程异常退出，已提交的分块不会回滚")
+
+        elapsed = time.perf_counter() - started
+        total = written.value
+        print(f"- {table}: {workers} 个进程共写入 {total} 行，耗时 {elapsed:.1f} 秒（{total / elapsed:,.0f} 行/秒）")
+        return total
+
+    def reset_sequence(self, table: str):
+        """显式指定 ID 写入后，把自增序列推进到当前最大 ID"""
+        self.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f"FROM {table}"
+        )
+
+    @contextmanager
+    def deferred_indexes(self, tables):
+        """写入期间删除二级索引和外键，结束后（包括失败时）重建"""
+        indexes = self.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = ANY(%s::regclass[]) AND NOT i.indisprimary AND NOT i.indisunique
+            """,
+            (list(tables),)
+        )
+        foreign_keys = self.execute(
+            """
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))
+            """,
+            (list(tables), list(tables))
+        )
+        print(f"暂时删除 {len(indexes)} 个索引和 {len(foreign_keys)} 个外键，中断时可执行以下语句恢复：")
+        for _, definition in indexes:
+            print(f"  {definition};")
+        for table, name, definition in foreign_keys:
+            print(f"  ALTER TABLE {table} ADD CONSTRAINT {name} {definition};")
+
+        for table, name, _ in foreign_keys:
+            self.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+        for name, _ in indexes:
+            self.execute(f"DROP INDEX {name}")
+        try:
+            yield
+        finally:
+            started = time.perf_counter()
+            self.execute("SET maintenance_work_mem = '512MB'")
+            for _, definition in indexes:
+                self.execute(definition)
+            print(f"重建 {len(indexes)} 个索引，耗时 {time.perf_counter() - started:.1f} 秒")
+
+            started = time.perf_counter()
+            for table, name, definition in foreign_keys:
+                self.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID")
+                self.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+            print(f"恢复并校验 {len(foreign_keys)} 个外键，耗时 {time.perf_counter() - started:.1f} 秒")
+
+    def analyze(self, tables):
+        for table in tables:
+            self.execute(f"ANALYZE {table}")
+
+
+def _copy_worker(batch_rows: int, chunk_rows: int, table: str, columns, sources, written):
+    """并行写入的子进程"""
+    # fork 继承了父进程连接池中的连接，丢弃（不关闭）后由子进程建立自己的连接
+    engine.dispose(close=False)
+    loader = BulkLoader(batch_rows, chunk_rows)
+    try:
+        total = loader.copy(table, columns, (line for source in sources for line in source()))
+    finally:
+        loader.close()
+    with written.get_lock():
+        written.value += total
+
+
+# ---------------------------------------------------------------------------
+# 从导出目录导入
+# ---------------------------------------------------------------------------
+
+def _open_input(path: str):
+    """按扩展名打开（可选压缩的）二进制输入流"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("读取 zstd 文件需要安装 zstandard：uv sync --extra export")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def _read_ndjson(path: str, names, batch_rows: int):
+    with _open_input(path) as stream:
+        for line in stream:
+            record = orjson.loads(line)
+            yield tuple(record.get(name) for name in names)
+
+
+def _read_csv(path: str, names, batch_rows: int, null: str = CSV_NULL):
+    """
+    null 为导出清单记录的 NULL 标记；早期导出没有标记，NULL 写为空单元格，
+    无法与空字符串区分，空单元格一律按 NULL 导入
+    """
+    decode = parse_csv_cell if null == CSV_NULL else lambda cell: cell or None
+    with io.TextIOWrapper(_open_input(path), encoding="utf-8", newline="") as stream:
+        reader = csv.reader(stream)
+        header = next(reader)
+        positions = [header.index(name) for name in names]
+        for record in reader:
+            yield tuple(decode(record[i]) for i in positions)
+
+
+def _read_parquet(path: str, names, batch_rows: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("读取 Parquet 文件需要安装 pyarrow：uv sync --extra export")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=list(names)):
+        yield from zip(*(column.to_pylist() for column in batch.columns))
+
+
+READERS = {"ndjson": _read_ndjson, "csv": _read_csv, "parquet": _read_parquet}
+
+
+def _converter(table, names):
+    """导出行 -> COPY 行：枚举值转为数据库中存储的名称，活动追加检索向量和 geohash"""
+    enum_maps = {
+        i: {member.value: member.name for member in table.c[name].type.enum_class}
+        for i, name in enumerate(names)
+        if isinstance(table.c[name].type, SQLEnum) and table.c[name].type.enum_class
+    }
+    is_activity = table.name == "activities"
+    search_positions = [names.index(field) for field, _ in SEARCH_FIELDS] if is_activity else None
+    geo_positions = (names.index("latitude"), names.index("longitude")) if is_activity else None
+
+    def geohash(row):
+        latitude, longitude = (row[i] for i in geo_positions)
+        if latitude is None or longitude is None:
+            return None
+        return encode_geohash(float(latitude), float(longitude))
+
+    def convert(row):
+        if enum_maps:
+            row = list(row)
+            for i, mapping in enum_maps.items():
+                if row[i] is not None:
+                    row[i] = mapping.get(row[i], row[i])
+        if is_activity:
+            return (*row, _search_vector(*(row[i] for i in search_positions)), geohash(row))
+        return row
+
+    copy_columns = list(names) + (["search_vector", "geohash"] if is_activity else [])
+    return copy_columns, convert
+
+
+def _read_file(reader, convert, path: str, names, batch_rows: int):
+    """读取一个导出文件，返回编码后的 COPY 文本行"""
+    return (_encode_row(convert(row)) for row in reader(path, names, batch_rows))
+
+
+def import_export(loader: BulkLoader, directory: str, tables, truncate: bool, defer_indexes: bool, workers: int = 1):
+    """从 export_data.py 的导出目录导入"""
+    manifests = {}
+    for name in tables:
+        path = os.path.join(directory, f"{name}.manifest.json")
+        if not os.path.exists(path):
+            print(f"- {name}: 没有导出清单，跳过")
+            continue
+        with open(path, encoding="utf-8") as f:
+            manifests[name] = json.load(f)
+        if not manifests[name]["done"]:
+            print(f"⚠️  {name} 的导出未完成，只导入已完成的分块")
+    if not manifests:
+        raise SystemExit(f"{directory} 中没有可导入的数据")
+
+    if truncate:
+        loader.execute(f"TRUNCATE {', '.join(manifests)} RESTART IDENTITY CASCADE")
+        print(f"已清空: {', '.join(manifests)}")
+
+    with loader.deferred_indexes(manifests) if defer_indexes else nullcontext():
+        for name, manifest in manifests.items():
+            table = TABLES[name]
+            names = [column.name for column in table.columns if column.name not in EXCLUDED_COLUMNS]
+            columns, convert = _converter(table, names)
+            reader = READERS[manifest["format"]]
+            if manifest["format"] == "csv":
+                reader = partial(reader, null=manifest.get("csv_null"))
+            sources = [
+                partial(
+                    _read_file, reader, convert,
+                    os.path.join(directory, chunk["file"]), names, loader.batch_rows
+                )
+                for chunk in manifest["chunks"]
+            ]
+            loader.copy_parallel(name, columns, sources, workers)
+            loader.reset_sequence(name)
+    loader.analyze(manifests)
+
+
+# ---------------------------------------------------------------------------
+# 合成数据
+# ---------------------------------------------------------------------------
+
+CITIES = ("北京", "上海", "广州", "深圳", "杭州", "成都", "武汉", "南京", "西安", "重庆")
+# 城市中心坐标，活动地点在中心附近约 ±20km 内随机分布
+CITY_CENTERS = {
+    "北京": (39.9042, 116.4074), "上海": (31.2304, 121.4737), "广州": (23.1291, 113.2644),
+    "深圳": (22.5431, 114.0579), "杭州": (30.2741, 120.1551), "成都": (30.5728, 104.0668),
+    "武汉": (30.5928, 114.3055), "南京": (32.0603, 118.7969), "西安": (34.3416, 108.9398),
+    "重庆": (29.5630, 106.5516),
+}
+THEMES = ("徒步", "读书会", "摄影", "瑜伽", "编程", "亲子手工", "咖啡品鉴", "城市骑行", "羽毛球", "桌游")
+FORMATS = ("体验课", "分享会", "训练营", "沙龙", "公开课", "工作坊")
+VENUES = ("公园", "图书馆", "社区中心", "科技园会议室", "体育馆", "咖啡书屋", "植物园", "文化馆")
+ORGANIZERS = ("户外运动协会", "技术交流社", "健康生活馆", "摄影爱好者协会", "读书会", "亲子俱乐部")
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何林罗高"
+GIVEN_NAMES = "伟芳娜敏静丽强磊军洋勇艳杰涛明超秀霞平刚"
+
+
+def _max_id(loader: BulkLoader, table: str) -> int:
+    return loader.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")[0][0]
+
+
+def _timestamps(rng: random.Random, now: datetime, span_seconds: int, size: int = 65536):
+    """预先格式化一组随机时间戳，造数时从中抽取；逐行 isoformat 是造数的主要开销之一"""
+    return [(now - timedelta(seconds=rng.randrange(span_seconds))).isoformat() for _ in range(size)]
+
+
+def _generate_users(rng: random.Random, first_id: int, count: int, tag: str, now: datetime):
+    """生成用户的 COPY 文本行（字段不含需要转义的字符，直接拼接）"""
+    random_ = rng.random
+    names = [surname + given for surname in SURNAMES for given in GIVEN_NAMES]
+    stamps = _timestamps(rng, now, 365 * 86400)
+    for user_id in range(first_id, first_id + count):
+        created_at = stamps[int(random_() * len(stamps))]
+        yield (
+            f"{user_id}\tgen-{tag}-{user_id}\t{names[int(random_() * len(names))]}"
+            f"\t1{3 + int(random_() * 7)}{int(random_() * 1e9):09d}\t{int(random_() * 3)}"
+            f"\t{CITIES[int(random_() * len(CITIES))]}\tzh_CN\tt\tf\t{created_at}\t{created_at}\n"
+        )
+
+
+USER_COLUMNS = (
+    "id", "openid", "nickname", "phone", "gender", "city", "language",
+    "is_active", "is_staff", "created_at", "updated_at",
+)
+
+
+def _generate_activities(rng: random.Random, first_id: int, count: int, now: datetime):
+    """生成活动的 COPY 文本行；活动数量少，按通用编码处理"""
+    for activity_id in range(first_id, first_id + count):
+        theme, form = rng.choice(THEMES), rng.choice(FORMATS)
+        city, venue, organizer = rng.choice(CITIES), rng.choice(VENUES), rng.choice(ORGANIZERS)
+        title = f"{city}{theme}{form}"
+        description = f"{organizer}主办的{theme}{form}，地点在{city}{venue}，欢迎报名参加。"
+        location = f"{city}{venue}"
+        center_lat, center_lon = CITY_CENTERS[city]
+        latitude = round(center_lat + rng.uniform(-0.18, 0.18), 6)
+        longitude = round(center_lon + rng.uniform(-0.22, 0.22), 6)
+        # 开始时间分布在过去半年到未来半年，按整点开始
+        start_time = (now + timedelta(hours=rng.randrange(-180 * 24, 180 * 24))).replace(minute=0, second=0, microsecond=0)
+        yield _encode_row((
+            activity_id,
+            title,
+            description,
+            "/static/images/placeholder.jpg",
+            location,
+            latitude,
+            longitude,
+            encode_geohash(latitude, longitude),
+            organizer,
+            start_time,
+            start_time + timedelta(hours=rng.choice((1, 2, 3, 4, 6))),
+            float(rng.choice((0, 0, 20, 30, 50, 80, 100))),
+            rng.choice((10, 20, 30, 50, 100, 200, 500)),
+            0,
+            rng.random() < 0.95,
+            now,
+            now,
+            _search_vector(title, organizer, location, description),
+        ))
+
+
+ACTIVITY_COLUMNS = (
+    "id", "title", "description", "cover_image", "location", "latitude", "longitude", "geohash",
+    "organizer", "start_time", "end_time", "price", "max_participants", "booked_count", "is_active", "created_at", "updated_at", "search_vector",
+)
+
+
+def _generate_bookings(seed: int, first_id: int, count: int, users: range, activities: range, now: datetime):
+    """生成预约的 COPY 文本行（字段不含需要转义的字符，直接拼接）"""
+    rng = random.Random(seed)
+    random_ = rng.random
+    names = [surname + given for surname in SURNAMES for given in GIVEN_NAMES]
+    stamps = _timestamps(rng, now, 180 * 86400)
+    # 约 85% 已确认，其余为已取消和已完成（已完成视为已签到）
+    statuses = ("CONFIRMED\t0",) * 17 + ("CANCELLED\t0", "CANCELLED\t0", "COMPLETED\t1")
+    participants = (1, 1, 1, 2, 3)
+    user_count, activity_count = len(users), len(activities)
+    for booking_id in range(first_id, first_id + count):
+        created_at = stamps[int(random_() * len(stamps))]
+        yield (
+            f"{booking_id}\t{users[int(random_() * user_count)]}"
+            # 平方分布让少数活动集中大量预约，接近热门活动的真实分布
+            f"\t{activities[int(activity_count * random_() ** 2)]}"
+            f"\t{names[int(random_() * len(names))]}\t1{3 + int(random_() * 7)}{int(random_() * 1e9):09d}"
+            f"\t{participants[int(random_() * 5)]}\t{statuses[int(random_() * 20)]}\t{created_at}\t{created_at}\n"
+        )
+
+
+BOOKING_COLUMNS = (
+    "id", "user_id", "activity_id", "name", "phone", "participants", "status", "checked_in",
+    "created_at", "updated_at",
+)
+
+
+def generate(
+    loader: BulkLoader,
+    users: int,
+    activities: int,
+    bookings: int,
+    seed: int,
+    defer_indexes: bool,
+    workers: int = 1,
+):
+    """生成合成数据；预约关联到本次生成的用户和活动（未生成时使用已有的）"""
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    tag = f"{seed}-{int(now.timestamp())}"
+    first_user, first_activity, first_booking = (
+        _max_id(loader, table) + 1 for table in ("users", "activities", "bookings")
+    )
+    tables = [name for name, count in (("users", users), ("activities", activities), ("bookings", bookings)) if count]
+
+    user_ids = range(first_user, first_user + users) if users else range(1, first_user)
+    activity_ids = range(first_activity, first_activity + activities) if activities else range(1, first_activity)
+    if bookings and (not user_ids or not activity_ids):
+        raise SystemExit("生成预约需要已有或同时生成用户和活动")
+
+    with loader.deferred_indexes(tables) if defer_indexes else nullcontext():
+        if users:
+            loader.copy("users", USER_COLUMNS, _generate_users(rng, first_user, users, tag, now))
+            loader.reset_sequence("users")
+        if activities:
+            loader.copy("activities", ACTIVITY_COLUMNS, _generate_activities(rng, first_activity, activities, now))
+            loader.reset_sequence("activities")
+        if bookings:
+            # 按提交分块拆分 ID 区间，每段使用独立的随机种子，结果与并行进程数无关
+            sources = [
+                partial(
+                    _generate_bookings, seed + offset, first_booking + offset,
+                    min(loader.chunk_rows, bookings - offset), user_ids, activity_ids, now
+                )
+                for offset in range(0, bookings, loader.chunk_rows)
+            ]
+            loader.copy_parallel("bookings", BOOKING_COLUMNS, sources, workers)
+            loader.reset_sequence("bookings")
+
+    if bookings:
+        # 按本次生成的已确认预约回填已预约人数，容量不足时同步放大，保持 booked_count <= max_participants
+        started = time.perf_counter()
+        loader.execute(
+            """
+            UPDATE activities AS a
+            SET booked_count = a.booked_count + b.seats,
+                max_participants = GREATEST(a.max_participants, a.booked_count + b.seats)
+            FROM (
+                SELECT activity_id, SUM(participants) AS seats
+                FROM bookings
+                WHERE id >= %s AND status = 'CONFIRMED'
+                GROUP BY activity_id
+            ) AS b
+            WHERE a.id = b.activity_id
+            """,
+            (first_booking,)
+        )
+        print(f"回填 booked_count，耗时 {time.perf_counter() - started:.1f} 秒")
+    loader.analyze(tables)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="通过 COPY 批量导入或生成数据")
+    parser.add_argument("--batch-rows", type=int, default=50000, help="每次 COPY 的行数")
+    parser.add_argument("--chunk-rows", type=int, default=1000000, help="每次提交的行数")
+    parser.add_argument("--defer-indexes", action="store_true", help="写入期间删除二级索引和外键，写入后重建")
+    parser.add_argument("--workers", type=int, default=1, help="并行写入的进程数（建议不超过 CPU 核数）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="导入 export_data.py 的导出目录")
+    import_parser.add_argument("directory", help="导出目录")
+    import_parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES), help="要导入的表")
+    import_parser.add_argument("--truncate", action="store_true", help="导入前清空目标表（⚠️ 会级联清空关联表）")
+
+    generate_parser = commands.add_parser("generate", help="生成合成数据")
+    generate_parser.add_argument("--users", type=int, default=10000, help="用户数")
+    generate_parser.add_argument("--activities", type=int, default=1000, help="活动数")
+    generate_parser.add_argument("--bookings", type=int, default=100000, help="预约数")
+    generate_parser.add_argument("--seed", type=int, default=42, help="随机种子")
+
+    args = parser.parse_args()
+    loader = BulkLoader(args.batch_rows, args.chunk_rows)
+    started = time.perf_counter()
+    try:
+        if args.command == "import":
+            import_export(loader, args.directory, args.tables, args.truncate, args.defer_indexes, args.workers)
+        else:
+            generate(loader, args.users, args.activities, args.bookings, args.seed, args.defer_indexes, args.workers)
+    finally:
+        loader.close()
+    print(f"✅ 完成，总耗时 {time.perf_counter() - started:.1f} 秒")
@@ -21,7 +21,8 @@ def create_superuser():
         admin_user = User(
             openid="admin",
             nickname="系统管理员",
-            phone="13800000000"
+            phone="13800000000",
+            is_staff=True
         )
         
         db.add(admin_user)
@@ -1,88 +1,343 @@
 """
 数据导出脚本
-将数据库数据导出为 JSON 格式
+将用户、活动、预约表流式导出为 NDJSON / CSV / Parquet 文件
+
+- 按主键分块：每块用 `WHERE id > 上一块末尾 ORDER BY id LIMIT n` 读取，走主键索引，
+  块内通过服务端游标（stream_results + yield_per）分批取行，内存占用与表大小无关
+- 每块写入一个独立文件，先写临时文件再原子重命名，完成后记入该表的清单文件
+  `<表名>.manifest.json`；中断后对同一目录重新执行会从清单记录的最后一个 ID 继续
+- 首次导出时记录当前最大 ID 作为上界，续传不会追逐导出期间新写入的行
+- 多个表可并行导出（--jobs）
+
+用法：
+    uv run python scripts/db/export_data.py --format ndjson --compression gzip
+    uv run python scripts/db/export_data.py --output exports/20250101 --tables bookings --format parquet
+    uv run python scripts/db/export_data.py --output exports/20250101   # 中断后续传
+
+Parquet 需要安装 pyarrow，zstd 压缩需要安装 zstandard（uv sync --extra export）
 """
+import argparse
+import csv
+import gzip
+import io
 import json
-from datetime import datetime
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from enum import Enum
 
-from app.core.db import SessionLocal
-from app.models import User, Activity, Booking
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+import orjson
+from sqlalchemy import Boolean, DateTime, Float, Integer, func, select
 
-def export_data():
-    """导出所有数据为 JSON"""
-    db = SessionLocal()
-    
-    try:
-        # 导出用户数据
-        users = db.query(User).all()
-        users_data = []
-        for user in users:
-            users_data.append({
-                "id": user.id,
-                "openid": user.openid,
-                "nickname": user.nickname,
-                "phone": user.phone,
-                "created_at": user.created_at.isoformat()
-            })
-        
-        # 导出活动数据
-        activities = db.query(Activity).all()
-        activities_data = []
-        for activity in activities:
-            activities_data.append({
-                "id": activity.id,
-                "title": activity.title,
-                "description": activity.description,
-                "location": activity.location,
-                "organizer": activity.organizer,
-                "start_time": activity.start_time.isoformat(),
-                "end_time": activity.end_time.isoformat(),
-                "price": float(activity.price),
-                "max_participants": activity.max_participants,
-                "booked_count": activity.booked_count,
-                "is_active": activity.is_active,
-                "created_at": activity.created_at.isoformat()
-            })
-        
-        # 导出预约数据
-        bookings = db.query(Booking).all()
-        bookings_data = []
-        for booking in bookings:
-            bookings_data.append({
-                "id": booking.id,
-                "user_id": booking.user_id,
-                "activity_id": booking.activity_id,
-                "name": booking.name,
-                "phone": booking.phone,
-                "participants": booking.participants,
-                "status": booking.status.value,
-                "created_at": booking.created_at.isoformat()
-            })
-        
-        # 合并所有数据
-        export_data = {
-            "export_time": datetime.now().isoformat(),
-            "users": users_data,
-            "activities": activities_data,
-            "bookings": bookings_data
-        }
-        
-        # 保存到文件
-        filename = f"export_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"数据已导出到: {filename}")
-        print(f"- 用户: {len(users_data)} 条")
-        print(f"- 活动: {len(activities_data)} 条")
-        print(f"- 预约: {len(bookings_data)} 条")
-        
-    except Exception as e:
-        print(f"导出数据失败: {e}")
-    finally:
-        db.close()
+from app.core.db import engine
+from app.models import Activity, Booking, User
+
+# 可导出的表；search_vector、geohash 分别由检索字段和经纬度派生，导入时重新计算，不导出；
+# cover_srcset 指向本机生成的图片文件，导入后用 scripts/ops/derive_cover_images.py 重新生成
+TABLES = {
+    "users": User.__table__,
+    "activities": Activity.__table__,
+    "bookings": Booking.__table__,
+}
+EXCLUDED_COLUMNS = {"search_vector", "geohash", "cover_srcset"}
+
+FORMATS = ("ndjson", "csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+EXTENSIONS = {"ndjson": ".ndjson", "csv": ".csv", "parquet": ".parquet"}
+COMPRESSED_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# CSV 中的 NULL 标记（同 COPY 文本格式），与空字符串区分；以反斜杠开头的文本再加一个反斜杠转义
+CSV_NULL = "\\N"
+
+
+def _columns(table):
+    return [column for column in table.columns if column.name not in EXCLUDED_COLUMNS]
+
+
+def _plain(value):
+    """枚举转为值，其余原样返回（NDJSON 由 orjson 处理日期时间）"""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _text(value):
+    """CSV 单元格：None 为 CSV_NULL，日期时间为 ISO 格式"""
+    if isinstance(value, str):
+        return "\\" + value if value.startswith("\\") else value
+    if value is None:
+        return CSV_NULL
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def parse_csv_cell(cell: str):
+    """_text 的逆过程（只还原 NULL 和转义，类型由 COPY 按列解析）"""
+    if cell.startswith("\\"):
+        return None if cell == CSV_NULL else cell[1:]
+    return cell
+
+
+def _open_stream(path: str, compression: str):
+    """打开（可选压缩的）二进制输出流"""
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("zstd 压缩需要安装 zstandard：uv sync --extra export")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    return open(path, "wb")
+
+
+class NdjsonWriter:
+    """每行一个 JSON 对象"""
+
+    def __init__(self, path: str, columns, compression: str):
+        self.names = [column.name for column in columns]
+        self.stream = _open_stream(path, compression)
+
+    def write(self, rows):
+        names = self.names
+        self.stream.write(b"".join(
+            orjson.dumps(dict(zip(names, map(_plain, row)))) + b"\n" for row in rows
+        ))
+
+    def close(self):
+        self.stream.close()
+
+
+class CsvWriter:
+    """带表头的 UTF-8 CSV"""
+
+    def __init__(self, path: str, columns, compression: str):
+        self.stream = io.TextIOWrapper(_open_stream(path, compression), encoding="utf-8", newline="")
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow([column.name for column in columns])
+
+    def write(self, rows):
+        self.writer.writerows([_text(value) for value in row] for row in rows)
+
+    def close(self):
+        self.stream.close()
+
+
+class ParquetWriter:
+    """Parquet：每批行写入一个行组，压缩由 Parquet 编码自身完成"""
+
+    def __init__(self, path: str, columns, compression: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet 导出需要安装 pyarrow：uv sync --extra export")
+
+        def arrow_type(column):
+            if isinstance(column.type, Boolean):
+                return pa.bool_()
+            if isinstance(column.type, Integer):
+                return pa.int64()
+            if isinstance(column.type, Float):
+                return pa.float64()
+            if isinstance(column.type, DateTime):
+                return pa.timestamp("us")
+            return pa.string()
+
+        self.pa = pa
+        self.schema = pa.schema([(column.name, arrow_type(column)) for column in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, rows):
+        arrays = [
+            self.pa.array([_plain(row[i]) for row in rows], type=field.type)
+            for i, field in enumerate(self.schema)
+        ]
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"ndjson": NdjsonWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+class Manifest:
+    """单表导出清单：记录导出参数、ID 上界和已完成的分块，用于断点续传"""
+
+    def __init__(self, path: str, data: dict):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def load_or_create(cls, path: str, table: str, fmt: str, compression: str, start_id: int, end_id: int):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if (data["format"], data["compression"]) != (fmt, compression):
+                raise SystemExit(
+                    f"{path} 使用 {data['format']}/{data['compression']} 导出，"
+                    f"与本次参数不一致，请更换输出目录"
+                )
+            # 早期的 CSV 导出把 NULL 和空字符串都写为空单元格，不能与新分块混在同一目录
+            if fmt == "csv" and "csv_null" not in data:
+                raise SystemExit(f"{path} 由旧版本导出（CSV 未区分 NULL 与空字符串），请更换输出目录")
+            return cls(path, data)
+        return cls(path, {
+            "table": table,
+            "format": fmt,
+            "compression": compression,
+            **({"csv_null": CSV_NULL} if fmt == "csv" else {}),
+            "start_id": start_id,
+            "end_id": end_id,
+            "last_id": start_id - 1,
+            "rows": 0,
+            "done": False,
+            "chunks": [],
+        })
+
+    def add_chunk(self, filename: str, first_id: int, last_id: int, rows: int):
+        self.data["chunks"].append({"file": filename, "first_id": first_id, "last_id": last_id, "rows": rows})
+        self.data["last_id"] = last_id
+        self.data["rows"] += rows
+        self.save()
+
+    def finish(self):
+        self.data["done"] = True
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def export_table(
+    name: str,
+    output: str,
+    fmt: str,
+    compression: str,
+    chunk_rows: int,
+    batch_rows: int,
+    start_id: int = 1,
+    end_id: int = None,
+) -> int:
+    """按主键分块流式导出一个表，返回本表累计导出行数"""
+    table = TABLES[name]
+    columns = _columns(table)
+    writer_cls = WRITERS[fmt]
+    # Parquet 在文件内部按列压缩，文件名不加压缩后缀
+    suffix = EXTENSIONS[fmt] + ("" if fmt == "parquet" else COMPRESSED_SUFFIXES[compression])
+
+    with engine.connect() as conn:
+        if end_id is None:
+            end_id = conn.scalar(select(func.coalesce(func.max(table.c.id), 0)))
+        manifest = Manifest.load_or_create(
+            os.path.join(output, f"{name}.manifest.json"), name, fmt, compression, start_id, end_id
+        )
+        if manifest.data["done"]:
+            print(f"- {name}: 已完成，跳过（{manifest.data['rows']} 行）")
+            return manifest.data["rows"]
+
+        upper = manifest.data["end_id"]
+        last_id = manifest.data["last_id"]
+        if last_id >= manifest.data["start_id"]:
+            print(f"- {name}: 从 ID {last_id} 之后继续导出")
+
+        started = time.perf_counter()
+        while last_id < upper:
+            query = (
+                select(*columns)
+                .where(table.c.id > last_id, table.c.id <= upper)
+                .order_by(table.c.id)
+                .limit(chunk_rows)
+            )
+            filename = f"{name}.{len(manifest.data['chunks']) + 1:06d}{suffix}"
+            path = os.path.join(output, filename)
+            tmp_path = path + ".part"
+
+            writer = writer_cls(tmp_path, columns, compression)
+            first_id, rows = None, 0
+            try:
+                # 服务端游标：按 batch_rows 分批从数据库取行，不在客户端缓存整块结果
+                result = conn.execution_options(stream_results=True, yield_per=batch_rows).execute(query)
+                for batch in result.partitions():
+                    writer.write(batch)
+                    if first_id is None:
+                        first_id = batch[0].id
+                    last_id = batch[-1].id
+                    rows += len(batch)
+            finally:
+                writer.close()
+            # 结束当前读事务，避免长事务阻塞 VACUUM
+            conn.commit()
+
+            if rows == 0:
+                os.remove(tmp_path)
+                break
+            os.replace(tmp_path, path)
+            manifest.add_chunk(filename, first_id, last_id, rows)
+            print(f"  {name}: {filename} ID {first_id}-{last_id} {rows} 行")
+
+        manifest.finish()
+        elapsed = time.perf_counter() - started
+        print(f"- {name}: 导出完成，共 {manifest.data['rows']} 行，本次耗时 {elapsed:.1f} 秒")
+        return manifest.data["rows"]
+
+
+def export_data(
+    output: str = None,
+    tables=tuple(TABLES),
+    fmt: str = "ndjson",
+    compression: str = "gzip",
+    chunk_rows: int = 1_000_000,
+    batch_rows: int = 10_000,
+    jobs: int = 1,
+    start_id: int = 1,
+    end_id: int = None,
+):
+    """导出数据，返回输出目录"""
+    output = output or f"export_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(output, exist_ok=True)
+    print(f"导出到目录: {output}（{fmt}，压缩: {compression}）")
+
+    def run(name: str) -> int:
+        return export_table(name, output, fmt, compression, chunk_rows, batch_rows, start_id, end_id)
+
+    # 同步引擎的连接池可同时提供多个连接，每个表使用独立连接并行导出
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(tables)))) as pool:
+        totals = dict(zip(tables, pool.map(run, tables)))
+
+    print(f"数据已导出到: {output}")
+    for name, rows in totals.items():
+        print(f"- {name}: {rows} 条")
+    return output
 
 
 if __name__ == "__main__":
-    export_data()
+    parser = argparse.ArgumentParser(description="流式导出数据")
+    parser.add_argument("--output", help="输出目录，已存在导出清单时续传（默认按时间新建目录）")
+    parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=list(TABLES), help="要导出的表")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, default="ndjson", help="输出格式")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="gzip", help="压缩方式")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="每个输出文件的最大行数")
+    parser.add_argument("--batch-rows", type=int, default=10_000, help="每次从游标读取的行数")
+    parser.add_argument("--jobs", type=int, default=1, help="并行导出的表数")
+    parser.add_argument("--start-id", type=int, default=1, help="起始 ID（含），仅首次导出时生效")
+    parser.add_argument("--end-id", type=int, help="结束 ID（含），默认导出开始时的最大 ID，仅首次导出时生效")
+    args = parser.parse_args()
+
+    try:
+        export_data(
+            args.output, args.tables, args.fmt, args.compression,
+            args.chunk_rows, args.batch_rows, args.jobs, args.start_id, args.end_id
+        )
+    except KeyboardInterrupt:
+        print("\n导出已中断，使用相同的 --output 重新执行即可续传")
+        sys.exit(1)
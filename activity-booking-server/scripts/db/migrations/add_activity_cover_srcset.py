@@ -0,0 +1,70 @@
+"""
+添加活动封面多尺寸版本的数据库迁移脚本
+
+- activities.cover_srcset：上传封面后生成的多尺寸 WebP/AVIF（JSONB）
+- 已有活动的封面可用 scripts/ops/derive_cover_images.py 批量生成
+- 补齐早期写入、缺少 avif 键的 cover_srcset（键固定为 thumbnail、hero、webp、avif）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加活动封面多尺寸版本字段...")
+
+    with engine.connect() as conn:
+        try:
+            # 可空且无默认值，只修改表定义，不重写已有数据
+            conn.execute(text("ALTER TABLE activities ADD COLUMN IF NOT EXISTS cover_srcset JSONB"))
+            conn.execute(text("COMMENT ON COLUMN activities.cover_srcset IS '封面图的多尺寸版本'"))
+            conn.execute(text("""
+                UPDATE activities SET cover_srcset = cover_srcset || '{"avif": null}'::jsonb
+                WHERE cover_srcset IS NOT NULL AND NOT cover_srcset ? 'avif'
+            """))
+            conn.commit()
+            print("✅ 活动封面多尺寸版本字段添加成功")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ 迁移失败: {e}")
+            raise
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除活动封面多尺寸版本字段...")
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE activities DROP COLUMN IF EXISTS cover_srcset"))
+            conn.commit()
+            print("✅ 活动封面多尺寸版本字段移除成功")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ 移除失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_activity_cover_srcset.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
@@ -0,0 +1,117 @@
+"""
+添加活动经纬度的数据库迁移脚本
+
+- activities.latitude / longitude：活动地点的经纬度（WGS84）
+- activities.geohash：由经纬度计算的 geohash（C 排序规则），及仅覆盖启用活动的 B-tree 部分索引
+  （INCLUDE 距离计算和过滤所需的列，取候选时只读索引）
+- 为已有坐标的活动补齐 geohash（如通过 SQL 直接写入的坐标）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+from app.utils.geo import encode
+
+
+def backfill(batch_size: int = 5000) -> int:
+    """为有坐标但缺少 geohash 的活动计算 geohash，返回更新的活动数"""
+    updated = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text("""
+                    SELECT id, latitude, longitude FROM activities
+                    WHERE id > :last_id AND geohash IS NULL
+                      AND latitude IS NOT NULL AND longitude IS NOT NULL
+                    ORDER BY id LIMIT :limit
+                """),
+                {"last_id": last_id, "limit": batch_size}
+            ).all()
+            if not rows:
+                return updated
+            conn.execute(
+                text("UPDATE activities SET geohash = :geohash WHERE id = :id"),
+                [{"id": row.id, "geohash": encode(row.latitude, row.longitude)} for row in rows]
+            )
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加活动经纬度...")
+
+    # CONCURRENTLY 不能在事务中执行，使用自动提交连接，建索引期间不阻塞写入
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE activities
+                ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION,
+                ADD COLUMN IF NOT EXISTS geohash VARCHAR(12) COLLATE "C"
+            """))
+            conn.execute(text("COMMENT ON COLUMN activities.latitude IS '纬度（WGS84）'"))
+            conn.execute(text("COMMENT ON COLUMN activities.longitude IS '经度（WGS84）'"))
+            conn.execute(text("COMMENT ON COLUMN activities.geohash IS '经纬度的 geohash'"))
+        except Exception as e:
+            print(f"❌ 添加字段失败: {e}")
+            raise
+
+    # 先补齐 geohash 再建索引，避免回填时逐行维护索引
+    print(f"补齐 geohash: {backfill()} 个活动")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_active_geohash
+                ON activities (geohash) INCLUDE (latitude, longitude, end_time, id) WHERE is_active
+            """))
+            # 更新可见性映射和统计信息，候选活动才能走仅索引扫描
+            conn.execute(text("VACUUM ANALYZE activities"))
+        except Exception as e:
+            print(f"❌ 添加索引失败: {e}")
+            raise
+
+    print("✅ 活动经纬度添加成功")
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除活动经纬度...")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_activities_active_geohash"))
+            conn.execute(text("""
+                ALTER TABLE activities
+                DROP COLUMN IF EXISTS geohash,
+                DROP COLUMN IF EXISTS longitude,
+                DROP COLUMN IF EXISTS latitude
+            """))
+            print("✅ 活动经纬度移除成功")
+
+        except Exception as e:
+            print(f"❌ 移除失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_activity_geo.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
@@ -0,0 +1,90 @@
+"""
+添加活动全文检索的数据库迁移脚本
+
+- activities.search_vector：应用侧分词后的 tsvector 及其 GIN 索引
+- pg_trgm 扩展及标题的三元组 GIN 索引（用于模糊匹配，扩展不可用时跳过）
+- 为已有活动生成检索向量
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+from scripts.ops.rebuild_search_index import rebuild
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加活动全文检索...")
+
+    # CONCURRENTLY 不能在事务中执行，使用自动提交连接，建索引期间不阻塞写入
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE activities
+                ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+            """))
+            conn.execute(text("COMMENT ON COLUMN activities.search_vector IS '全文检索向量'"))
+        except Exception as e:
+            print(f"❌ 添加字段失败: {e}")
+            raise
+
+    # 先生成向量再建索引，避免回填时逐行维护 GIN 索引
+    rebuild()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_search_vector
+                ON activities USING gin (search_vector)
+            """))
+        except Exception as e:
+            print(f"❌ 添加索引失败: {e}")
+            raise
+
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_title_trgm
+                ON activities USING gin (title gin_trgm_ops)
+            """))
+        except Exception as e:
+            print(f"⚠️  pg_trgm 不可用，跳过模糊匹配索引（可设置 SEARCH_FUZZY_ENABLED=False）: {e}")
+
+    print("✅ 活动全文检索添加成功")
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除活动全文检索...")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_activities_title_trgm"))
+            conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_activities_search_vector"))
+            conn.execute(text("ALTER TABLE activities DROP COLUMN IF EXISTS search_vector"))
+            print("✅ 活动全文检索移除成功")
+
+        except Exception as e:
+            print(f"❌ 移除失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_activity_search.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
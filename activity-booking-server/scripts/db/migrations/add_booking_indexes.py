@@ -0,0 +1,75 @@
+"""
+添加预约热点查询索引的数据库迁移脚本
+
+- 活动的全部预约按 activity_id 查询（同时覆盖删除活动时的外键检查）
+- 活动的已确认预约及计数按 activity_id 查询，部分索引只包含已确认的预约
+- 我的预约按 (user_id, created_at, id) 翻页、活动列表按 start_time 的部分索引
+  已由 add_keyset_pagination_indexes.py 创建
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+INDEXES = {
+    "idx_bookings_activity": (
+        "ON bookings (activity_id)"
+    ),
+    # 预约状态枚举按名称存储
+    "idx_bookings_activity_confirmed": (
+        "ON bookings (activity_id) WHERE status = 'CONFIRMED'"
+    ),
+}
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加预约查询索引...")
+
+    # CONCURRENTLY 不能在事务中执行，使用自动提交连接，建索引期间不阻塞写入
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            for name, definition in INDEXES.items():
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
+            conn.execute(text("ANALYZE bookings"))
+            print("✅ 预约查询索引添加成功")
+
+        except Exception as e:
+            print(f"❌ 添加索引失败: {e}")
+            raise
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除预约查询索引...")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            print("✅ 预约查询索引移除成功")
+
+        except Exception as e:
+            print(f"❌ 移除索引失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_booking_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
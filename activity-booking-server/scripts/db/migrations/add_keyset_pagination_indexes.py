@@ -0,0 +1,71 @@
+"""
+添加键集分页所需索引的数据库迁移脚本
+
+- 活动列表按 (start_time, id) 翻页，仅覆盖启用的活动
+- 我的预约按 (user_id, created_at, id) 翻页
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+INDEXES = {
+    "idx_activities_active_start_time": (
+        "ON activities (start_time, id) WHERE is_active"
+    ),
+    "idx_bookings_user_created": (
+        "ON bookings (user_id, created_at, id)"
+    ),
+}
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加键集分页索引...")
+
+    # CONCURRENTLY 不能在事务中执行，使用自动提交连接，建索引期间不阻塞写入
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            for name, definition in INDEXES.items():
+                conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
+            print("✅ 键集分页索引添加成功")
+
+        except Exception as e:
+            print(f"❌ 添加索引失败: {e}")
+            raise
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除键集分页索引...")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            print("✅ 键集分页索引移除成功")
+
+        except Exception as e:
+            print(f"❌ 移除索引失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_keyset_pagination_indexes.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
@@ -0,0 +1,71 @@
+"""
+添加用户工作人员标记的数据库迁移脚本
+
+工作人员可以在活动现场为他人批量签到
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import text
+from app.core.db import engine
+
+
+def upgrade():
+    """升级数据库"""
+    print("开始添加工作人员标记字段...")
+
+    with engine.connect() as conn:
+        try:
+            # PostgreSQL 11+ 添加带常量默认值的字段不重写表
+            conn.execute(text("""
+                ALTER TABLE users
+                ADD COLUMN IF NOT EXISTS is_staff BOOLEAN NOT NULL DEFAULT FALSE
+            """))
+
+            conn.commit()
+            print("✅ 工作人员标记字段添加成功")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ 添加字段失败: {e}")
+            raise
+
+
+def downgrade():
+    """降级数据库"""
+    print("开始移除工作人员标记字段...")
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE users
+                DROP COLUMN IF EXISTS is_staff
+            """))
+
+            conn.commit()
+            print("✅ 工作人员标记字段移除成功")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ 移除字段失败: {e}")
+            raise
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python add_user_staff_flag.py [upgrade|downgrade]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action == "upgrade":
+        upgrade()
+    elif action == "downgrade":
+        downgrade()
+    else:
+        print("无效的操作，请使用 upgrade 或 downgrade")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+活动封面批量处理脚本
+为封面指向 /static 下原图、尚未生成多尺寸版本的活动生成 WebP/AVIF（与上传接口相同的处理），
+并把 cover_image 替换为详情页头图、写入 cover_srcset。
+每个不同的封面文件只处理一次，同一封面的活动按批更新；用于上线封面处理、导入数据之后
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import orjson
+from sqlalchemy import select, text
+
+from app.core.cache import async_redis_pool
+from app.core.db import AsyncSessionLocal, async_engine
+from app.models.activity import Activity
+from app.services.activity_cache import activity_cache
+from app.services.cover_images import COVER_DIRECTORY, cover_images
+from app.utils.images import InvalidImageError
+
+STATIC_DIRECTORY = os.path.dirname(os.path.dirname(COVER_DIRECTORY))
+
+UPDATE_SQL = text("""
+    UPDATE activities SET cover_image = :hero, cover_srcset = CAST(:srcset AS JSONB)
+    WHERE id IN (
+        SELECT id FROM activities
+        WHERE cover_image = :original AND cover_srcset IS NULL
+        LIMIT :limit
+    )
+""")
+
+
+def rendition_size(url: str) -> int:
+    return os.path.getsize(os.path.join(STATIC_DIRECTORY, url.removeprefix("/static/")))
+
+
+async def process(original: str, batch_size: int) -> int:
+    """处理一个封面文件并更新使用它的活动，返回更新的活动数"""
+    path = os.path.join(STATIC_DIRECTORY, original.removeprefix("/static/"))
+    if not os.path.isfile(path):
+        print(f"⚠️  跳过 {original}：文件不存在")
+        return 0
+    with open(path, "rb") as file:
+        data = file.read()
+    try:
+        digest, width = cover_images.inspect(data)
+    except InvalidImageError as e:
+        print(f"⚠️  跳过 {original}：{e}")
+        return 0
+    srcset = cover_images.existing_srcset(digest, width) or await cover_images.derive(data, digest)
+
+    updated = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(UPDATE_SQL, {
+                "hero": srcset["hero"],
+                "srcset": orjson.dumps(srcset).decode(),
+                "original": original,
+                "limit": batch_size,
+            })
+            await db.commit()
+        if not result.rowcount:
+            break
+        updated += result.rowcount
+
+    print(
+        f"{original}: 原图 {len(data) / 1024:.1f} KB -> 缩略图 {rendition_size(srcset['thumbnail']) / 1024:.1f} KB、"
+        f"头图 {rendition_size(srcset['hero']) / 1024:.1f} KB，更新 {updated} 个活动"
+    )
+    return updated
+
+
+async def main(batch_size: int):
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            originals = (await db.scalars(
+                select(Activity.cover_image).distinct()
+                .where(Activity.cover_srcset.is_(None), Activity.cover_image.like("/static/%"))
+            )).all()
+        print(f"待处理的封面文件: {len(originals)}")
+
+        total = 0
+        for original in originals:
+            total += await process(original, batch_size)
+        # 列表和热门缓存立即失效，详情缓存按 ACTIVITY_CACHE_TTL 过期
+        await activity_cache.invalidate()
+        print(f"✅ 处理完成：{total} 个活动，耗时 {time.perf_counter() - started:.1f} 秒")
+    finally:
+        await cover_images.close()
+        await async_engine.dispose()
+        await async_redis_pool.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量生成活动封面的多尺寸版本")
+    parser.add_argument("--batch-size", type=int, default=10000, help="每批更新的活动数")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+热门活动排行重建脚本
+从预约表重新计算所有进行中和未开始活动的热度并替换 Redis 排行，
+用于调整半衰期或初始热度、Redis 数据丢失之后立即恢复（应用也会按 HOT_RANKING_REBUILD_INTERVAL 定期重建）
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.cache import async_redis_pool
+from app.core.db import AsyncSessionLocal, async_engine
+from app.services.hot_ranking import hot_ranking
+
+
+async def main(top: int):
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            count = await hot_ranking.rebuild(db)
+        print(f"✅ 重建完成：{count} 个活动，耗时 {time.perf_counter() - started:.2f} 秒")
+        if top:
+            print(f"当前前 {top} 名: {await hot_ranking.top(top)}")
+    finally:
+        await async_engine.dispose()
+        await async_redis_pool.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重建热门活动排行")
+    parser.add_argument("--top", type=int, default=10, help="重建后打印前 N 名活动 ID（0 不打印）")
+    args = parser.parse_args()
+    asyncio.run(main(args.top))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+活动检索向量重建脚本
+按当前分词器（SEARCH_TOKENIZER）重新生成所有活动的 search_vector，
+用于首次上线全文检索、切换分词器或调整检索字段权重之后
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.db import SessionLocal
+from app.models.activity import Activity, build_search_vector
+
+
+def rebuild(batch_size: int = 1000, only_missing: bool = False) -> int:
+    """按 ID 分批重建检索向量，每批单独提交，返回处理的活动数"""
+    statement = (
+        update(Activity.__table__)
+        .where(Activity.__table__.c.id == bindparam("activity_id"))
+        .values(search_vector=bindparam("vector"))
+    )
+    db = SessionLocal()
+    total = 0
+    last_id = 0
+    try:
+        while True:
+            query = select(
+                Activity.id, Activity.title, Activity.organizer, Activity.location, Activity.description
+            ).where(Activity.id > last_id).order_by(Activity.id).limit(batch_size)
+            if only_missing:
+                query = query.where(Activity.search_vector.is_(None))
+            rows = db.execute(query).all()
+            if not rows:
+                break
+            db.execute(statement, [
+                {"activity_id": row.id, "vector": build_search_vector(row)} for row in rows
+            ])
+            db.commit()
+            total += len(rows)
+            last_id = rows[-1].id
+            print(f"已处理 {total} 个活动（最大 ID {last_id}）")
+        return total
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重建活动检索向量")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的活动数")
+    parser.add_argument("--only-missing", action="store_true", help="只处理尚未生成检索向量的活动")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = rebuild(args.batch_size, args.only_missing)
+    print(f"✅ 重建完成：{count} 个活动，耗时 {time.perf_counter() - started:.1f} 秒")
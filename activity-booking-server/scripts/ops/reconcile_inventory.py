@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+座位库存对账脚本
+检测并修复 Redis 座位库存与预约表之间的漂移，并按预约表修正 booked_count
+建议通过定时任务（如 cron 每 5 分钟）运行
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.cache import async_redis_pool, async_redis_binary_pool
+from app.core.db import AsyncSessionLocal, async_engine
+from app.services.seat_inventory import seat_inventory
+
+
+async def reconcile(grace: float):
+    """执行一次对账"""
+    try:
+        async with AsyncSessionLocal() as db:
+            synced = 0
+            while count := await seat_inventory.sync_booked_counts(db):
+                synced += count
+            repaired = await seat_inventory.reconcile(db, grace=grace)
+
+        print(f"回写 booked_count: {synced} 个活动")
+        if not repaired:
+            print("✅ 未发现库存漂移")
+            return
+        for item in repaired:
+            status = "已修复" if item["applied"] else "跳过（期间有新变动）"
+            print(f"⚠️  活动 {item['activity_id']}: Redis 余量 {item['redis']} → 期望 {item['expected']} {status}")
+    finally:
+        await async_redis_pool.disconnect()
+        await async_redis_binary_pool.disconnect()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="座位库存对账")
+    parser.add_argument("--grace", type=float, default=1.0, help="两次观测之间的等待时间（秒）")
+    args = parser.parse_args()
+    asyncio.run(reconcile(args.grace))
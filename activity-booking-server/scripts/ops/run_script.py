@@ -3,17 +3,17 @@
 脚本运行工具
 提供统一的脚本执行接口
 """
-import importlib.util
 import os
+import runpy
 import sys
 
 # 添加项目根目录到 Python 路径
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
 
-def run_script(script_name):
-    """运行指定的脚本"""
+def run_script(script_name, args=()):
+    """运行指定的脚本，args 作为脚本的命令行参数"""
     scripts_dir = os.path.dirname(os.path.dirname(__file__))  # 回到 scripts 目录
     script_path = os.path.join(scripts_dir, f"{script_name}.py")
     
@@ -26,10 +26,9 @@ def run_script(script_name):
     print(f"运行脚本: {script_name}.py")
     print("-" * 50)
     
-    # 动态导入并执行脚本
-    spec = importlib.util.spec_from_file_location(script_name, script_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    # 以 __main__ 身份执行脚本，使脚本的命令行入口生效
+    sys.argv = [script_path, *args]
+    runpy.run_path(script_path, run_name="__main__")
 
 
 def list_scripts():
@@ -58,14 +57,14 @@ def list_scripts():
 
 def main():
     if len(sys.argv) < 2:
-        print("用法: python run_script.py <脚本名>")
+        print("用法: python run_script.py <脚本名> [脚本参数...]")
         print()
         print("可用的脚本：")
         list_scripts()
         return
     
     script_name = sys.argv[1]
-    run_script(script_name)
+    run_script(script_name, sys.argv[2:])
 
 
 if __name__ == "__main__":
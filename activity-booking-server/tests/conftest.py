@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+# 配置在导入 app 时读取；未提供 .env 时使用本地默认值，数据库相关测试在连接不上时跳过
+os.environ.setdefault("DATABASE_URL", "postgresql://postgres@localhost:5432/booking")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+async def database():
+    """需要 PostgreSQL 的测试使用；连接不上时跳过，结束时释放连接池（连接不能跨事件循环复用）"""
+    from app.core.db import async_engine
+
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as exc:
+        await async_engine.dispose()
+        pytest.skip(f"数据库不可用: {exc}")
+    yield async_engine
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def redis_client():
+    """需要 Redis 的测试使用；连接不上时跳过，结束时断开连接池"""
+    from redis.exceptions import RedisError
+
+    from app.core.cache import async_redis_pool, get_async_redis
+
+    client = get_async_redis()
+    try:
+        await client.ping()
+    except RedisError as exc:
+        await async_redis_pool.disconnect()
+        pytest.skip(f"Redis 不可用: {exc}")
+    yield client
+    await async_redis_pool.disconnect()
@@ -0,0 +1,48 @@
+"""
+活动列表投影：包含列表卡片展示的地点和描述摘要
+"""
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import delete
+
+from app.core.db import AsyncSessionLocal
+from app.models.activity import Activity
+from app.repositories.activity_repository import ACTIVITY_SUMMARY, SUMMARY_DESCRIPTION_LENGTH, ActivityRepository
+from app.schemas.activity import ActivitySummary
+from app.utils.serializer import serializer_for
+
+
+@pytest.fixture
+async def activity(database):
+    now = datetime.now()
+    activity = Activity(
+        title="列表投影测试活动",
+        description="湿" * (SUMMARY_DESCRIPTION_LENGTH * 3),
+        location="湿地公园东门",
+        start_time=now + timedelta(days=1),
+        end_time=now + timedelta(days=1, hours=2),
+        max_participants=20,
+    )
+    async with AsyncSessionLocal() as db:
+        db.add(activity)
+        await db.commit()
+
+    yield activity
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Activity).where(Activity.id == activity.id))
+        await db.commit()
+
+
+async def test_summary_has_location_and_description_excerpt(activity):
+    async with AsyncSessionLocal() as db:
+        repo = ActivityRepository(db)
+        [row] = await repo.fetch_all(repo.select_as(ACTIVITY_SUMMARY).where(Activity.id == activity.id), ACTIVITY_SUMMARY)
+
+    assert row.location == "湿地公园东门"
+    assert row.description == "湿" * SUMMARY_DESCRIPTION_LENGTH
+    item = orjson.loads(serializer_for(ActivitySummary).dumps(row))
+    assert item["location"] == "湿地公园东门"
+    assert item["description"] == row.description
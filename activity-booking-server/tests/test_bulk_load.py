@@ -0,0 +1,32 @@
+"""
+CSV 导出与导入：NULL 和空字符串往返后保持区分
+"""
+from datetime import datetime
+
+from scripts.db.bulk_load import _read_csv
+from scripts.db.export_data import CsvWriter, TABLES, _columns
+
+
+def test_csv_round_trip_keeps_null_and_empty_string(tmp_path):
+    columns = [column for column in _columns(TABLES["users"]) if column.name in ("id", "nickname", "phone", "city", "created_at")]
+    names = [column.name for column in columns]
+    created_at = datetime(2025, 1, 1, 8, 30)
+    rows = [
+        (1, "", None, "\\N", created_at),
+        (2, None, "", "\\路径", None),
+    ]
+    path = str(tmp_path / "users.000001.csv")
+    writer = CsvWriter(path, columns, "none")
+    writer.write(rows)
+    writer.close()
+
+    assert list(_read_csv(path, names, 1000)) == [
+        ("1", "", None, "\\N", created_at.isoformat()),
+        ("2", None, "", "\\路径", None),
+    ]
+
+
+def test_legacy_csv_reads_empty_cells_as_null(tmp_path):
+    path = tmp_path / "users.000001.csv"
+    path.write_text("id,nickname\n1,\n", encoding="utf-8")
+    assert list(_read_csv(str(path), ["id", "nickname"], 1000, null=None)) == [("1", None)]
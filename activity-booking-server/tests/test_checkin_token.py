@@ -0,0 +1,42 @@
+import base64
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils.checkin_token import InvalidCheckinTokenError, issue_checkin_token, verify_checkin_token
+
+
+def test_round_trip():
+    expires_at = datetime.now() + timedelta(hours=1)
+    claims = verify_checkin_token(issue_checkin_token(12, 34, expires_at))
+    assert (claims.booking_id, claims.activity_id, claims.expires_at) == (12, 34, int(expires_at.timestamp()))
+
+
+def test_expired():
+    token = issue_checkin_token(12, 34, datetime.now() - timedelta(seconds=1))
+    with pytest.raises(InvalidCheckinTokenError, match="过期"):
+        verify_checkin_token(token)
+
+
+def test_expiry_checked_at_verification(monkeypatch):
+    token = issue_checkin_token(12, 34, datetime.now() + timedelta(minutes=5))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 600)
+    with pytest.raises(InvalidCheckinTokenError, match="过期"):
+        verify_checkin_token(token)
+
+
+def test_tampered_payload():
+    token = issue_checkin_token(12, 34, datetime.now() + timedelta(hours=1))
+    raw = bytearray(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    raw[4] ^= 1  # 修改预约 ID
+    tampered = base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode()
+    with pytest.raises(InvalidCheckinTokenError):
+        verify_checkin_token(tampered)
+
+
+@pytest.mark.parametrize("token", ["", "abc", "!!!", "A" * 60])
+def test_malformed(token):
+    with pytest.raises(InvalidCheckinTokenError):
+        verify_checkin_token(token)
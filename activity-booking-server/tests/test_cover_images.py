@@ -0,0 +1,20 @@
+from app.services.cover_images import COVER_URL_PREFIX, CoverImagePipeline
+
+RENDITIONS = [(320, "320w.d.webp"), (1080, "1080w.d.webp")]
+
+
+def test_srcset_keys_are_fixed_without_avif():
+    pipeline = CoverImagePipeline()
+    assert pipeline.srcset({"webp": RENDITIONS}) == {
+        "thumbnail": f"{COVER_URL_PREFIX}/320w.d.webp",
+        "hero": f"{COVER_URL_PREFIX}/1080w.d.webp",
+        "webp": f"{COVER_URL_PREFIX}/320w.d.webp 320w, {COVER_URL_PREFIX}/1080w.d.webp 1080w",
+        "avif": None,
+    }
+
+
+def test_srcset_with_avif():
+    pipeline = CoverImagePipeline()
+    srcset = pipeline.srcset({"webp": RENDITIONS, "avif": [(320, "320w.d.avif")]})
+    assert list(srcset) == ["thumbnail", "hero", "webp", "avif"]
+    assert srcset["avif"] == f"{COVER_URL_PREFIX}/320w.d.avif 320w"
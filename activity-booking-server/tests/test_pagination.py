@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    decode_distance_cursor,
+    encode_cursor,
+    encode_distance_cursor
+)
+
+
+@pytest.mark.parametrize("sort_value", [
+    datetime(2026, 1, 1, 10, 30),
+    datetime(2026, 1, 1, 10, 30, 0, 123456),
+    datetime(2026, 1, 1, 10, 30, tzinfo=timezone.utc),
+])
+def test_cursor_round_trip(sort_value):
+    cursor = encode_cursor(sort_value, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (sort_value, 42)
+
+
+def test_distance_cursor_round_trip():
+    assert decode_distance_cursor(encode_distance_cursor(1234.5, 7)) == (1234.5, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", encode_distance_cursor(1.5, 1)])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_invalid_distance_cursor():
+    with pytest.raises(InvalidCursorError):
+        decode_distance_cursor("not-a-cursor")
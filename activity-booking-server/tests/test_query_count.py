@@ -0,0 +1,149 @@
+"""
+列表和详情接口的 SQL 语句数：不随列表长度增长（N+1），且不超过预算
+
+关闭活动缓存和用户快照缓存，每个请求都实际查询数据库
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import delete, event, insert
+
+from app.core.db import AsyncSessionLocal
+from app.main import app
+from app.models.activity import Activity
+from app.models.booking import Booking, BookingStatus
+from app.models.user import User
+from app.services.activity_cache import activity_cache
+from app.services.principal_cache import principal_cache
+from app.utils.security import create_access_token
+
+SIZES = [1, 10, 50]
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    for cache in (activity_cache.lists, activity_cache.details, activity_cache.hot, principal_cache.cache):
+        monkeypatch.setattr(cache, "enabled", False)
+
+
+@pytest.fixture
+async def client(database, no_cache):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def dataset(database):
+    """一个活动列表，以及分别有 1、10、50 条预约的用户；结束后删除"""
+    now = datetime.now()
+    async with AsyncSessionLocal() as db:
+        activity_ids = (await db.scalars(
+            insert(Activity).returning(Activity.id),
+            [
+                {
+                    "title": f"语句数测试活动 {i}",
+                    "start_time": now + timedelta(days=1, minutes=i),
+                    "end_time": now + timedelta(days=1, hours=2),
+                    "max_participants": 100,
+                }
+                for i in range(max(SIZES))
+            ]
+        )).all()
+        users = {}
+        for size in SIZES:
+            user = User(openid=f"query-count-test-{size}-{now.timestamp()}")
+            db.add(user)
+            await db.flush()
+            booking_ids = (await db.scalars(
+                insert(Booking).returning(Booking.id),
+                [
+                    {
+                        "user_id": user.id,
+                        "activity_id": activity_id,
+                        "name": "预约人",
+                        "phone": "13800000000",
+                        "status": BookingStatus.CONFIRMED,
+                        "created_at": now - timedelta(seconds=i),
+                    }
+                    for i, activity_id in enumerate(activity_ids[:size])
+                ]
+            )).all()
+            users[size] = (user.id, booking_ids[0])
+        await db.commit()
+
+    yield activity_ids, users
+
+    async with AsyncSessionLocal() as db:
+        user_ids = [user_id for user_id, _ in users.values()]
+        await db.execute(delete(Booking).where(Booking.user_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.execute(delete(Activity).where(Activity.id.in_(activity_ids)))
+        await db.commit()
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"}
+
+
+async def get(client, database, url: str, **kwargs) -> tuple:
+    with count_statements(database) as statements:
+        response = await client.get(url, **kwargs)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["code"] == 200, body
+    return body["data"], len(statements)
+
+
+async def test_activity_list(client, database, dataset):
+    counts = {}
+    for size in SIZES:
+        data, counts[size] = await get(client, database, "/api/activities", params={"page": 1, "pageSize": size})
+        assert len(data["items"]) == size
+    assert len(set(counts.values())) == 1, counts
+    # 列表 + 总数
+    assert counts[SIZES[0]] <= 2
+
+
+async def test_activity_detail(client, database, dataset):
+    activity_ids, _ = dataset
+    data, count = await get(client, database, f"/api/activities/{activity_ids[0]}")
+    assert data["id"] == activity_ids[0]
+    assert count == 1
+
+
+async def test_my_bookings(client, database, dataset):
+    _, users = dataset
+    counts = {}
+    for size, (user_id, _) in users.items():
+        data, counts[size] = await get(client, database, "/api/bookings/my", params={"pageSize": 50}, headers=auth(user_id))
+        assert len(data["items"]) == size
+        assert all(item["activity"]["id"] for item in data["items"])
+    assert len(set(counts.values())) == 1, counts
+    # 认证用户 + 预约（连同活动）
+    assert counts[SIZES[0]] <= 3
+
+
+async def test_booking_detail(client, database, dataset):
+    _, users = dataset
+    user_id, booking_id = users[SIZES[-1]]
+    data, count = await get(client, database, f"/api/bookings/{booking_id}", headers=auth(user_id))
+    assert data["id"] == booking_id
+    assert data["activity"]["id"]
+    # 认证用户 + 预约（连同活动）
+    assert count <= 2
@@ -0,0 +1,65 @@
+"""
+活动搜索：服务层和两个搜索接口端到端查询数据库（分页、总数、高亮）
+"""
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app.core.db import AsyncSessionLocal
+from app.main import app
+from app.models.activity import Activity
+from app.services.activity_cache import activity_cache
+from app.services.activity_service import ActivityService
+
+KEYWORD = "鹈鹕观鸟"
+
+
+@pytest.fixture
+async def activity_ids(database):
+    """三个标题含关键词的活动（search_vector 在插入时由应用生成）；结束后删除"""
+    now = datetime.now()
+    activities = [
+        Activity(
+            title=f"{KEYWORD}第 {i} 期",
+            location="湿地公园",
+            start_time=now + timedelta(days=1, hours=i),
+            end_time=now + timedelta(days=1, hours=i + 2),
+            max_participants=20,
+        )
+        for i in range(3)
+    ]
+    async with AsyncSessionLocal() as db:
+        db.add_all(activities)
+        await db.commit()
+        ids = [activity.id for activity in activities]
+
+    yield ids
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Activity).where(Activity.id.in_(ids)))
+        await db.commit()
+
+
+async def test_search_activities_pages(activity_ids):
+    async with AsyncSessionLocal() as db:
+        service = ActivityService(db)
+        first = await service.search_activities(KEYWORD, page=1, page_size=2)
+        second = await service.search_activities(KEYWORD, page=2, page_size=2)
+
+    assert not first.fuzzy
+    assert first.total == 3
+    hits = first.items + second.items
+    assert sorted(hit.id for hit in hits) == sorted(activity_ids)
+    assert all("<em>" in hit.highlights["title"] for hit in hits)
+
+
+@pytest.mark.parametrize("url", ["/api/activities/search", "/api/discovery/search"])
+async def test_search_endpoints(activity_ids, monkeypatch, url):
+    monkeypatch.setattr(activity_cache.lists, "enabled", False)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(url, params={"keyword": KEYWORD, "pageSize": 10})
+    body = response.json()
+    assert body["code"] == 200, body
+    assert sorted(item["id"] for item in body["data"]["items"]) == sorted(activity_ids)
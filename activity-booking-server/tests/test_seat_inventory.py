@@ -0,0 +1,38 @@
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services.seat_inventory import SeatInventory
+
+
+async def unavailable(*args, **kwargs):
+    raise RedisConnectionError("redis is down")
+
+
+async def test_release_failure_marks_activity_for_reconciliation():
+    inventory = SeatInventory()
+    inventory._release = unavailable
+
+    await inventory.release(7, 2)
+
+    assert inventory._pending == {7}
+
+
+async def test_invalidate_failure_marks_activity_for_reconciliation(monkeypatch):
+    inventory = SeatInventory()
+    monkeypatch.setattr(inventory.client, "delete", unavailable)
+
+    await inventory.invalidate(8)
+
+    assert inventory._pending == {8}
+
+
+async def test_pending_kept_while_redis_unavailable(monkeypatch):
+    inventory = SeatInventory()
+    inventory._pending.add(9)
+    monkeypatch.setattr(inventory, "_find_drift", unavailable)
+
+    try:
+        await inventory.reconcile_pending(db=None, grace=0)
+    except RedisConnectionError:
+        pass
+
+    assert inventory._pending == {9}
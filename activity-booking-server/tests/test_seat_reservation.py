@@ -0,0 +1,150 @@
+"""
+占座：条件 UPDATE 的语句构造、Redis 库存脚本，以及并发请求不超卖
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql
+
+from app.core.db import AsyncSessionLocal
+from app.models.activity import Activity
+from app.repositories.activity_repository import ActivityRepository
+from app.services.seat_inventory import SeatInventory
+
+
+class CapturingSession:
+    """记录仓储方法发出的语句，不访问数据库"""
+
+    def __init__(self):
+        self.statement = None
+
+    async def scalar(self, statement):
+        self.statement = statement
+
+    async def scalars(self, statement):
+        self.statement = statement
+        return self
+
+    def all(self):
+        return []
+
+
+def compile_sql(statement) -> str:
+    return " ".join(str(statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )).split())
+
+
+async def test_reserve_seats_is_one_conditional_update():
+    session = CapturingSession()
+    await ActivityRepository(session).reserve_seats(5, 3)
+    sql = compile_sql(session.statement)
+
+    assert sql.startswith("UPDATE activities SET booked_count=(activities.booked_count + 3)")
+    assert "WHERE activities.id = 5 AND activities.is_active" in sql
+    assert "activities.booked_count + 3 <= activities.max_participants" in sql
+    assert "RETURNING" in sql
+
+
+async def test_reserve_seats_many_checks_each_activity_in_one_update():
+    session = CapturingSession()
+    await ActivityRepository(session).reserve_seats_many({5: 2, 6: 1})
+    sql = compile_sql(session.statement)
+
+    assert sql.startswith("UPDATE activities SET booked_count=(activities.booked_count + requested.seats)")
+    assert "FROM (VALUES (5, 2), (6, 1)) AS requested" in sql
+    assert "activities.booked_count + requested.seats <= activities.max_participants" in sql
+
+
+class FakeScript:
+    """按顺序返回预设结果的 Lua 脚本替身"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        return self.results.pop(0)
+
+
+async def test_inventory_key_and_reserve_flow():
+    inventory = SeatInventory()
+    inventory._reserve = FakeScript(SeatInventory.NOT_LOADED, 4)
+    loaded = []
+
+    async def load(db, activity_id):
+        loaded.append(activity_id)
+        return True
+
+    inventory.load = load
+    assert await inventory.reserve(None, 9, 2)
+    assert loaded == [9]
+    # 占座脚本作用于活动库存哈希，并把活动记入待回写集合
+    assert inventory._reserve.calls == [(["seat:inventory:9", "seat:dirty"], [2, 9])] * 2
+
+    inventory._reserve = FakeScript(SeatInventory.SOLD_OUT)
+    assert not await inventory.reserve(None, 9, 2)
+
+
+async def test_inventory_scripts(redis_client):
+    inventory = SeatInventory()
+    activity_id = 10 ** 9 + 7  # 不会与真实活动冲突
+    key = inventory._key(activity_id)
+    await redis_client.delete(key)
+    try:
+        reserve = lambda count: inventory._reserve(keys=[key, "test:seat:dirty"], args=[count, activity_id])  # noqa: E731
+        release = lambda count: inventory._release(keys=[key, "test:seat:dirty"], args=[count, activity_id])  # noqa: E731
+
+        assert await reserve(1) == SeatInventory.NOT_LOADED
+        assert await release(1) == SeatInventory.NOT_LOADED
+
+        assert await inventory._load(keys=[key], args=[3, 5]) == 1
+        # 已存在时不覆盖
+        assert await inventory._load(keys=[key], args=[5, 5]) == 0
+
+        assert await reserve(2) == 1
+        assert await reserve(2) == SeatInventory.SOLD_OUT
+        assert await reserve(1) == 0
+        # 释放不超过容量
+        assert await release(10) == 5
+
+        # 比较并设置：余量与观测值不同时不修复
+        assert await inventory._repair(keys=[key], args=["4", 1, 5]) == 0
+        assert await inventory._repair(keys=[key], args=["5", 1, 5]) == 1
+        assert await redis_client.hget(key, "remaining") == "1"
+        assert await redis_client.sismember("test:seat:dirty", str(activity_id))
+    finally:
+        await redis_client.delete(key, "test:seat:dirty")
+
+
+async def test_concurrent_reservations_do_not_oversell(database):
+    capacity, requests = 5, 30
+    now = datetime.now()
+    async with AsyncSessionLocal() as db:
+        activity_id = await db.scalar(insert(Activity).returning(Activity.id).values(
+            title="并发占座测试活动",
+            start_time=now + timedelta(days=1),
+            end_time=now + timedelta(days=1, hours=2),
+            max_participants=capacity,
+        ))
+        await db.commit()
+
+    async def reserve() -> bool:
+        async with AsyncSessionLocal() as db:
+            activity = await ActivityRepository(db).reserve_seats(activity_id)
+            await db.commit()
+            return activity is not None
+
+    try:
+        results = await asyncio.gather(*(reserve() for _ in range(requests)))
+        async with AsyncSessionLocal() as db:
+            booked = await db.scalar(select(Activity.booked_count).where(Activity.id == activity_id))
+        assert sum(results) == capacity
+        assert booked == capacity
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Activity).where(Activity.id == activity_id))
+            await db.commit()
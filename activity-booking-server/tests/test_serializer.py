@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import orjson
+
+from app.models.activity import Activity
+from app.schemas.activity import ActivitySummary, CoverSrcset
+from app.utils.serializer import serializer_for
+
+WEBP = "/static/images/covers/320w.a.webp 320w"
+AVIF = "/static/images/covers/320w.a.avif 320w"
+
+
+def summary(activity_id: int, cover_srcset) -> dict:
+    return {
+        "id": activity_id,
+        "title": f"活动 {activity_id}",
+        "cover_image": None,
+        "cover_srcset": cover_srcset,
+        "start_time": datetime(2026, 1, 1, 10),
+        "end_time": datetime(2026, 1, 1, 12),
+        "price": 0,
+        "max_participants": 10,
+        "booked_count": 0,
+    }
+
+
+def srcset(**extra) -> dict:
+    return {"thumbnail": "/t.webp", "hero": "/h.webp", "webp": WEBP, **extra}
+
+
+def expected(source) -> dict:
+    """与 Pydantic 模型往返的输出对比"""
+    return orjson.loads(orjson.dumps(ActivitySummary.model_validate(source).model_dump(by_alias=True)))
+
+
+def test_mapping_keys_vary_between_rows():
+    serializer = serializer_for(ActivitySummary)
+    rows = [
+        summary(1, srcset()),
+        summary(2, srcset(avif=AVIF)),
+        summary(3, None),
+        summary(4, srcset()),
+    ]
+    result = orjson.loads(serializer.dumps_many(rows))
+
+    assert [item["coverSrcset"] for item in result] == [
+        {"thumbnail": "/t.webp", "hero": "/h.webp", "webp": WEBP, "avif": None},
+        {"thumbnail": "/t.webp", "hero": "/h.webp", "webp": WEBP, "avif": AVIF},
+        None,
+        {"thumbnail": "/t.webp", "hero": "/h.webp", "webp": WEBP, "avif": None},
+    ]
+    assert result == [expected(row) for row in rows]
+
+
+def test_mapping_with_extra_key_first():
+    serializer = serializer_for(CoverSrcset)
+    assert orjson.loads(serializer.dumps(srcset(avif=AVIF))) == {
+        "thumbnail": "/t.webp", "hero": "/h.webp", "webp": WEBP, "avif": AVIF
+    }
+    # 之前的行带有 avif 键，不影响后面缺少该键的行
+    assert orjson.loads(serializer.dumps(srcset()))["avif"] is None
+
+
+def test_orm_instance_matches_model():
+    activity = Activity(**summary(5, srcset(avif=AVIF)))
+    assert orjson.loads(serializer_for(ActivitySummary).dumps(activity)) == expected(activity)
@@ -0,0 +1,33 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.core.static_files import CachedStaticFiles
+
+IMMUTABLE = "public, max-age=600, immutable"
+
+
+@pytest.fixture
+async def client(tmp_path):
+    (tmp_path / "cover.3f2a9c1d0b1e2f3a.webp").write_bytes(b"webp")
+    (tmp_path / "hiking.jpg").write_bytes(b"jpeg")
+    app = Starlette(routes=[
+        Mount("/static", CachedStaticFiles(directory=tmp_path, immutable_max_age=600))
+    ])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("path, cache_control", [
+    ("/static/cover.3f2a9c1d0b1e2f3a.webp", IMMUTABLE),
+    ("/static/hiking.jpg", "no-cache"),
+])
+async def test_revalidation_keeps_cache_policy(client, path, cache_control):
+    response = await client.get(path)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == cache_control
+
+    revalidated = await client.get(path, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == cache_control
@@ -0,0 +1,64 @@
+import pytest
+
+from app.core.uow import UnitOfWork
+
+
+class FakeSession:
+    def __init__(self, fail_commit: bool = False):
+        self.fail_commit = fail_commit
+        self.rolled_back = False
+
+    async def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+async def test_failing_callback_does_not_fail_commit_or_skip_others(caplog):
+    uow = UnitOfWork(FakeSession())
+    calls = []
+
+    async def fail():
+        calls.append("fail")
+        raise ConnectionError("redis is down")
+
+    async def succeed():
+        calls.append("succeed")
+
+    async with uow:
+        uow.after_commit(fail)
+        uow.after_commit(succeed)
+
+    assert calls == ["fail", "succeed"]
+    assert "提交后回调执行失败" in caplog.text
+
+
+async def test_callbacks_dropped_when_commit_fails():
+    uow = UnitOfWork(FakeSession(fail_commit=True))
+    calls = []
+
+    async def record():
+        calls.append("called")
+
+    with pytest.raises(RuntimeError):
+        async with uow:
+            uow.after_commit(record)
+    assert calls == []
+
+
+async def test_callbacks_dropped_on_rollback():
+    session = FakeSession()
+    uow = UnitOfWork(session)
+    calls = []
+
+    async def record():
+        calls.append("called")
+
+    with pytest.raises(ValueError):
+        async with uow:
+            uow.after_commit(record)
+            raise ValueError
+    assert session.rolled_back
+    assert calls == []